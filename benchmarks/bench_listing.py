@@ -0,0 +1,256 @@
+"""
+Headless benchmarks for the listing pipeline (ScanWorker, FileModel, FilePanel).
+
+Generates synthetic directories (1k .. 1M entries), then measures:
+
+    scan_s / first_chunk_s     ScanWorker total time and time to first chunk
+    scan_pool_s                ScanWorker with a POOL_WORKERS stat pool
+    bytes_per_entry            ListingStore.nbytes per entry
+    sort_ms.<column>           first sort, cached re-sort and direction flip
+    filter_ms.<query>          FilterEngine latency while "typing" queries
+    data_page_ms               FileModel.data() for one visible page, cold/warm
+    panel_s                    FilePanel.refresh_path() until the scan finished
+
+Results are written as JSON; --compare prints the change against an older
+run and exits with 1 if any timing regressed by more than --threshold.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_listing.py --sizes 1000 100000
+    python benchmarks/bench_listing.py --out new.json --compare old.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+from fs_worker import ScanWorker
+from file_model import FileModel
+from sort_engine import SortEngine, COL_NAME
+from filter_engine import FilterEngine
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+EXTENSIONS = ("txt", "py", "jpg", "png", "zip", "log", "md", "c", "h", "json")
+STEMS = ("report", "main", "data", "image", "backup", "notes", "build", "test")
+PAGE_ROWS = 40
+POOL_WORKERS = 8
+FILTER_QUERIES = ("r", "re", "rep", "repo", "report_1", "*.py", "~rpt", "re:^data_\\d+7")
+COLUMNS = ("name", "ext", "size", "date", "attr", "owner")
+
+
+# ---------------------------------------------------------------------- data
+def make_tree(root: str, count: int) -> str:
+    """Create (or reuse) a flat directory with `count` entries, 5 % dirs."""
+    path = os.path.join(root, f"kicmd_bench_{count}")
+    marker = os.path.join(path, ".complete")
+    if os.path.exists(marker):
+        return path
+    os.makedirs(path, exist_ok=True)
+    rnd = random.Random(count)
+    now = time.time()
+    for i in range(count):
+        name = f"{rnd.choice(STEMS)}_{i}"
+        full = os.path.join(path, name if i % 20 == 0 else f"{name}.{rnd.choice(EXTENSIONS)}")
+        if i % 20 == 0:
+            os.makedirs(full, exist_ok=True)
+        else:
+            with open(full, "wb") as f:
+                f.truncate(rnd.randrange(0, 1 << 20))
+            mtime = now - rnd.randrange(0, 365 * 86400)
+            os.utime(full, (mtime, mtime))
+    open(marker, "w").close()
+    return path
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+# ---------------------------------------------------------------------- measurements
+def bench_scan(path: str) -> dict:
+    worker = ScanWorker(path)
+    first = []
+    start = time.perf_counter()
+    worker.chunk_filled.connect(lambda *a: first or first.append(time.perf_counter() - start))
+    worker.run()
+    total = time.perf_counter() - start
+    store = worker.store
+    pooled, _ = timed(ScanWorker(path, names_first=False, stat_workers=POOL_WORKERS).run)
+    return {
+        "entries": len(store),
+        "scan_s": round(total, 4),
+        "scan_pool_s": round(pooled, 4),
+        "first_chunk_s": round(first[0], 4) if first else None,
+        "bytes_per_entry": round(store.nbytes / max(len(store), 1), 1),
+        "_store": store,
+    }
+
+
+def bench_sort(store) -> dict:
+    results = {}
+    for col, name in enumerate(COLUMNS):
+        # A fresh model per column, so "first" is not a cached order. The model
+        # sorts by Name when it is built: that first sort is timed on its own engine.
+        model = FileModel(store)
+        if col == COL_NAME:
+            first, _ = timed(SortEngine(store).order, col, True, len(store))
+        else:
+            first, _ = timed(model.sort, col, Qt.SortOrder.AscendingOrder)
+        flip, _ = timed(model.sort, col, Qt.SortOrder.DescendingOrder)
+        again, _ = timed(model.sort, col, Qt.SortOrder.AscendingOrder)
+        results[name] = {"first": ms(first), "flip": ms(flip), "cached": ms(again)}
+    return results
+
+
+def bench_filter(model) -> dict:
+    engine = FilterEngine(model.view_names())
+    build, _ = timed(len, engine)
+    results = {"_index": ms(build)}
+    for query in FILTER_QUERIES:
+        t, _ = timed(engine.match, query)
+        results[query] = ms(t)
+    return results
+
+
+def bench_data_page(model) -> dict:
+    rows = min(PAGE_ROWS, model.rowCount())
+    roles = (Qt.DisplayRole, Qt.DecorationRole, Qt.ForegroundRole, Qt.TextAlignmentRole)
+
+    def paint():
+        for r in range(rows):
+            for c in range(model.columnCount()):
+                idx = model.index(r, c)
+                for role in roles:
+                    model.data(idx, role)
+
+    cold, _ = timed(paint)
+    warm, _ = timed(paint)
+    return {"cold": ms(cold), "warm": ms(warm)}
+
+
+def bench_panel(path: str):
+    """FilePanel end to end; None where the panel can't be built headless."""
+    try:
+        from ui.panels.file_panel import FilePanel
+    except ImportError as e:
+        return {"skipped": str(e)}
+    panel = FilePanel("bench", tempfile.gettempdir())
+    while panel.thread.isRunning():
+        app.processEvents()
+    start = time.perf_counter()
+    panel.refresh_path(path, use_cache=False)
+    while panel.thread.isRunning():
+        app.processEvents()
+    app.processEvents()
+    return {"panel_s": round(time.perf_counter() - start, 4)}
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def run(sizes, root: str) -> dict:
+    results = {}
+    for count in sizes:
+        print(f"[bench] {count} entries: generating...", flush=True)
+        path = make_tree(root, count)
+        gc.collect()
+        scan = bench_scan(path)
+        store = scan.pop("_store")
+        model = FileModel(store)
+        entry = dict(scan)
+        entry["sort_ms"] = bench_sort(store)
+        entry["filter_ms"] = bench_filter(model)
+        entry["data_page_ms"] = bench_data_page(model)
+        entry.update(bench_panel(path))
+        results[str(count)] = entry
+        print(f"[bench] {count}: scan {entry['scan_s']} s, first chunk {entry['first_chunk_s']} s, "
+              f"{entry['bytes_per_entry']} B/entry", flush=True)
+    return results
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+# ---------------------------------------------------------------------- compare
+def flatten(data, prefix=""):
+    """Numeric leaves of a result tree as {"100000.sort_ms.name.first": value}."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(new: dict, old: dict, threshold: float) -> bool:
+    """Print per-metric changes; return True if any timing regressed."""
+    new_flat, old_flat = flatten(new["results"]), flatten(old["results"])
+    regressed = False
+    print(f"\n{'metric':<48} {'old':>10} {'new':>10} {'change':>8}")
+    for key in sorted(new_flat.keys() & old_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        if key.endswith(".entries"):
+            continue
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold and after - before > 0.5 and not key.endswith("bytes_per_entry"):
+            flag, regressed = "  <-- slower", True
+        print(f"{key:<48} {before:>10} {after:>10} {change:>+7.0%}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KiCommander listing benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="directory sizes to generate (up to 1000000)")
+    parser.add_argument("--root", default=tempfile.gettempdir(),
+                        help="where synthetic directories are created and reused")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="older results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = {"meta": metadata(), "results": run(args.sizes, args.root)}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        if compare(report, old, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ from gdrive_vfs import GDriveVFS, GDRIVE_AVAILABLE
 from archive_vfs import ArchiveVFS, is_archive
 from fs_worker import FileInfo
 from archiver import ArchiveThread
+from dir_compare import CompareThread, summarize
 from vfs_ops import VfsOpThread
 from queue_manager import QueueManager
 from settings_dialog import SettingsDialog
@@ -22,6 +23,8 @@ from search_dialog import SearchDialog
 from search_vfs import SearchVFS
 from ui.panels.file_panel import FilePanel
 from bookmarks_dialog import BookmarksDialog
+from jump_dialog import JumpDialog
+from frecency import frecency
 from duplicate_view import DuplicateDialog
 from diff_viewer import DiffDialog
 from connection_manager import ConnectionManagerDialog
@@ -66,11 +69,16 @@ class ActionManager:
             "clipboard_cut": lambda: self.op_clipboard_copy(is_cut=True),
             "clipboard_paste": self.op_clipboard_paste,
             "compare": self.op_compare,
+            "compare_dirs": self.op_compare_dirs,
+            "compare_dirs_content": lambda: self.op_compare_dirs(by_content=True),
             "duplicates": self.op_find_duplicates,
             "multi_rename": self.op_multi_rename,
             "sync": self.op_sync,
             "search": self.op_search,
             "filter": self.op_filter,
+            "branch_view": self.op_branch_view,
+            "thumbnail_view": self.op_thumbnail_view,
+            "folder_sizes": self.op_folder_sizes,
             "change_permissions": self.op_chmod,
             "change_attributes": self.op_attributes,
             "connect_ftp": self.op_connect_ftp,
@@ -79,6 +87,7 @@ class ActionManager:
             "connect_gdrive": self.op_connect_gdrive,
             "connection_manager": self.op_connection_manager,
             "favorites": self.op_favorites,
+            "jump": self.op_jump,
             "settings": self.op_settings,
         }
         if action in routes:
@@ -173,6 +182,21 @@ class ActionManager:
         active = self.mw.get_active_panel()
         active.toggle_filter()
 
+    def op_thumbnail_view(self):
+        active = self.mw.get_active_panel()
+        active.toggle_thumbnail_view()
+
+    def op_branch_view(self):
+        active = self.mw.get_active_panel()
+        active.toggle_branch_view()
+
+    def op_folder_sizes(self):
+        active = self.mw.get_active_panel()
+        if active._vfs:
+            self.mw.statusBar().showMessage("Folder sizes are calculated for local folders only.")
+            return
+        active.calculate_folder_sizes()
+
     def op_chmod(self):
         active = self.mw.get_active_panel()
         items = active.get_selected_items()
@@ -456,6 +480,37 @@ class ActionManager:
         except Exception as e:
             QMessageBox.critical(self.mw, "Compare Error", f"Could not read files:\n{e}")
 
+    def op_compare_dirs(self, by_content=False):
+        """Shift+F2: mark newer, older and missing entries in both panels."""
+        left = self.mw.left_tabs.currentWidget()
+        right = self.mw.right_tabs.currentWidget()
+        if left.is_scanning() or right.is_scanning():
+            self.mw.statusBar().showMessage("Compare: wait until both panels finish loading.")
+            return
+        thread = getattr(self.mw, "compare_thread", None)
+        if thread is not None and thread.isRunning():
+            return
+        # Content is hashed only where it can be read without downloading
+        by_content = by_content and not left._vfs and not right._vfs
+        self.mw.statusBar().showMessage("Comparing directories…")
+        self.mw.compare_thread = CompareThread(left.model.store, right.model.store, use_hashes=by_content)
+        self.mw.compare_thread.worker.finished.connect(
+            lambda ls, rs, lm, rm: self.on_compare_finished(left, right, ls, rs, lm, rm))
+        self.mw.compare_thread.start()
+
+    def on_compare_finished(self, left, right, left_store, right_store, left_marks, right_marks):
+        shown = left.show_compare_marks(left_store, left_marks)
+        shown = right.show_compare_marks(right_store, right_marks) and shown
+        if not shown:
+            self.mw.statusBar().showMessage("Compare: a panel changed directory, comparison dropped.")
+            return
+        counts = summarize(left_marks)
+        right_counts = summarize(right_marks)
+        self.mw.statusBar().showMessage(
+            f"Compare: {counts.get('newer', 0)} newer, {counts.get('older', 0)} older, "
+            f"{counts.get('unique', 0)} only left, {right_counts.get('unique', 0)} only right, "
+            f"{counts.get('different', 0)} different, {counts.get('same', 0)} identical")
+
     def op_find_duplicates(self):
         """Otevře okno pro hledání duplicit v aktuálních složkách obou panelů."""
         folders = []
@@ -712,6 +767,22 @@ class ActionManager:
 
         menu.exec(QCursor.pos())
 
+    def op_jump(self):
+        """Skok do často navštěvované složky (frecency)."""
+        active = self.mw.get_active_panel()
+        dlg = JumpDialog(self.mw)
+        if dlg.exec() != QDialog.Accepted or not dlg.target:
+            return
+        target = dlg.target
+        if active.jump_to(target):
+            return
+        if target.startswith("["):
+            self.mw.statusBar().showMessage(f"{target} can only be opened inside a connection of that type.")
+        else:
+            # Gone (or unmounted): forget it so it doesn't come up again
+            frecency.remove(target)
+            self.mw.statusBar().showMessage(f"Folder no longer exists: {target}")
+
     def _open_bookmarks_manager(self, current_vfs_tag, current_path):
         dlg = BookmarksDialog(current_vfs_tag, current_path, self.mw)
         dlg.exec()
@@ -42,16 +42,6 @@ def is_archive(path: str) -> bool:
     return False
 
 
-def _format_size(size: float) -> str:
-    if size < 0: return "0 B"
-    for unit in ["B", "KB", "MB", "GB"]:
-        if size < 1024:
-            return f"{size:.0f} {unit}"
-        size /= 1024
-    return f"{size:.1f} TB"
-
-
-
 class ArchiveVFS:
     """Virtual file system layer for browsing archive contents."""
 
@@ -99,16 +89,14 @@ class ArchiveVFS:
 
                     is_dir = info.is_dir() or len(parts) > 1
                     if is_dir:
-                        fi = FileInfo(child_name, "<DIR>", "<DIR>", "", True, prefix + child_name + "/", 0, 0)
+                        fi = FileInfo(child_name, "<DIR>", is_dir=True, full_path=prefix + child_name + "/")
                     else:
                         dt = info.date_time
                         try:
                             mtime = time.mktime(dt + (0, 0, -1))
-                            date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime))
-                        except: mtime, date_str = 0, ""
-                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'), 
-                                     _format_size(info.file_size), date_str, False, 
-                                     prefix + child_name, info.file_size, mtime)
+                        except: mtime = 0
+                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'),
+                                     full_path=prefix + child_name, size_bytes=info.file_size, mtime=mtime)
                     entries[child_name] = fi
         except Exception as e:
             log.error(f"[ArchiveVFS] Failed to list ZIP {self.archive_path}: {e}")
@@ -132,13 +120,10 @@ class ArchiveVFS:
 
                     is_dir = member.isdir() or len(parts) > 1
                     if is_dir:
-                        fi = FileInfo(child_name, "<DIR>", "<DIR>", "", True, prefix + child_name + "/", 0, 0)
+                        fi = FileInfo(child_name, "<DIR>", is_dir=True, full_path=prefix + child_name + "/")
                     else:
-                        mtime = member.mtime
-                        date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime))
-                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'), 
-                                     _format_size(member.size), date_str, False, 
-                                     prefix + child_name, member.size, mtime)
+                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'),
+                                     full_path=prefix + child_name, size_bytes=member.size, mtime=member.mtime)
                     entries[child_name] = fi
         except Exception as e:
             log.error(f"[ArchiveVFS] Failed to list TAR {self.archive_path}: {e}")
@@ -162,13 +147,11 @@ class ArchiveVFS:
 
                     is_dir = info.is_directory or len(parts) > 1
                     if is_dir:
-                        fi = FileInfo(child_name, "<DIR>", "<DIR>", "", True, prefix + child_name + "/", 0, 0)
+                        fi = FileInfo(child_name, "<DIR>", is_dir=True, full_path=prefix + child_name + "/")
                     else:
                         mtime = info.modified.timestamp() if info.modified else 0
-                        date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime)) if mtime else ""
-                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'), 
-                                     _format_size(info.uncompressed), date_str, False, 
-                                     prefix + child_name, info.uncompressed, mtime)
+                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'),
+                                     full_path=prefix + child_name, size_bytes=info.uncompressed, mtime=mtime)
                     entries[child_name] = fi
         except Exception as e:
             log.error(f"[ArchiveVFS] Failed to list 7z {self.archive_path}: {e}")
@@ -192,14 +175,12 @@ class ArchiveVFS:
 
                     is_dir = info.isdir() or len(parts) > 1
                     if is_dir:
-                        fi = FileInfo(child_name, "<DIR>", "<DIR>", "", True, prefix + child_name + "/", 0, 0)
+                        fi = FileInfo(child_name, "<DIR>", is_dir=True, full_path=prefix + child_name + "/")
                     else:
                         dt = info.date_time
                         mtime = time.mktime(dt + (0, 0, -1))
-                        date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime))
-                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'), 
-                                     _format_size(info.file_size), date_str, False, 
-                                     prefix + child_name, info.file_size, mtime)
+                        fi = FileInfo(child_name, os.path.splitext(child_name)[1].lstrip('.'),
+                                     full_path=prefix + child_name, size_bytes=info.file_size, mtime=mtime)
                     entries[child_name] = fi
         except Exception as e:
             log.error(f"[ArchiveVFS] Failed to list RAR {self.archive_path}: {e}")
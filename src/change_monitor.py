@@ -0,0 +1,423 @@
+"""
+Recursive change monitor for local directory trees (Linux inotify).
+
+Panels register the directory they show with change_monitor.watch(); the
+monitor thread puts an inotify watch on every directory below it
+(breadth-first, same filesystem only, at most ROOT_WATCHES per root and
+MAX_WATCHES in total; "/" and the home directory only one level deep, as
+their trees would use up the user's fs.inotify.max_user_watches) and
+turns the events into ChangeBatch objects published on
+event_bus.paths_changed. Events are coalesced for COALESCE_SECONDS, so a
+build touching 100k files produces a handful of batches listing the
+directories involved rather than 100k signals; a batch keeps individual
+paths only up to MAX_BATCH_PATHS.
+
+When the kernel queue overflows (IN_Q_OVERFLOW) the events are lost. The
+monitor then stats every watched directory and reports those whose mtime
+moved since it last looked, plus the roots in ChangeBatch.lost: content
+changes (a file rewritten in place) can't be recovered that way, so caches
+derived from file contents should drop what they hold below those roots.
+
+inotify is reached through ctypes; on other platforms watch() does nothing.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from mount_info import mount_kind, KIND_LOCAL
+from logger import log
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    _libc.inotify_init1.argtypes = [ctypes.c_int]
+    _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    HAS_INOTIFY = sys.platform.startswith("linux")
+except (OSError, AttributeError):
+    HAS_INOTIFY = False
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# Completed writes rather than every IN_MODIFY: a build writing a file in
+# many small chunks then costs one event instead of one per write()
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+              | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+
+MAX_WATCHES = 32768          # directories watched over all roots
+ROOT_WATCHES = 4096          # directories watched below one root (or a new subtree)
+COALESCE_SECONDS = 0.25      # events collected into one batch
+MAX_BATCH_PATHS = 10000      # beyond this a batch only lists directories
+READ_BUFFER = 256 * 1024
+
+_EVENT = struct.Struct("iIII")   # wd, mask, cookie, len (followed by the name)
+
+
+class ChangeBatch:
+    """Changes seen below the watched roots during one coalescing window."""
+    __slots__ = ("dirs", "paths", "lost", "_touched")
+
+    def __init__(self):
+        self.dirs = set()     # directories whose entries were created/deleted/changed
+        self.paths = set()    # changed entries; None when there were too many
+        self.lost = set()     # roots whose events overflowed (see module docstring)
+        self._touched = None
+
+    def __bool__(self):
+        return bool(self.dirs or self.lost)
+
+    def touched(self) -> set:
+        """The changed directories and lost roots with every directory above them.
+
+        Computed once per batch; receivers test many paths against it.
+        """
+        if self._touched is None:
+            touched = set()
+            for d in self.dirs | self.lost:
+                while d not in touched:
+                    touched.add(d)
+                    parent = os.path.dirname(d)
+                    if parent == d:
+                        break
+                    d = parent
+            self._touched = touched
+        return self._touched
+
+    def touches(self, path: str) -> bool:
+        """True if anything at or below path changed."""
+        path = path.rstrip(os.sep) or os.sep
+        return path in self.touched() or any(_below(path, root) for root in self.lost)
+
+
+def _below(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _shallow_roots() -> set:
+    """Roots watched one level deep only: "/" and the home directory."""
+    return {os.sep, os.path.expanduser("~").rstrip(os.sep) or os.sep}
+
+
+class InotifyWorker(QObject):
+    changed = Signal(object)   # ChangeBatch
+
+    def __init__(self):
+        super().__init__()
+        self.generation = 0
+        self._is_running = True
+        self._commands = deque()           # ("watch" | "unwatch", root)
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._fd = -1
+        self._roots = set()
+        self._wd_path = {}                 # watch descriptor -> directory
+        self._path_wd = {}                 # directory -> watch descriptor
+        self._mtimes = {}                  # directory -> mtime_ns when last looked at
+        self._full = False                 # MAX_WATCHES or the kernel limit reached
+        self._batch = ChangeBatch()
+        self._deadline = None
+
+    def stop(self):
+        self._is_running = False
+        self._wake()
+
+    def watch(self, root: str):
+        self._commands.append(("watch", root))
+        self._wake()
+
+    def unwatch(self, root: str):
+        self._commands.append(("unwatch", root))
+        self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def run(self):
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            log.error(f"[InotifyWorker] inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+            return
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        poller.register(self._wake_r, select.POLLIN)
+        try:
+            while self._is_running:
+                timeout = None
+                if self._deadline is not None:
+                    timeout = max(0, int((self._deadline - time.monotonic()) * 1000))
+                for fd, _ in poller.poll(timeout):
+                    if fd == self._fd:
+                        self._read_events()
+                    else:
+                        self._drain_wake()
+                self._run_commands()
+                batch = self._batch
+                if self._deadline is not None and (time.monotonic() >= self._deadline
+                                                   or len(batch.dirs) >= MAX_BATCH_PATHS):
+                    self._flush()
+        finally:
+            os.close(self._fd)
+            for fd in (self._wake_r, self._wake_w):
+                os.close(fd)
+
+    def _drain_wake(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _run_commands(self):
+        while self._commands:
+            command, root = self._commands.popleft()
+            if command == "watch":
+                if root not in self._roots:
+                    self._roots.add(root)
+                    t0 = time.monotonic()
+                    added = self._add_tree(root, depth=1 if root in _shallow_roots() else None)
+                    log.debug(f"[InotifyWorker] Watching {root}: {added} directories "
+                              f"in {time.monotonic() - t0:.2f}s")
+            else:
+                self._roots.discard(root)
+                for path in [p for p in self._path_wd if _below(p, root)
+                             and not any(_below(p, r) for r in self._roots)]:
+                    self._remove_watch(path)
+
+    # ------------------------------------------------------------------ watches
+    def _add_tree(self, root: str, depth: int | None = None) -> int:
+        """Watch root and the directories below it, nearest levels first.
+
+        Stops after ROOT_WATCHES new watches, or below `depth` levels.
+        """
+        try:
+            dev = os.stat(root).st_dev
+        except OSError:
+            return 0
+        added, queue = 0, deque([(root, 0)])
+        while queue and not self._full:
+            path, level = queue.popleft()
+            if path not in self._path_wd:
+                if added >= ROOT_WATCHES:
+                    log.debug(f"[InotifyWorker] {root}: watching the first {ROOT_WATCHES} directories only")
+                    break
+                if not self._add_watch(path):
+                    continue
+                added += 1
+            if depth is not None and level >= depth:
+                continue
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False) and \
+                                    entry.stat(follow_symlinks=False).st_dev == dev:
+                                queue.append((entry.path, level + 1))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return added
+
+    def _add_watch(self, path: str) -> bool:
+        if len(self._path_wd) >= MAX_WATCHES:
+            self._set_full(f"{MAX_WATCHES} directories")
+            return False
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                self._set_full("the kernel limit (fs.inotify.max_user_watches)")
+            return False
+        old = self._wd_path.get(wd)
+        if old is not None and old != path:
+            self._path_wd.pop(old, None)    # same inode under a new name (moved)
+        self._wd_path[wd] = path
+        self._path_wd[path] = wd
+        try:
+            self._mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+        return True
+
+    def _set_full(self, reason):
+        if not self._full:
+            log.warning(f"[InotifyWorker] Not watching more directories: reached {reason}")
+        self._full = True
+
+    def _remove_watch(self, path: str):
+        wd = self._path_wd.pop(path, None)
+        self._mtimes.pop(path, None)
+        if wd is not None:
+            self._wd_path.pop(wd, None)
+            _libc.inotify_rm_watch(self._fd, wd)
+            self._full = False
+
+    def _forget_below(self, path: str):
+        for p in [p for p in self._path_wd if _below(p, path)]:
+            self._remove_watch(p)
+
+    # ------------------------------------------------------------------ events
+    def _read_events(self):
+        while True:
+            try:
+                data = os.read(self._fd, READ_BUFFER)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            self._parse(data)
+
+    def _parse(self, data: bytes):
+        batch, wd_path, pos, end = self._batch, self._wd_path, 0, len(data)
+        unpack, header = _EVENT.unpack_from, _EVENT.size
+        while pos < end:
+            wd, mask, _, length = unpack(data, pos)
+            name = data[pos + header:pos + header + length].split(b"\0", 1)[0]
+            pos += header + length
+            if mask & IN_Q_OVERFLOW:
+                self._overflow()
+                continue
+            directory = wd_path.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # Watch gone: directory deleted or unmounted
+                if self._path_wd.get(directory) == wd:
+                    del self._path_wd[directory]
+                    self._mtimes.pop(directory, None)
+                del wd_path[wd]
+                self._full = False
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                batch.dirs.add(directory)
+                if mask & IN_MOVE_SELF and directory in self._roots:
+                    self._forget_below(directory)
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            batch.dirs.add(directory)
+            if batch.paths is not None:
+                batch.paths.add(path)
+                if len(batch.paths) > MAX_BATCH_PATHS:
+                    batch.paths = None
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Entries made before the watch existed are covered by reporting the dir
+                    batch.dirs.add(path)
+                    self._add_tree(path)
+                elif mask & IN_MOVED_FROM:
+                    batch.dirs.add(path)
+                    self._forget_below(path)
+        if self._deadline is None:
+            self._deadline = time.monotonic() + COALESCE_SECONDS
+
+    def _overflow(self):
+        """Events were lost: find the changed directories by their mtime."""
+        log.warning("[InotifyWorker] Event queue overflowed, rescanning watched directories")
+        batch = self._batch
+        batch.lost |= self._roots
+        for path, old in list(self._mtimes.items()):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                batch.dirs.add(path)
+                continue
+            if mtime != old:
+                self._mtimes[path] = mtime
+                batch.dirs.add(path)
+                self._add_tree(path)         # subdirectories created meanwhile
+        if self._deadline is None:
+            self._deadline = time.monotonic() + COALESCE_SECONDS
+
+    def _flush(self):
+        batch, self._batch, self._deadline = self._batch, ChangeBatch(), None
+        if batch:
+            self.changed.emit(batch)
+
+
+class InotifyThread(QThread):
+    def __init__(self):
+        super().__init__()
+        self.worker = InotifyWorker()
+        self.worker.moveToThread(self)
+        self.started.connect(self.worker.run)
+
+
+class ChangeMonitor:
+    """Reference-counted recursive watches; batches go to event_bus.paths_changed."""
+
+    def __init__(self):
+        self._thread = None
+        self._roots = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return HAS_INOTIFY
+
+    def watch(self, path: str) -> bool:
+        """Watch path recursively; False if it can't be (platform, remote mount)."""
+        if not HAS_INOTIFY or not path or mount_kind(path) != KIND_LOCAL:
+            return False
+        with self._lock:
+            self._roots[path] += 1
+            if self._roots[path] > 1:
+                return True
+            if self._thread is None:
+                from event_bus import bus
+                self._thread = InotifyThread()
+                self._thread.worker.changed.connect(bus.paths_changed)
+                self._thread.start()
+            self._thread.worker.watch(path)
+        return True
+
+    def unwatch(self, path: str):
+        with self._lock:
+            if self._roots[path] <= 0:
+                return
+            self._roots[path] -= 1
+            if not self._roots[path]:
+                del self._roots[path]
+                self._thread.worker.unwatch(path)
+
+    def roots(self):
+        return sorted(self._roots)
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._roots.clear()
+        if thread is not None:
+            thread.worker.stop()
+            thread.quit()
+            thread.wait(2000)
+
+
+# Global singleton instance
+change_monitor = ChangeMonitor()
@@ -0,0 +1,324 @@
+"""
+Computed columns – optional FileModel columns whose values are expensive.
+
+A column turns an entry's path into a short text (content type, image
+size, media duration, item count, git status). FileModel asks for a value only when a
+view paints the cell, so only visible rows are ever computed. The work runs
+on one shared thread pool, values are cached by (column, path, size,
+mtime) in ``value_cache``, and results reach the model in batches
+(see ColumnComputer).
+
+Plugins can add columns through ``columns.register(ComputedColumn(...))``.
+"""
+import mimetypes
+import os
+import threading
+import wave
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from logger import log
+import git_status
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import magic
+    HAS_MAGIC = True
+except ImportError:
+    HAS_MAGIC = False
+
+try:
+    import mutagen
+    HAS_MUTAGEN = True
+except ImportError:
+    HAS_MUTAGEN = False
+
+POOL_WORKERS = 4
+JOB_ROWS = 8          # rows per pool job, so a screenful spreads over the pool
+FLUSH_MS = 100        # results are handed to the model at most this often
+
+IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif", "bmp", "webp", "tif", "tiff", "ico", "heic"})
+MEDIA_EXTENSIONS = frozenset({"mp3", "flac", "ogg", "opus", "m4a", "aac", "wav", "wma",
+                              "mp4", "m4v", "mkv", "webm", "mov", "avi"})
+
+
+class ComputedColumn:
+    __slots__ = ("key", "title", "compute", "files", "dirs", "extensions", "width", "with_stat", "context")
+
+    def __init__(self, key, title, compute, files=True, dirs=False, extensions=None, width=90,
+                 with_stat=False, context=None):
+        self.key = key
+        self.title = title
+        # path -> text ("" when unknown), or (path, is_dir, size, mtime) -> text
+        # with with_stat, reusing the listing's stat data; runs on the pool
+        self.compute = compute
+        self.files = files
+        self.dirs = dirs
+        self.extensions = extensions    # lowercase extensions, None = every file
+        self.width = width
+        self.with_stat = with_stat
+        # directory -> state shared by the entries of that directory (e.g. the
+        # git index), built once per batch of rows. compute gets it as a last
+        # argument and values are cached per state.stamp(path, is_dir) as well
+        self.context = context
+
+    def applies(self, is_dir: bool, ext: str) -> bool:
+        if is_dir:
+            return self.dirs
+        return self.files and (self.extensions is None or ext.lower() in self.extensions)
+
+
+class ColumnRegistry:
+    def __init__(self):
+        self._columns: dict[str, ComputedColumn] = {}
+
+    def register(self, column: ComputedColumn):
+        self._columns[column.key] = column
+
+    def get(self, key: str) -> ComputedColumn | None:
+        return self._columns.get(key)
+
+    def all(self) -> list[ComputedColumn]:
+        return list(self._columns.values())
+
+
+class ValueCache:
+    """Computed texts keyed by (column key, path, size, mtime[, stamp]), shared by all panels."""
+
+    def __init__(self, maxsize=200_000):
+        self.maxsize = maxsize
+        self._texts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def text(self, column: ComputedColumn, path: str, size: int, mtime: float, is_dir: bool = False,
+             context=None) -> str:
+        key = (column.key, path, size, mtime)
+        if column.context is not None:
+            key += (context.stamp(path, is_dir),)
+        with self._lock:
+            text = self._texts.get(key)
+            if text is not None:
+                self._texts.move_to_end(key)
+                return text
+        try:
+            if column.context is not None:
+                text = column.compute(path, is_dir, size, mtime, context) or ""
+            elif column.with_stat:
+                text = column.compute(path, is_dir, size, mtime) or ""
+            else:
+                text = column.compute(path) or ""
+        except Exception as e:
+            log.debug(f"[ValueCache] {column.key} failed for {path}: {e}")
+            text = ""
+        with self._lock:
+            self._texts[key] = text
+            if len(self._texts) > self.maxsize:
+                self._texts.popitem(last=False)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._texts.clear()
+
+
+# ---------------------------------------------------------------------- built-in columns
+# (offset, magic bytes, MIME type) checked when libmagic is not installed
+_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF8", "image/gif"),
+    (0, b"BM", "image/bmp"),
+    (8, b"WEBP", "image/webp"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"PK\x03\x04", "application/zip"),
+    (0, b"\x1f\x8b", "application/gzip"),
+    (0, b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (0, b"Rar!\x1a\x07", "application/vnd.rar"),
+    (0, b"\x7fELF", "application/x-executable"),
+    (0, b"MZ", "application/x-dosexec"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"OggS", "audio/ogg"),
+    (8, b"WAVE", "audio/x-wav"),
+    (4, b"ftyp", "video/mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "video/x-matroska"),
+)
+
+
+def content_type(path: str) -> str:
+    if HAS_MAGIC:
+        return magic.from_file(path, mime=True)
+    with open(path, "rb") as f:
+        head = f.read(512)
+    for offset, sig, mime in _SIGNATURES:
+        if head.startswith(sig, offset):
+            return mime
+    if not head:
+        return "inode/x-empty"
+    guessed = mimetypes.guess_type(path)[0]
+    if b"\0" not in head:
+        try:
+            head.decode("utf-8")
+            return guessed if guessed and guessed.startswith("text/") else "text/plain"
+        except UnicodeDecodeError:
+            pass   # may be a multi-byte sequence cut at 512 bytes
+    return guessed or "application/octet-stream"
+
+
+def image_size(path: str) -> str:
+    if HAS_PIL:
+        # Image.open reads only the header; pixels are decoded on load()
+        with Image.open(path) as im:
+            w, h = im.size
+    else:
+        from PySide6.QtGui import QImageReader
+        size = QImageReader(path).size()
+        if not size.isValid():
+            return ""
+        w, h = size.width(), size.height()
+    return f"{w}×{h}"
+
+
+def media_duration(path: str) -> str:
+    seconds = None
+    if HAS_MUTAGEN:
+        audio = mutagen.File(path)
+        if audio is not None and getattr(audio, "info", None) is not None:
+            seconds = audio.info.length
+    elif path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as w:
+            seconds = w.getnframes() / float(w.getframerate())
+    if seconds is None:
+        return ""
+    seconds = int(round(seconds))
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def item_count(path: str) -> str:
+    with os.scandir(path) as it:
+        return str(sum(1 for _ in it))
+
+
+# ---------------------------------------------------------------------- computing
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="Columns")
+    return _executor
+
+
+class ColumnComputer(QObject):
+    """Computes column values for one FileModel on the shared pool.
+
+    request() collects the cells a paint pass asked for and submits them
+    together (newest first); finished values are drained by a timer every
+    FLUSH_MS and handed out as one ``ready`` batch. reset() drops
+    everything queued for the previous listing.
+    """
+    ready = Signal(object, object)   # store, [(column key, store row, text)]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._store = None
+        self._generation = 0
+        self._requested = []          # (column, row) not submitted yet
+        self._queued = set()          # (column key, row) submitted or requested
+        self._results = deque()       # (generation, key, row, text); key None ends a job
+        self._jobs = 0                # jobs submitted and not drained yet
+
+        self._submit_timer = QTimer(self)
+        self._submit_timer.setSingleShot(True)
+        self._submit_timer.setInterval(0)
+        self._submit_timer.timeout.connect(self._submit)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(FLUSH_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def reset(self, store):
+        self._store = store
+        self._generation += 1
+        self._requested = []
+        self._queued.clear()
+
+    def forget(self, key: str):
+        """Allow the cells of one column to be requested again (their inputs changed)."""
+        self._queued = {q for q in self._queued if q[0] != key}
+
+    def request(self, column: ComputedColumn, row: int):
+        key = (column.key, row)
+        if key in self._queued:
+            return
+        self._queued.add(key)
+        self._requested.append((column, row))
+        if not self._submit_timer.isActive():
+            self._submit_timer.start()
+
+    def _submit(self):
+        requested, self._requested = self._requested, []
+        st, gen = self._store, self._generation
+        # The last cells asked for are the ones on screen now
+        jobs = [(col, row, st.full_path(row), st.sizes[row], st.mtimes[row], st.is_dir[row])
+                for col, row in reversed(requested) if row < len(st)]
+        pool = _pool()
+        contexts = {}    # (column key, directory) -> context, shared by this batch's jobs
+        for start in range(0, len(jobs), JOB_ROWS):
+            self._jobs += 1
+            pool.submit(self._run, jobs[start:start + JOB_ROWS], gen, contexts)
+        if self._jobs and not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _run(self, jobs, gen, contexts):
+        """Pool thread: compute (or look up) one job's cells."""
+        try:
+            for column, row, path, size, mtime, is_dir in jobs:
+                if gen != self._generation:
+                    break     # listing replaced, the rest is not wanted
+                context = None
+                if column.context is not None:
+                    key = (column.key, os.path.dirname(path))
+                    context = contexts.get(key)
+                    if context is None:
+                        # Two jobs may both build it; either copy is valid
+                        context = contexts.setdefault(key, column.context(key[1]))
+                text = value_cache.text(column, path, size, mtime, is_dir, context)
+                self._results.append((gen, column.key, row, text))
+        finally:
+            self._results.append((gen, None, -1, ""))
+
+    def flush(self):
+        """Hand finished values of the current listing to the model."""
+        results, gen, batch = self._results, self._generation, []
+        while results:
+            rgen, key, row, text = results.popleft()
+            if key is None:
+                self._jobs -= 1
+            elif rgen == gen:
+                batch.append((key, row, text))
+        if not self._jobs:
+            self._flush_timer.stop()
+        if batch:
+            self.ready.emit(self._store, batch)
+
+
+# Global singleton instance
+columns = ColumnRegistry()
+value_cache = ValueCache()
+
+columns.register(ComputedColumn("type", "Type", content_type, width=130))
+columns.register(ComputedColumn("image_size", "Dimensions", image_size, extensions=IMAGE_EXTENSIONS))
+columns.register(ComputedColumn("duration", "Duration", media_duration, extensions=MEDIA_EXTENSIONS, width=70))
+columns.register(ComputedColumn("items", "Items", item_count, files=False, dirs=True, width=60))
+columns.register(ComputedColumn("git", "Git", git_status.status, dirs=True, width=80,
+                                with_stat=True, context=git_status.dir_state))
@@ -36,6 +36,10 @@ class EventBus(QObject):
     
     # Emitted when active panel changes directory, so tree can sync
     directory_selected = Signal(str)
+
+    # --- File System Changes ---
+    # Emitted by change_monitor with the changes seen below watched directories
+    paths_changed = Signal(object) # change_monitor.ChangeBatch
     
     # --- Appearance ---
     # Emitted when application icon is changed
@@ -1,54 +1,125 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QMimeData, QUrl
-from PySide6.QtGui import QColor, QBrush, QFont
-import qtawesome as qta
-import os, time, math
+from PySide6.QtGui import QFont, QIcon, QPixmap
+import os
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+from listing_store import ListingStore
+from prefix_index import PrefixIndex
+from sort_engine import SortEngine, UP_NAMES, COL_EXT, COL_SIZE
+from formatting import format_size
+from file_styles import styles
+from dir_compare import MARK_NAMES
+from computed_columns import ColumnComputer, columns
+from thumbnails import THUMB_EXTENSIONS
+from selection import rows_to_ranges
+
+# data() gets roles as plain ints; comparing those against the enum members
+# costs microseconds per call, so paint-path comparisons use these ints.
+DISPLAY_ROLE    = Qt.DisplayRole.value
+DECORATION_ROLE = Qt.DecorationRole.value
+FOREGROUND_ROLE = Qt.ForegroundRole.value
+ALIGNMENT_ROLE  = Qt.TextAlignmentRole.value
+BACKGROUND_ROLE = Qt.BackgroundRole.value
+ALIGN_RIGHT = Qt.AlignRight | Qt.AlignVCenter
+ALIGN_LEFT  = Qt.AlignLeft | Qt.AlignVCenter
+
+# Upper bound of rows whose display strings are memoized at once
+DISPLAY_CACHE_ROWS = 4096
+
+# apply_delta() falls back to a full reset when more than this share of the
+# rows changed – row-by-row signals would then cost more than a re-sort.
+DELTA_MAX_FRACTION = 0.25
+
+# add_rows() emits one beginInsertRows per run of a merged chunk; beyond this
+# many runs the chunk is appended and merged in a single layout change.
+MAX_INSERT_RUNS = 32
+
+BASE_HEADERS = ["Name", "Ext", "Size", "Date", "Attr", "Owner"]
+# Columns from computed_columns follow the base ones
+BASE_COLUMNS = len(BASE_HEADERS)
+
+# Thumbnail icons kept in memory per model (the disk cache has the rest)
+THUMB_MEMORY_ROWS = 2000
+
+# Shown for rows of a names-first listing until their stat() arrives
+PENDING_TEXTS = ("…", "", "", "")
+PENDING_DIR_TEXTS = ("<DIR>", "", "", "")
 
 class FileModel(QAbstractTableModel):
     def __init__(self, files=None):
         super().__init__()
-        self._source_files = files or []
-        self.files = list(self._source_files)
-        self.headers = ["Name", "Ext", "Size", "Date", "Attr", "Owner"]
+        self._order = array("I")  # view row -> store row, a permutation of range(n)
+        self._display = {}        # store row -> (size, date, attr, owner) text
+        self.headers = list(BASE_HEADERS)
+        self._extra = []          # ComputedColumn shown after the base columns
+        self.computed_local = True  # computed columns read local paths only
+        self.thumbnails_on = False  # decorate image rows with thumbnails (grid view)
+        self._computer = ColumnComputer(self)
+        self._computer.ready.connect(self._on_computed)
         
         self._sort_col = 0        # default: Name
         self._sort_asc = True     # default: ascending
-        
-        # Pre-cache icons
-        self.icon_folder = qta.icon("fa5s.folder", color="#f9e2af")
-        self.icon_file   = qta.icon("fa5s.file-alt", color="#bac2de")
-        self.icon_up     = qta.icon("fa5s.arrow-up", color="#fab387")
-        self.icon_zip    = qta.icon("fa5s.file-archive", color="#a6e3a1")
-        self.icon_exe    = qta.icon("fa5s.terminal", color="#f38ba8")
-        self.icon_img    = qta.icon("fa5s.file-image", color="#cba6f7")
+
+        # Icons/brushes come from the shared style table, resolved once per
+        # distinct extension of the listing (ext id -> FileStyle)
+        self._ext_styles = []
+        self._styles_gen = -1
+        self._prefix = None       # PrefixIndex for type-ahead, built on first use
+        self._view_rows = None    # store row -> view row, built on first use
+        self._set_store(ListingStore())
+        for sig in (self.modelReset, self.layoutChanged, self.rowsInserted, self.rowsRemoved):
+            sig.connect(self._drop_view_rows)
+
+        if files:
+            self._load(files)
+            self._apply_sort()
 
     # ------------------------------------------------------------------ sorting
-    def _sort_key(self, f):
-        """Return sort key tuple for a FileInfo object based on current column."""
-        if self._sort_col == 0:   # Name
-            return f.name.lower()
-        elif self._sort_col == 1: # Ext
-            return f.ext.lower()
-        elif self._sort_col == 2: # Size – numeric sort by raw bytes
-            return f._size_bytes
-        elif self._sort_col == 3: # Date – epoch timestamp
-            return f._mtime
-        elif self._sort_col == 4: # Attr
-            return getattr(f, "permissions", "")
-        elif self._sort_col == 5: # Owner
-            return getattr(f, "owner", "")
-        return f.name.lower()
+    def _sort_key_fn(self, sorter=None):
+        """Return a key function over store rows for the current column."""
+        return (sorter or self._sorter).key_fn(self._sort_col)
 
     def _apply_sort(self):
-        """Sort self.files keeping '..' always first, dirs before files."""
-        up    = [f for f in self.files if f.name == ".."]
-        dirs  = [f for f in self.files if f.is_dir and f.name != ".."]
-        files = [f for f in self.files if not f.is_dir]
-        dirs.sort(key=self._sort_key, reverse=not self._sort_asc)
-        files.sort(key=self._sort_key, reverse=not self._sort_asc)
-        self.files = up + dirs + files
+        """Sort self._order keeping '..' always first, dirs before files."""
+        self._order = self._sorter.order(self._sort_col, self._sort_asc, len(self._order))
+
+    def _insert_pos(self, j, lo=0, key=None):
+        """View row at which store row j belongs under the current sort."""
+        order, group_of = self._order, self._sorter.group
+        key = key or self._sort_key_fn()
+        group, k = group_of(j), key(j)
+        hi = len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            m = order[mid]
+            gm = group_of(m)
+            if gm < group or (gm == group and (key(m) <= k if self._sort_asc else key(m) >= k)):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def resort(self):
+        """Re-apply the current sort after row metadata changed, keeping selection."""
+        if self._sort_col <= COL_EXT:
+            return        # name/ext don't depend on stat data
+        self.layoutAboutToBeChanged.emit()
+        old = self._order
+        self._apply_sort()
+        view_row = array("I", bytes(4 * len(old)))
+        for r, i in enumerate(self._order):
+            view_row[i] = r
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self.index(view_row[old[ix.row()]], ix.column()) for ix in persistent])
+        self.layoutChanged.emit()
 
     def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
         """Called by QHeaderView when user clicks a column header."""
+        if column >= BASE_COLUMNS:
+            return    # computed values exist for visible rows only
         self._sort_col = column
         self._sort_asc = (order == Qt.SortOrder.AscendingOrder)
         self.layoutAboutToBeChanged.emit()
@@ -58,47 +129,145 @@ class FileModel(QAbstractTableModel):
     # ------------------------------------------------------------------ Qt API
     def rowCount(self, parent=QModelIndex()):
         if parent.isValid(): return 0
-        return len(self.files)
+        return len(self._order)
 
     def columnCount(self, parent=QModelIndex()):
         return len(self.headers)
 
-    def data(self, index, role=Qt.DisplayRole):
+    def data(self, index, role=DISPLAY_ROLE):
         if not index.isValid():
             return None
-            
-        file = self.files[index.row()]
-        col  = index.column()
-
-        if role == Qt.DecorationRole and col == 0:
-            if file.name == "..": return self.icon_up
-            if file.is_dir: return self.icon_folder
-            ext = file.ext.lower()
-            if ext in ["zip", "7z", "rar", "tar", "gz"]: return self.icon_zip
-            if ext in ["exe", "bat", "cmd", "sh", "py"]:  return self.icon_exe
-            if ext in ["jpg", "jpeg", "png", "gif", "bmp", "svg"]: return self.icon_img
-            return self.icon_file
-
-        if role == Qt.ForegroundRole:
-            if file.is_dir:    return QBrush(QColor("#f9e2af"))
-            if file.name == "..": return QBrush(QColor("#fab387"))
-
-        if role == Qt.TextAlignmentRole:
-            if col in [1, 2]:
-                return Qt.AlignRight | Qt.AlignVCenter
-            return Qt.AlignLeft | Qt.AlignVCenter
-
-        if role != Qt.DisplayRole:
+        if type(role) is not int:
+            role = role.value
+
+        i   = self._order[index.row()]
+        col = index.column()
+
+        if role == DISPLAY_ROLE:
+            st = self.store
+            if col == 0: return st.name(i)
+            if col == 1: return st.ext(i)
+            if col < BASE_COLUMNS:
+                return self._display_texts(i)[col - 2]
+            if col < len(self.headers):
+                return self._computed_text(i, self._extra[col - BASE_COLUMNS])
+            return None
+
+        if role == DECORATION_ROLE:
+            if col != 0:
+                return None
+            if self.thumbnails_on:
+                icon = self._thumbs.get(i)
+                if icon:
+                    return icon
+            return self._style(i).icon
+
+        if role == FOREGROUND_ROLE:
+            return self._style(i).brush
+
+        if role == ALIGNMENT_ROLE:
+            return ALIGN_RIGHT if col in (1, 2) else ALIGN_LEFT
+
+        if role == BACKGROUND_ROLE:
+            marks = self._marks
+            if marks is not None and i < len(marks) and marks[i]:
+                return styles.mark_brush(MARK_NAMES[marks[i]])
             return None
 
-        if col == 0: return file.name
-        if col == 1: return file.ext
-        if col == 2: return file.size
-        if col == 3: return file.date
-        if col == 4: return getattr(file, "permissions", "")
-        if col == 5: return getattr(file, "owner", "")
         return None
 
+    def _style(self, i):
+        if self._styles_gen != styles.generation:
+            self._resolve_styles()
+        st = self.store
+        if st.is_dir[i]:
+            return self._up_style if st.name(i) in UP_NAMES else self._dir_style
+        ext_id = st.ext_ids[i]
+        if ext_id >= len(self._ext_styles):
+            self._resolve_styles()
+        return self._ext_styles[ext_id]
+
+    def _resolve_styles(self):
+        """Look up styles for extensions not resolved yet (all after a theme change)."""
+        if self._styles_gen != styles.generation:
+            self._ext_styles = []
+            self._dir_style = styles.style("dir")
+            self._up_style = styles.style("up")
+            self._styles_gen = styles.generation
+        exts = self.store.exts
+        self._ext_styles.extend(styles.for_entry(e) for e in exts[len(self._ext_styles):])
+
+    def _display_texts(self, i):
+        """Format size/date/attr/owner for a store row on first paint only."""
+        texts = self._display.get(i)
+        if texts is None:
+            st = self.store
+            if i in st.pending:
+                return PENDING_DIR_TEXTS if st.is_dir[i] else PENDING_TEXTS
+            if len(self._display) >= DISPLAY_CACHE_ROWS:
+                self._display.clear()
+            size = self._dir_sizes.get(i)
+            size_text = st.size_text(i) if size is None else format_size(size)
+            texts = (size_text, st.date_text(i), st.permissions(i), st.owner(i))
+            self._display[i] = texts
+        return texts
+
+    # ------------------------------------------------------------------ computed columns
+    def set_extra_columns(self, keys):
+        """Show the computed columns with these keys after the base columns."""
+        extra = [c for c in map(columns.get, keys) if c is not None]
+        if [c.key for c in extra] == [c.key for c in self._extra]:
+            return
+        self.beginResetModel()
+        self._extra = extra
+        self.headers = BASE_HEADERS + [c.title for c in extra]
+        self._computed = {c.key: {} for c in extra}
+        self._computer.reset(self.store)
+        self.endResetModel()
+
+    def extra_columns(self):
+        return list(self._extra)
+
+    def refresh_column(self, key):
+        """Recompute a computed column whose values went stale (e.g. git index changed)."""
+        if key not in self._computed:
+            return
+        self._computed[key] = {}
+        self._computer.forget(key)
+        if self._order:
+            col = BASE_COLUMNS + [c.key for c in self._extra].index(key)
+            self.dataChanged.emit(self.index(0, col), self.index(len(self._order) - 1, col), [Qt.DisplayRole])
+
+    def _computed_text(self, i, column):
+        texts = self._computed[column.key]
+        text = texts.get(i)
+        if text is None:
+            st = self.store
+            if not (self.computed_local and column.applies(st.is_dir[i], st.ext(i))) \
+                    or st.name(i) in UP_NAMES:
+                text = texts[i] = ""
+            elif i not in st.pending:
+                self._computer.request(column, i)   # painted, so it is visible
+            return text or ""
+        return text
+
+    def _on_computed(self, store, batch):
+        """Values arrived from the pool: one dataChanged per run of view rows."""
+        if store is not self.store:
+            return
+        changed = {}
+        for key, row, text in batch:
+            texts = self._computed.get(key)
+            if texts is not None:
+                texts[row] = text
+                changed.setdefault(key, []).append(row)
+        col_of = {c.key: BASE_COLUMNS + n for n, c in enumerate(self._extra)}
+        for key, rows in changed.items():
+            col = col_of[key]
+            view_rows = sorted(r for r in map(self.view_row, rows) if r >= 0)
+            for first, last in rows_to_ranges(view_rows):
+                self.dataChanged.emit(self.index(first, col), self.index(last, col), [Qt.DisplayRole])
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if orientation == Qt.Horizontal:
             if role == Qt.DisplayRole:
@@ -112,49 +281,346 @@ class FileModel(QAbstractTableModel):
                 return f
         return None
 
+    def _set_store(self, store, sorter=None):
+        self.store = store
+        self._sorter = sorter or SortEngine(store)
+        self._marks = None        # dir_compare mark per store row
+        self._dir_sizes = {}      # store row -> calculated folder size (folder_sizes)
+        self._thumbs = OrderedDict()  # store row -> QIcon, None if it has no thumbnail
+        self._computed = {c.key: {} for c in self._extra}   # column key -> {store row: text}
+        self._computer.reset(store)
+        self._ext_styles = []
+        self._resolve_styles()
+
+    def _load(self, files):
+        """Adopt a ListingStore, or build one from a list of FileInfo."""
+        if not isinstance(files, ListingStore):
+            files = ListingStore.from_infos(files or [])
+        self._set_store(files)
+        self._order = array("I", range(len(files)))
+        self._display = {}
+
     def update_files(self, files):
         self.beginResetModel()
-        self.files = list(files)
+        self._load(files)
         self._apply_sort()
         self.endResetModel()
 
-    def clear_for_scan(self):
+    def apply_delta(self, new_store):
+        """Switch to a re-scan of the current directory with minimal updates.
+
+        Rows are matched by name: vanished entries are removed, new ones are
+        inserted at their sorted position and modified ones get dataChanged
+        (or are moved if their sort key changed). Unchanged rows keep their
+        position, so selection and scroll state survive.
+        """
+        old = self.store
+        new_index = new_store.name_index()
+        new_sorter = SortEngine(new_store)
+        # Calculated folder sizes stay with directories that did not change
+        dir_sizes = {}
+        for i, size in self._dir_sizes.items():
+            j = new_index.get(old.name(i))
+            if j is not None and new_store.is_dir[j] and old.same_entry(i, new_store, j):
+                dir_sizes[j] = size
+        if dir_sizes:
+            new_sorter.set_dir_sizes(dir_sizes)
+        old_key, new_key = self._sort_key_fn(), self._sort_key_fn(new_sorter)
+
+        removed, kept, changed, moved = [], array("I"), [], []
+        for view_row, i in enumerate(self._order):
+            j = new_index.pop(old.name(i), None)
+            if j is None:
+                removed.append(view_row)
+            elif old.same_entry(i, new_store, j):
+                kept.append(j)
+            elif old.is_dir[i] != new_store.is_dir[j] or old_key(i) != new_key(j):
+                removed.append(view_row)
+                moved.append(j)
+            else:
+                kept.append(j)
+                changed.append(j)
+        added = moved + sorted(new_index.values())
+
+        if len(removed) + len(added) > DELTA_MAX_FRACTION * len(self._order) + 16:
+            self.update_files(new_store)
+            return
+
+        # 1. Remove vanished/moved rows, bottom-up in contiguous ranges
+        for first, last in reversed(rows_to_ranges(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._order[first:last + 1]
+            self.endRemoveRows()
+
+        # 2. Point the surviving rows at the new store; indices are unchanged
+        old_rows = {j: i for i, j in zip(self._order, kept)}
+        stale = set(changed)
+        self._display = {j: self._display[old_rows[j]] for j in kept
+                         if j not in stale and old_rows[j] in self._display}
+        computed, thumbs = self._computed, self._thumbs
+        self._set_store(new_store, new_sorter)
+        self._dir_sizes = dir_sizes
+        self._order = kept
+        # No signal announces the swap: the inverse still maps old store rows
+        self._drop_view_rows()
+        for key, texts in computed.items():
+            self._computed[key] = {j: texts[old_rows[j]] for j in kept
+                                   if j not in stale and old_rows[j] in texts}
+        self._thumbs.update((j, thumbs[old_rows[j]]) for j in kept
+                            if j not in stale and old_rows[j] in thumbs)
+
+        if changed:
+            pos = {j: r for r, j in enumerate(kept)}
+            last_col = len(self.headers) - 1
+            for r in sorted(pos[j] for j in changed):
+                self.dataChanged.emit(self.index(r, 0), self.index(r, last_col))
+
+        # 3. Insert new/moved entries at their sorted position
+        key = self._sort_key_fn()
+        for j in added:
+            r = self._insert_pos(j, 0, key)
+            self.beginInsertRows(QModelIndex(), r, r)
+            self._order.insert(r, j)
+            self.endInsertRows()
+
+    def clear_for_scan(self, store=None):
+        """Start a new listing; rows are published later via add_rows()."""
         self.beginResetModel()
-        self.files = []
+        self._set_store(store if store is not None else ListingStore())
+        self._order = array("I")
+        self._display = {}
         self.endResetModel()
 
+    def add_rows(self, store, start, end):
+        """Publish store rows [start, end) produced by a worker.
+
+        The chunk is sorted on its own and merged into the already sorted
+        rows, so the view is in final order while the scan is still running.
+        """
+        if store is not self.store or end <= start: return
+        self._resolve_styles()
+        key = self._sort_key_fn()
+        chunk = sorted(range(start, end), key=key, reverse=not self._sort_asc)
+        chunk.sort(key=self._sorter.group)
+
+        # Insertion point of every chunk row in the current order (non-decreasing)
+        positions, pos = [], 0
+        for j in chunk:
+            pos = self._insert_pos(j, pos, key)
+            positions.append(pos)
+        runs = []  # (position, [store rows])
+        for p, j in zip(positions, chunk):
+            if runs and runs[-1][0] == p:
+                runs[-1][1].append(j)
+            else:
+                runs.append((p, [j]))
+
+        if len(runs) <= MAX_INSERT_RUNS:
+            shift = 0
+            for p, rows in runs:
+                r = p + shift
+                self.beginInsertRows(QModelIndex(), r, r + len(rows) - 1)
+                self._order[r:r] = array("I", rows)
+                self.endInsertRows()
+                shift += len(rows)
+            return
+
+        # Many scattered runs: append, then merge in one layout change
+        order = self._order
+        n = len(order)
+        self.beginInsertRows(QModelIndex(), n, n + len(chunk) - 1)
+        order.extend(chunk)
+        self.endInsertRows()
+
+        self.layoutAboutToBeChanged.emit()
+        merged, prev = array("I"), 0
+        for p, rows in runs:
+            merged.extend(order[prev:p])
+            merged.extend(rows)
+            prev = p
+        merged.extend(order[prev:n])
+        self._order = merged
+
+        def new_row(r):
+            if r < n:
+                return r + bisect_right(positions, r)
+            t = r - n
+            return positions[t] + t
+        old = self.persistentIndexList()
+        self.changePersistentIndexList(old, [self.index(new_row(ix.row()), ix.column()) for ix in old])
+        self.layoutChanged.emit()
+
+    def update_rows(self, store, rows):
+        """Metadata of store rows arrived (names-first listing, see StatWorker)."""
+        if store is not self.store or not self._order: return
+        display = self._display
+        for i in rows:
+            display.pop(i, None)
+        self._sorter.invalidate()
+        # One signal for the metadata columns; views repaint only what's visible
+        self.dataChanged.emit(self.index(0, 2), self.index(len(self._order) - 1, len(self.headers) - 1))
+
+    def set_dir_sizes(self, store, sizes):
+        """Calculated folder sizes arrived: [(store row, bytes)] for directory rows."""
+        if store is not self.store: return
+        display = self._display
+        for row, size in sizes:
+            self._dir_sizes[row] = size
+            display.pop(row, None)
+        self._sorter.set_dir_sizes(self._dir_sizes)
+        view_rows = sorted(r for r in (self.view_row(row) for row, _ in sizes) if r >= 0)
+        for first, last in rows_to_ranges(view_rows):
+            self.dataChanged.emit(self.index(first, COL_SIZE), self.index(last, COL_SIZE), [Qt.DisplayRole])
+
+    def dir_size(self, store_row):
+        return self._dir_sizes.get(store_row)
+
+    def dir_rows(self):
+        """Store rows of the directories in view ('..' excluded), in view order."""
+        st = self.store
+        return [i for i in self._order if st.is_dir[i] and st.name(i) not in UP_NAMES]
+
+    def thumb_rows(self, store_rows):
+        """Rows among store_rows that still need a thumbnail, order kept."""
+        st, thumbs = self.store, self._thumbs
+        return [i for i in store_rows
+                if i not in thumbs and not st.is_dir[i] and i not in st.pending
+                and st.ext(i).lower() in THUMB_EXTENSIONS]
+
+    def set_thumbnails(self, store, items):
+        """Thumbnails arrived: [(store row, QImage or None)]."""
+        if store is not self.store: return
+        thumbs = self._thumbs
+        for row, image in items:
+            thumbs[row] = QIcon(QPixmap.fromImage(image)) if image is not None else None
+            thumbs.move_to_end(row)
+        while len(thumbs) > THUMB_MEMORY_ROWS:
+            thumbs.popitem(last=False)
+        view_rows = sorted(r for r in (self.view_row(row) for row, _ in items) if r >= 0)
+        for first, last in rows_to_ranges(view_rows):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, 0), [Qt.DecorationRole])
+
+    def set_marks(self, store, marks):
+        """Show directory comparison marks (array indexed by store row, None clears)."""
+        if store is not self.store: return False
+        self._marks = marks
+        if self._order:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._order) - 1, len(self.headers) - 1),
+                                  [Qt.BackgroundRole])
+        return True
+
+    def marked_rows(self, kinds):
+        """View rows whose comparison mark is one of kinds, ascending."""
+        marks = self._marks
+        if marks is None: return []
+        n = len(marks)
+        return [r for r, i in enumerate(self._order) if i < n and marks[i] in kinds]
+
     def add_files(self, new_files):
         if not new_files: return
-        start_row = len(self.files)
-        end_row = start_row + len(new_files) - 1
-        self.beginInsertRows(QModelIndex(), start_row, end_row)
-        self.files.extend(new_files)
-        self.endInsertRows()
+        start = len(self.store)
+        for fi in new_files:
+            self.store.append_info(fi)
+        self.add_rows(self.store, start, len(self.store))
+
+    def view_names(self):
+        """Names in view order, read lazily from a snapshot of the order."""
+        st, order = self.store, array("I", self._order)
+        return (st.name(i) for i in order)
+
+    def store_rows(self, rows):
+        """Store rows behind the given view rows (invalid rows are skipped)."""
+        order = self._order
+        return [order[r] for r in rows if 0 <= r < len(order)]
+
+    def prefix_index(self):
+        """Sorted name index of the current listing, brought up to date."""
+        if self._prefix is None or self._prefix.store is not self.store:
+            self._prefix = PrefixIndex(self.store)
+        self._prefix.update()
+        return self._prefix
+
+    def view_row(self, store_row):
+        """View row showing a store row, or -1 if it isn't published (yet)."""
+        inv = self._view_rows
+        if inv is None:
+            inv = array("l", [-1]) * len(self.store)
+            for r, i in enumerate(self._order):
+                inv[i] = r
+            self._view_rows = inv
+        return inv[store_row] if store_row < len(inv) else -1
+
+    def _drop_view_rows(self, *args):
+        self._view_rows = None
 
     def get_file(self, row):
-        if 0 <= row < len(self.files):
-            return self.files[row]
+        if 0 <= row < len(self._order):
+            return self.store.file_info(self._order[row])
         return None
 
+    def store_rows_in(self, ranges):
+        """Store rows behind inclusive (first, last) view-row ranges, in view order."""
+        order, rows = self._order, array("I")
+        for first, last in ranges:
+            rows.extend(order[first:last + 1])
+        return rows
+
+    def match_rows(self, test):
+        """View rows of files (not dirs) whose name passes test, ascending."""
+        st = self.store
+        is_dir, name = st.is_dir, st.name
+        return [r for r, i in enumerate(self._order) if not is_dir[i] and test(name(i))]
+
     # --- DND Support ---
     def mimeTypes(self):
         return ['text/uri-list']
 
     def mimeData(self, indexes):
-        mime_data = QMimeData()
-        urls = []
         # Get unique rows from indexes (multiple columns selected for same row)
         rows = sorted(set(index.row() for index in indexes))
-        for row in rows:
-            f = self.files[row]
-            if f and f.name != "..":
+        return self.mime_for(array("I", (self._order[r] for r in rows)))
+
+    def mime_for(self, store_rows):
+        """Drag data for store rows; the URLs are built only when a target asks."""
+        return LazyUriMimeData(self.store, store_rows)
+
+
+class LazyUriMimeData(QMimeData):
+    """text/uri-list for a snapshot of store rows, materialised on first request.
+
+    Starting a drag of 100k rows only stores the row array; the QUrl list is
+    built when a drop target (or urls()) reads the data.
+    """
+    def __init__(self, store, rows):
+        super().__init__()
+        self._store = store
+        self._rows = rows
+        self._urls = None
+
+    def formats(self):
+        return ['text/uri-list']
+
+    def hasFormat(self, mime_type):
+        return mime_type == 'text/uri-list'
+
+    def retrieveData(self, mime_type, preferred_type):
+        if mime_type != 'text/uri-list':
+            return None
+        if self._urls is None:
+            self._urls = self._build_urls()
+        return self._urls
+
+    def _build_urls(self):
+        urls = []
+        st = self._store
+        for i in self._rows:
+            if st.name(i) not in UP_NAMES:
+                full_path = st.full_path(i)
                 # For VFS files, we use their full_path but OS might not like it
                 # For local files, QUrl.fromLocalFile works best
-                if os.path.isabs(f.full_path) and os.path.exists(f.full_path):
-                    urls.append(QUrl.fromLocalFile(f.full_path))
+                if os.path.isabs(full_path) and os.path.exists(full_path):
+                    urls.append(QUrl.fromLocalFile(full_path))
                 else:
                     # Fallback for VFS or non-absolute paths
-                    urls.append(QUrl(f.full_path))
-        
-        mime_data.setUrls(urls)
-        return mime_data
+                    urls.append(QUrl(full_path))
+        return urls
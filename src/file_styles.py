@@ -0,0 +1,145 @@
+"""
+File styles – shared extension -> (icon, brush, category) table for FileModel.
+
+One table serves every FileModel (all panels and tabs), so icons and brushes
+are created once per process instead of per model. Categories map to an
+icon and a colour role of the current theme; extensions map to categories.
+
+Themes recolour the table through set_theme() and may override single
+categories via theme_manager.THEME_FILE_STYLES; plugins can add categories
+or extensions by exporting ``file_styles`` (see plugin_manager):
+
+    file_styles = {
+        "video": {"icon": "fa5s.file-video", "color": "pink",
+                  "extensions": ["mp4", "mkv"]},
+    }
+
+Colours are theme role names (see theme_manager.THEMES) or literal hex.
+"""
+from theme_manager import ThemeManager, THEME_FILE_STYLES
+from logger import log
+
+
+class FileStyle:
+    __slots__ = ("category", "icon", "brush")
+
+    def __init__(self, category, icon, brush):
+        self.category = category
+        self.icon = icon
+        self.brush = brush       # foreground brush, None = default text colour
+
+
+class FileStyleTable:
+    # category -> (icon name, icon colour, text colour or None)
+    DEFAULT_CATEGORIES = {
+        "up":      ("fa5s.arrow-up", "peach", "yellow"),
+        "dir":     ("fa5s.folder", "yellow", "yellow"),
+        "file":    ("fa5s.file-alt", "#bac2de", None),
+        "archive": ("fa5s.file-archive", "green", None),
+        "exec":    ("fa5s.terminal", "red", None),
+        "image":   ("fa5s.file-image", "mauve", None),
+    }
+    DEFAULT_EXTENSIONS = {
+        "archive": ("zip", "7z", "rar", "tar", "gz"),
+        "exec":    ("exe", "bat", "cmd", "sh", "py"),
+        "image":   ("jpg", "jpeg", "png", "gif", "bmp", "svg"),
+    }
+    # Directory comparison mark -> row background colour (see dir_compare)
+    MARK_COLORS = {
+        "newer":     "green",
+        "older":     "red",
+        "unique":    "blue",
+        "different": "yellow",
+    }
+    MARK_ALPHA = 48
+
+    def __init__(self):
+        self._styles: dict[str, FileStyle] = {}   # built lazily (needs a QApplication)
+        self._mark_brushes = {}
+        # Bumped whenever styles change; models re-resolve their entries then
+        self.generation = 0
+        self._categories = dict(self.DEFAULT_CATEGORIES)
+        self._theme_categories: dict[str, tuple] = {}
+        self._palette = ThemeManager.get_theme_colors("Mocha")
+        self._ext_category: dict[str, str] = {}
+        for category, exts in self.DEFAULT_EXTENSIONS.items():
+            self.register_extensions(category, exts)
+
+    # ------------------------------------------------------------------ extension points
+    def register_category(self, category: str, icon: str, color: str, text_color: str | None = None):
+        self._categories[category] = (icon, color, text_color)
+        self._invalidate()
+
+    def register_extensions(self, category: str, extensions):
+        for ext in extensions:
+            self._ext_category[ext.lower().lstrip(".")] = category
+        self._invalidate()
+
+    def register(self, spec: dict):
+        """Register {category: {"icon", "color", "text_color", "extensions"}}."""
+        for category, entry in spec.items():
+            if "icon" in entry:
+                self.register_category(category, entry["icon"], entry.get("color", "text"),
+                                       entry.get("text_color"))
+            self.register_extensions(category, entry.get("extensions", ()))
+
+    def set_theme(self, theme_name: str):
+        self._palette = ThemeManager.get_theme_colors(theme_name)
+        self._theme_categories = {}
+        for category, entry in THEME_FILE_STYLES.get(theme_name, {}).items():
+            icon, color, text_color = self._categories.get(category, self._categories["file"])
+            self._theme_categories[category] = (entry.get("icon", icon), entry.get("color", color),
+                                                entry.get("text_color", text_color))
+        self._invalidate()
+
+    def _invalidate(self):
+        self._styles = {}
+        self._mark_brushes = {}
+        self.generation += 1
+
+    # ------------------------------------------------------------------ lookup
+    def category_for(self, ext: str, is_dir: bool = False, is_up: bool = False) -> str:
+        if is_up:
+            return "up"
+        if is_dir:
+            return "dir"
+        return self._ext_category.get(ext.lower(), "file")
+
+    def style(self, category: str) -> FileStyle:
+        style = self._styles.get(category)
+        if style is None:
+            style = self._styles[category] = self._build(category)
+        return style
+
+    def for_entry(self, ext: str, is_dir: bool = False, is_up: bool = False) -> FileStyle:
+        return self.style(self.category_for(ext, is_dir, is_up))
+
+    def mark_brush(self, mark: str):
+        """Translucent background brush for a comparison mark, None for unmarked."""
+        brush = self._mark_brushes.get(mark)
+        if brush is None and mark in self.MARK_COLORS:
+            from PySide6.QtGui import QBrush, QColor
+            color = QColor(self._color(self.MARK_COLORS[mark]))
+            color.setAlpha(self.MARK_ALPHA)
+            brush = self._mark_brushes[mark] = QBrush(color)
+        return brush
+
+    def _build(self, category):
+        import qtawesome as qta
+        from PySide6.QtGui import QBrush, QColor
+        icon_name, color, text_color = (self._theme_categories.get(category)
+                                        or self._categories.get(category, self._categories["file"]))
+        try:
+            icon = qta.icon(icon_name, color=self._color(color))
+        except Exception as e:
+            log.error(f"[FileStyleTable] Bad icon '{icon_name}' for {category}: {e}")
+            icon = qta.icon(self._categories["file"][0], color=self._color(self._categories["file"][1]))
+        brush = QBrush(QColor(self._color(text_color))) if text_color else None
+        return FileStyle(category, icon, brush)
+
+    def _color(self, color: str) -> str:
+        return color if color.startswith("#") else self._palette.get(color, color)
+
+
+# Global singleton instance
+styles = FileStyleTable()
@@ -0,0 +1,178 @@
+"""
+Filter engine for the panel filter bar.
+
+Names are indexed once per listing (lowercased, in view order, plus one
+newline-joined buffer for C-speed substring scans). Queries support four
+modes chosen from the text itself:
+
+    text        substring (default)
+    *.py, a?c   glob – any of * ? [ switches to glob matching
+    re:pat      regular expression
+    ~abc        fuzzy – the letters in order, anything in between
+
+When a query only narrows the previous one (e.g. "rep" -> "repo") the
+previous match set is re-checked instead of the whole listing.
+FilterThread runs a query off the UI thread for very large listings.
+"""
+import fnmatch
+import re
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+MODE_SUBSTRING, MODE_GLOB, MODE_REGEX, MODE_FUZZY = "substring", "glob", "regex", "fuzzy"
+
+# Check the stop flag this often while matching row by row
+_STOP_CHECK_ROWS = 4096
+
+
+def parse_query(text: str):
+    """Return (mode, query) for the raw filter bar text."""
+    if text.startswith("re:"):
+        return MODE_REGEX, text[3:]
+    if text.startswith("~"):
+        return MODE_FUZZY, text[1:].lower()
+    if any(c in text for c in "*?["):
+        return MODE_GLOB, text.lower()
+    return MODE_SUBSTRING, text.lower()
+
+
+class FilterEngine:
+    def __init__(self, names):
+        # names may be a lazy iterable; it is consumed by the first match,
+        # which for large listings already runs in FilterThread
+        self._source = names
+        self._names = None
+        self._buffer = None          # built on the first full substring scan
+        self._starts = None
+        self._last = None            # (mode, query, rows) of the previous match
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = [n.lower() for n in self._source]
+            self._source = None
+        return self._names
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, text: str, should_stop=None):
+        """Rows (ascending) whose name matches text, or None if stopped."""
+        mode, query = parse_query(text)
+        if not query:
+            self._last = None
+            return array("I", range(len(self.names)))
+
+        candidates = None
+        if self._last and self._narrows(self._last[0], self._last[1], mode, query):
+            candidates = self._last[2]
+
+        try:
+            if mode == MODE_SUBSTRING and candidates is None:
+                rows = self._scan_buffer(query)
+            else:
+                test = self._predicate(mode, query)
+                rows = self._filter(test, candidates, should_stop)
+        except re.error:
+            return array("I")            # incomplete regex while typing
+        if rows is None:
+            return None
+        self._last = (mode, query, rows)
+        return rows
+
+    @staticmethod
+    def _narrows(old_mode, old_query, mode, query):
+        """True if every match of the new query also matches the old one."""
+        if old_mode != mode or not old_query:
+            return False
+        if mode == MODE_SUBSTRING:
+            return old_query in query
+        if mode == MODE_FUZZY:
+            return _is_subsequence(old_query, query)
+        return False
+
+    @staticmethod
+    def _predicate(mode, query):
+        if mode == MODE_SUBSTRING:
+            return lambda name: query in name
+        if mode == MODE_GLOB:
+            return re.compile(fnmatch.translate(query)).match
+        if mode == MODE_FUZZY:
+            return re.compile(".*?".join(map(re.escape, query))).search
+        return re.compile(query, re.IGNORECASE).search
+
+    def _filter(self, test, candidates, should_stop):
+        names = self.names
+        rows = array("I")
+        source = candidates if candidates is not None else range(len(names))
+        for n, i in enumerate(source):
+            if should_stop and n % _STOP_CHECK_ROWS == 0 and should_stop():
+                return None
+            if test(names[i]):
+                rows.append(i)
+        return rows
+
+    def _scan_buffer(self, query):
+        # One str.find per hit over the joined names instead of one test per row
+        if self._buffer is None:
+            # _starts first: another thread treats a set _buffer as ready
+            self._starts = array("Q", accumulate((len(n) + 1 for n in self.names), initial=0))
+            self._buffer = "\n".join(self.names)
+        buf, starts = self._buffer, self._starts
+        rows = array("I")
+        pos = buf.find(query)
+        while pos != -1:
+            row = bisect_right(starts, pos) - 1
+            rows.append(row)
+            pos = buf.find(query, starts[row + 1])
+        return rows
+
+
+def name_matcher(text: str):
+    """Test of a single name against the filter text, as FilterEngine.match() does.
+
+    Used for rows added to a listing while it is filtered.
+    """
+    mode, query = parse_query(text)
+    if not query:
+        return lambda name: True
+    try:
+        test = FilterEngine._predicate(mode, query)
+    except re.error:
+        return lambda name: False
+    return lambda name: bool(test(name.lower()))
+
+
+def _is_subsequence(needle, haystack):
+    it = iter(haystack)
+    return all(c in it for c in needle)
+
+
+class FilterWorker(QObject):
+    finished = Signal(int, object)  # generation, matching rows (None if stopped)
+
+    def __init__(self, engine, text, generation):
+        super().__init__()
+        self.engine = engine
+        self.text = text
+        self.generation = generation
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+
+    def run(self):
+        rows = self.engine.match(self.text, lambda: not self._is_running)
+        self.finished.emit(self.generation, rows)
+
+
+class FilterThread(QThread):
+    def __init__(self, engine, text, generation):
+        super().__init__()
+        self.worker = FilterWorker(engine, text, generation)
+        self.worker.moveToThread(self)
+        self.started.connect(self.worker.run)
+        self.worker.finished.connect(self.quit)
@@ -0,0 +1,284 @@
+"""
+Filter proxy for FilePanel – a QAbstractProxyModel backed by FilterEngine.
+
+Replaces QSortFilterProxyModel for the filter bar: instead of re-testing
+every source row on each keystroke, the matching source rows come from the
+name index of FilterEngine, and the proxy only maps rows through an array.
+
+Source changes are passed on as the same fine-grained signals: without a
+filter they are forwarded as they are, with one the row array is remapped
+in place (inserted rows are tested one by one, sorting maps the matches
+through their store rows), so cursor and selection survive streamed
+chunks, deltas and header sorts.
+"""
+from array import array
+from bisect import bisect_left
+
+from PySide6.QtCore import Qt, QAbstractProxyModel, QModelIndex
+
+from filter_engine import FilterEngine, FilterThread, name_matcher
+from logger import log
+from selection import rows_to_ranges
+
+# Listings above this size are filtered in a background thread
+ASYNC_ROWS = 100_000
+
+
+class FilterProxyModel(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = None             # proxy row -> source row (ascending); None = all rows
+        self._text = ""
+        self._engine = None           # rebuilt lazily after source changes
+        self._generation = 0
+        self._threads = []
+        self._pending = False         # a FilterThread for the current text is running
+        self._removing = (0, 0)       # proxy rows [first, last) of a source removal
+        self._layout = []             # (proxy index, [store row]) across a layout change
+        self._layout_rows = None      # store rows of the matches across a layout change
+
+    # ------------------------------------------------------------------ source
+    def _source_slots(self, model):
+        return [(model.modelAboutToBeReset, self._on_source_about_to_reset),
+                (model.modelReset, self._on_source_reset),
+                (model.rowsAboutToBeInserted, self._on_rows_about_to_be_inserted),
+                (model.rowsInserted, self._on_rows_inserted),
+                (model.rowsAboutToBeRemoved, self._on_rows_about_to_be_removed),
+                (model.rowsRemoved, self._on_rows_removed),
+                (model.layoutAboutToBeChanged, self._on_layout_about_to_change),
+                (model.layoutChanged, self._on_layout_changed),
+                (model.dataChanged, self._on_source_data_changed)]
+
+    def setSourceModel(self, model):
+        old = self.sourceModel()
+        if old is not None:
+            for sig, slot in self._source_slots(old):
+                sig.disconnect(slot)
+        self.beginResetModel()
+        super().setSourceModel(model)
+        self._engine = None
+        self._rows = None
+        self.endResetModel()
+        for sig, slot in self._source_slots(model):
+            sig.connect(slot)
+
+    def _on_source_about_to_reset(self):
+        self._generation += 1
+        self._pending = False
+        for t in self._threads:
+            t.worker.stop()
+        self.beginResetModel()
+
+    def _on_source_reset(self):
+        self._engine = None
+        large = self.sourceModel().rowCount() >= ASYNC_ROWS
+        if not self._text:
+            self._rows = None
+        elif large:
+            self._rows = array("I")       # filled in by the FilterThread started below
+        else:
+            self._rows = self._source_engine().match(self._text)
+        self.endResetModel()
+        if self._text and large:
+            self._refilter()
+
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        self._engine = None
+        if self._rows is None:
+            self.endInsertRows()
+        else:
+            # Source rows from `first` move down; matching new rows land together at k
+            src, rows, n = self.sourceModel(), self._rows, last - first + 1
+            test, st = name_matcher(self._text), src.store
+            new = array("I", (r for r, i in zip(range(first, last + 1), src.store_rows(range(first, last + 1)))
+                              if test(st.name(i))))
+            k = bisect_left(rows, first)
+            if new:
+                self.beginInsertRows(QModelIndex(), k, k + len(new) - 1)
+            self._rows = rows[:k] + new + array("I", (r + n for r in rows[k:]))
+            if new:
+                self.endInsertRows()
+        self._restart_pending()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        k0, k1 = bisect_left(self._rows, first), bisect_left(self._rows, last + 1)
+        self._removing = (k0, k1)
+        if k0 < k1:
+            self.beginRemoveRows(QModelIndex(), k0, k1 - 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        self._engine = None
+        if self._rows is None:
+            self.endRemoveRows()
+        else:
+            (k0, k1), rows, n = self._removing, self._rows, last - first + 1
+            self._rows = rows[:k0] + array("I", (r - n for r in rows[k1:]))
+            if k0 < k1:
+                self.endRemoveRows()
+        self._restart_pending()
+
+    def _on_layout_about_to_change(self, *args):
+        # Rows are followed through their store rows: FileModel.sort() leaves
+        # its own persistent indexes alone
+        self.layoutAboutToBeChanged.emit()
+        src = self.sourceModel()
+        persistent = self.persistentIndexList()
+        self._layout = [(ix, src.store_rows([self.mapToSource(ix).row()])) for ix in persistent]
+        if self._rows is not None:
+            self._layout_rows = src.store_rows(self._rows)
+
+    def _on_layout_changed(self, *args):
+        self._engine = None
+        src = self.sourceModel()
+        if self._rows is not None:
+            self._rows = array("I", sorted(src.view_row(i) for i in self._layout_rows))
+            self._layout_rows = None
+        old = [ix for ix, _ in self._layout]
+        new = [self.mapFromSource(src.index(src.view_row(rows[0]), ix.column())) if rows else QModelIndex()
+               for ix, rows in self._layout]
+        self._layout = []
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+        self._restart_pending()
+
+    def _restart_pending(self):
+        # A running FilterThread matched the names before this change
+        if self._pending:
+            self._refilter()
+
+    def _source_engine(self):
+        if self._engine is None:
+            self._engine = FilterEngine(self.sourceModel().view_names())
+        return self._engine
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        if self._rows is None:
+            self.dataChanged.emit(self.index(top_left.row(), top_left.column()),
+                                  self.index(bottom_right.row(), bottom_right.column()), roles)
+            return
+        first = bisect_left(self._rows, top_left.row())
+        last = bisect_left(self._rows, bottom_right.row() + 1) - 1
+        if first <= last:
+            self.dataChanged.emit(self.index(first, top_left.column()),
+                                  self.index(last, bottom_right.column()), roles)
+
+    # ------------------------------------------------------------------ filter
+    def setFilterText(self, text: str):
+        self._text = text
+        self._refilter()
+
+    def filterText(self) -> str:
+        return self._text
+
+    def _refilter(self):
+        src = self.sourceModel()
+        if src is None:
+            return
+        self._generation += 1
+        self._pending = False
+        for t in self._threads:
+            t.worker.stop()
+
+        if not self._text:
+            self._set_rows(None)
+            return
+        engine = self._source_engine()
+        if src.rowCount() < ASYNC_ROWS:
+            self._set_rows(engine.match(self._text))
+            return
+        # Until the thread is back the current rows stay valid: source changes remap them
+        self._pending = True
+        thread = FilterThread(engine, self._text, self._generation)
+        thread.worker.finished.connect(self._on_filter_finished)
+        thread.finished.connect(lambda t=thread: self._threads.remove(t))
+        self._threads.append(thread)
+        thread.start()
+
+    def _on_filter_finished(self, generation, rows):
+        if generation != self._generation or rows is None:
+            return
+        self._pending = False
+        log.debug(f"[FilterProxyModel] '{self._text}': {len(rows)} matching rows")
+        self._set_rows(rows)
+
+    def _set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    # ------------------------------------------------------------------ row ranges
+    def source_ranges(self, ranges):
+        """Map (first, last) proxy row ranges to source row ranges."""
+        if self._rows is None:
+            return list(ranges)
+        return rows_to_ranges(r for first, last in ranges for r in self._rows[first:last + 1])
+
+    def rows_from_source(self, source_rows):
+        """Proxy rows of ascending source rows; rows hidden by the filter are dropped."""
+        if self._rows is None:
+            return list(source_rows)
+        rows, n, proxy = self._rows, len(self._rows), []
+        for s in source_rows:
+            k = bisect_left(rows, s)
+            if k < n and rows[k] == s:
+                proxy.append(k)
+        return proxy
+
+    # ------------------------------------------------------------------ Qt API
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid(): return 0
+        if self._rows is None:
+            src = self.sourceModel()
+            return src.rowCount() if src else 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        src = self.sourceModel()
+        return src.columnCount() if src else 0
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row()
+        if self._rows is not None:
+            if row >= len(self._rows):
+                return QModelIndex()
+            row = self._rows[row]
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._rows is None:
+            return self.createIndex(source_index.row(), source_index.column())
+        row = bisect_left(self._rows, source_index.row())
+        if row < len(self._rows) and self._rows[row] == source_index.row():
+            return self.createIndex(row, source_index.column())
+        return QModelIndex()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        return self.sourceModel().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def mimeTypes(self):
+        return self.sourceModel().mimeTypes()
+
+    def mimeData(self, indexes):
+        return self.sourceModel().mimeData([self.mapToSource(i) for i in indexes])
@@ -0,0 +1,230 @@
+"""
+Folder size calculation for the panel ("calculate occupied space").
+
+folder_size() walks a directory tree without following symlinks and sums
+file sizes. Every directory's total is cached by its identity (device,
+inode) together with its mtime, so revisiting a tree – or a subfolder of a
+tree measured before – costs one stat() per cached directory. Changes deep
+in a tree leave the measured directory's own mtime alone, so totals are also
+dropped from outside: for the directories in change_monitor batches and all
+above them, for the folders of a finished file operation and all above them
+(forget_above), and altogether when a panel is refreshed (Ctrl+R).
+
+FolderSizeWorker measures several directories of a listing at once on a
+pool and publishes the totals in batches.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from mount_info import stat_workers
+from logger import log
+
+SIZE_WORKERS = 4            # concurrent directory walks on local disks
+CHUNK_INTERVAL = 0.1        # seconds between published batches
+
+
+class FolderSizeCache:
+    """Recursive size per directory identity, valid while its mtime is unchanged."""
+
+    def __init__(self, maxsize=500_000):
+        self.maxsize = maxsize
+        self._sizes = OrderedDict()     # (dev, ino) -> (mtime_ns, total bytes)
+        self._lock = threading.Lock()
+
+    def get(self, st):
+        with self._lock:
+            entry = self._sizes.get((st.st_dev, st.st_ino))
+            if entry is None or entry[0] != st.st_mtime_ns:
+                return None
+            self._sizes.move_to_end((st.st_dev, st.st_ino))
+            return entry[1]
+
+    def put(self, st, total: int):
+        with self._lock:
+            self._sizes[(st.st_dev, st.st_ino)] = (st.st_mtime_ns, total)
+            if len(self._sizes) > self.maxsize:
+                self._sizes.popitem(last=False)
+
+    def forget(self, path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self._sizes.pop((st.st_dev, st.st_ino), None)
+
+    def clear(self):
+        with self._lock:
+            self._sizes.clear()
+
+    def forget_above(self, paths):
+        """Forget the totals of paths and of every directory above them."""
+        dirs = set()
+        for path in paths:
+            d = os.path.abspath(path)
+            while d not in dirs:
+                dirs.add(d)
+                parent = os.path.dirname(d)
+                if parent == d:
+                    break
+                d = parent
+        for d in dirs:
+            self.forget(d)
+
+    def apply_changes(self, batch):
+        """Forget the totals of changed directories and of every directory above them.
+
+        Fed by change_monitor; after lost events nothing cached can be trusted.
+        """
+        if not self._sizes:
+            return
+        if batch.lost:
+            self.clear()
+            return
+        for d in batch.touched():
+            self.forget(d)
+
+
+def _entries(path):
+    # Read the whole directory: a deep walk must not keep one scandir open per level
+    try:
+        with os.scandir(path) as it:
+            return iter(list(it))
+    except OSError:
+        return iter(())
+
+
+def folder_size(path: str, should_stop=None, st=None) -> int | None:
+    """Total size of the files below path (None if stopped).
+
+    Walks with an explicit stack, so any depth works, and caches the total
+    of every directory on the way back up.
+    """
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+    total = folder_size_cache.get(st)
+    if total is not None:
+        return total
+    stack = [[st, _entries(path), 0]]     # [stat, remaining entries, total so far]
+    while True:
+        frame = stack[-1]
+        for entry in frame[1]:
+            if should_stop is not None and should_stop():
+                return None
+            try:
+                est = entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    sub = folder_size_cache.get(est)
+                    if sub is None:
+                        stack.append([est, _entries(entry.path), 0])
+                        break
+                    frame[2] += sub
+                else:
+                    frame[2] += est.st_size
+            except OSError:
+                continue
+        else:
+            # Directory done: cache it and add it to its parent
+            done, _, total = stack.pop()
+            folder_size_cache.put(done, total)
+            if not stack:
+                return total
+            stack[-1][2] += total
+
+
+class FolderSizeWorker(QObject):
+    """Measures directory rows of a listing; more rows can be added while it runs."""
+    sizes_ready = Signal(object, object)   # store, list of (store row, total bytes)
+    finished = Signal(object)              # ListingStore
+
+    def __init__(self, store, rows):
+        super().__init__()
+        self.store = store
+        self.generation = 0
+        self._queue = deque(rows)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._running_jobs = 0
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+
+    def add(self, rows) -> bool:
+        """Queue more rows (UI thread); False once the worker has finished."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._queue.extend(rows)
+            return True
+
+    def _take(self):
+        with self._lock:
+            rows = list(self._queue)
+            self._queue.clear()
+            if not rows and not self._running_jobs:
+                self._closed = True
+            return rows
+
+    def run(self):
+        store = self.store
+        workers = max(SIZE_WORKERS, stat_workers(store.base_path))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FolderSize")
+        stopped = lambda: not self._is_running
+        jobs, batch, last_emit = {}, [], time.monotonic()   # future -> store row
+        t0 = time.monotonic()
+        try:
+            while self._is_running:
+                self._running_jobs = len(jobs)
+                in_flight = set(jobs.values())
+                for row in self._take():
+                    if row not in in_flight:
+                        in_flight.add(row)
+                        jobs[pool.submit(folder_size, store.full_path(row), stopped)] = row
+                if not jobs:
+                    if self._closed:
+                        break
+                    continue
+                done, _ = wait(list(jobs), timeout=CHUNK_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = jobs.pop(future)
+                    try:
+                        total = future.result()
+                    except Exception as e:
+                        log.warning(f"[FolderSizeWorker] {store.full_path(row)}: {e}")
+                        total = None
+                    if total is not None:
+                        batch.append((row, total))
+                now = time.monotonic()
+                if batch and now - last_emit >= CHUNK_INTERVAL:
+                    self.sizes_ready.emit(store, batch)
+                    batch, last_emit = [], now
+        finally:
+            with self._lock:
+                self._closed = True
+            pool.shutdown(wait=True, cancel_futures=True)
+        if batch and self._is_running:
+            self.sizes_ready.emit(store, batch)
+        log.info(f"[FolderSizeWorker] {store.base_path}: done in {time.monotonic() - t0:.2f}s")
+        self.finished.emit(store)
+
+
+class FolderSizeThread(QThread):
+    def __init__(self, store, rows):
+        super().__init__()
+        self.worker = FolderSizeWorker(store, rows)
+        self.worker.moveToThread(self)
+        self.started.connect(self.worker.run)
+        self.worker.finished.connect(self.quit)
+
+
+# Global singleton instance
+folder_size_cache = FolderSizeCache()
@@ -0,0 +1,206 @@
+"""
+Display formatting for listing columns (size, date, permissions, owner).
+Listings keep raw values only; these helpers turn them into the strings
+shown in the panel when a row is actually displayed.
+
+All listing producers (ScanWorker, VfsWorker, SearchWorker, SyncWorker,
+vfs_ops and the remote VFS classes) go through the process-wide caches
+below, so a value is formatted or looked up once per process:
+
+- sizes are memoized per byte count,
+- dates are memoized per minute (the display format has no seconds),
+- uid/gid names come from an IdentityCache with TTL eviction and negative
+  caching, so hosts backed by LDAP/SSSD pay one round-trip per identity
+  instead of one per file.
+
+cache_stats() reports hits/misses of every cache for tuning.
+"""
+import math
+import stat
+import threading
+import time
+from functools import lru_cache
+
+try:
+    import pwd
+    import grp
+except ImportError:
+    pwd = None # type: ignore
+    grp = None # type: ignore
+
+DATE_FORMAT = "%d.%m.%Y %H:%M"
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# Memo caches are simply dropped when full; refilling is cheap and this
+# keeps lookups a single dict access.
+SIZE_CACHE_MAX = 16384
+DATE_CACHE_MAX = 16384
+
+
+class _Memo:
+    """Bounded memo table with hit/miss counters."""
+
+    def __init__(self, compute, maxsize: int):
+        self._compute = compute
+        self._maxsize = maxsize
+        self._data: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self._data[key]
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+        self.misses += 1
+        value = self._compute(key)
+        if len(self._data) >= self._maxsize:
+            self._data = {}
+        self._data[key] = value
+        return value
+
+    def clear(self):
+        self._data = {}
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._data)}
+
+
+class IdentityCache:
+    """Process-wide uid/gid -> name cache.
+
+    Resolved names expire after ``ttl`` seconds so renamed accounts show up
+    eventually. Ids that can't be resolved are cached as their numeric text
+    for ``negative_ttl`` seconds – those are the expensive misses on
+    directory-service backed hosts.
+    """
+
+    def __init__(self, lookup, ttl: float = 600.0, negative_ttl: float = 60.0,
+                 maxsize: int = 4096):
+        self._lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._maxsize = maxsize
+        self._data: dict[int, tuple[str, float]] = {}   # id -> (name, expires)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative = 0
+
+    def get(self, ident: int) -> str:
+        if ident < 0:
+            return ""
+        now = time.monotonic()
+        entry = self._data.get(ident)
+        if entry is not None and entry[1] > now:
+            self.hits += 1
+            return entry[0]
+
+        # Lookup runs outside the lock; a concurrent duplicate lookup is harmless
+        name = self._lookup(ident) if self._lookup else None
+        with self._lock:
+            self.misses += 1
+            if name is None:
+                self.negative += 1
+                name, expires = str(ident), now + self.negative_ttl
+            else:
+                expires = now + self.ttl
+            if len(self._data) >= self._maxsize:
+                self._evict(now)
+            self._data[ident] = (name, expires)
+        return name
+
+    def _evict(self, now: float):
+        expired = [k for k, (_, exp) in self._data.items() if exp <= now]
+        for k in expired:
+            del self._data[k]
+        if len(self._data) >= self._maxsize:
+            self._data.clear()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.negative = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "negative": self.negative, "entries": len(self._data)}
+
+
+def _lookup_user(uid: int):
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return None
+
+
+def _lookup_group(gid: int):
+    try:
+        return grp.getgrgid(gid).gr_name
+    except KeyError:
+        return None
+
+
+def _compute_size(size_bytes: int) -> str:
+    if size_bytes <= 0:
+        return "0 B"
+    i = min(int(math.floor(math.log(size_bytes, 1024))), len(SIZE_UNITS) - 1)
+    p = math.pow(1024, i)
+    s = round(size_bytes / p, 2)
+    return f"{s} {SIZE_UNITS[i]}"
+
+
+def _compute_date(minute: int) -> str:
+    return time.strftime(DATE_FORMAT, time.localtime(minute * 60))
+
+
+users = IdentityCache(_lookup_user if pwd else None)
+groups = IdentityCache(_lookup_group if grp else None)
+_sizes = _Memo(_compute_size, SIZE_CACHE_MAX)
+_dates = _Memo(_compute_date, DATE_CACHE_MAX)
+
+
+def format_size(size_bytes: int) -> str:
+    return _sizes.get(size_bytes)
+
+
+def format_date(mtime: float) -> str:
+    if not mtime:
+        return ""
+    return _dates.get(int(mtime // 60))
+
+
+@lru_cache(maxsize=1024)
+def format_mode(mode: int) -> str:
+    return stat.filemode(mode) if mode else ""
+
+
+def owner_name(uid: int) -> str:
+    return users.get(uid)
+
+
+def group_name(gid: int) -> str:
+    return groups.get(gid)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of all formatting caches, keyed by cache name."""
+    mode = format_mode.cache_info()
+    return {
+        "size": _sizes.stats(),
+        "date": _dates.stats(),
+        "mode": {"hits": mode.hits, "misses": mode.misses, "entries": mode.currsize},
+        "owner": users.stats(),
+        "group": groups.stats(),
+    }
+
+
+def clear_caches():
+    _sizes.clear()
+    _dates.clear()
+    format_mode.cache_clear()
+    users.clear()
+    groups.clear()
@@ -0,0 +1,351 @@
+"""
+Frecency index of visited directories for the "jump to" prompt.
+
+Every navigation of a panel to a new directory counts as a visit: local
+paths are stored as they are, VFS locations with the same "[TYPE] /inner"
+tag the panel history uses. An entry keeps a visit rank and the time of
+the last visit; its score is the rank weighted by how recent that visit
+was (the scheme of z/zoxide). Once the ranks sum to more than
+MAX_TOTAL_RANK all of them are aged by AGING_FACTOR and entries that
+fall below 1 are forgotten, so the index stays bounded and old habits fade.
+
+The database is an append-only file of JSON lines: [key, rank, last]
+entries written by compaction, then [key, time] visits and [key, null]
+removals appended as they happen. load() replays it; compact() rewrites
+it (atomically) once COMPACT_LINES records have been appended and at exit.
+Several windows may append to the same file, a damaged line is skipped:
+compact() replays the file again first, so what the others appended since
+load() is merged rather than overwritten.
+
+query() matches all keys at once: they are kept lowercased in one
+newline-joined buffer, best score first, and searched with a single
+regular expression. A score only falls as time passes, so the scan stops
+as soon as no later line can beat the results found so far; keys visited
+since the buffer was built are checked on their own. The buffer is built
+by prepare() when the jump prompt opens, never while typing: an outdated
+one only makes the search slower, not wrong. Every word of the
+query must appear as a subsequence, in order, and the last word within
+the last path component ("doc pro" finds ~/Documents/projects).
+"""
+import heapq
+import json
+import os
+import re
+import time
+from bisect import bisect_right
+from operator import itemgetter
+
+from logger import log
+
+MAX_TOTAL_RANK = 100000.0
+AGING_FACTOR = 0.9
+MAX_ENTRIES = 50000
+COMPACT_LINES = 500
+# Keys visited since the search buffer was built before it is rebuilt
+LOOSE_KEYS = 512
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# Highest name bonus query() gives (see _name_bonus)
+MAX_BONUS = 4.0
+_SEPARATORS = re.compile(r"[\s/\\]+")
+# Pattern pieces: what a path component can't contain, the rest of the last one
+_NAME_STOP = "/\\\\\n"
+_NAME_END = "[^/\\\\\n]*$"
+
+
+def frecency_file() -> str:
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "kicommander", "frecency")
+
+
+def score(rank: float, last: float, now: float) -> float:
+    """Visit rank weighted by the age of the last visit."""
+    age = now - last
+    if age < HOUR:
+        return rank * 4
+    if age < DAY:
+        return rank * 2
+    if age < WEEK:
+        return rank * 0.5
+    return rank * 0.25
+
+
+def _name_bonus(key: str, word: str) -> float:
+    """Prefer locations whose name is, starts with or contains the last query word."""
+    name = key.rstrip("/\\").rsplit("/", 1)[-1].rsplit("\\", 1)[-1].lower()
+    if name == word:
+        return MAX_BONUS
+    if name.startswith(word):
+        return 2.0
+    if word in name:
+        return 1.5
+    return 1.0
+
+
+def _patterns(words):
+    """Regexes for a query: (last word within a last path component, earlier words).
+
+    The first has a literal first character, so the search skips ahead to
+    it. Every other character is found at its first occurrence ([^c]*c),
+    which is all a subsequence test needs and never backtracks. The second
+    is matched on the part of the line before the last word, or is None.
+    """
+    def subsequence(word, stop):
+        return "".join(f"[^{re.escape(c)}{stop}]*{re.escape(c)}" for c in word)
+
+    last = words[-1]
+    tail = re.compile(re.escape(last[0]) + subsequence(last[1:], _NAME_STOP) + _NAME_END, re.MULTILINE)
+    head = re.compile("".join(subsequence(w, "\n") for w in words[:-1])) if len(words) > 1 else None
+    return tail, head
+
+
+class FrecencyIndex:
+    def __init__(self, path: str | None = None):
+        self._path = path
+        self._entries = {}      # key -> [rank, last visit]
+        self._total = 0.0       # sum of the ranks
+        self._loaded = False
+        self._appended = 0      # records appended since the last compaction
+        # Search buffer: the lowercased keys of _lines joined by "\n", best first
+        self._lines = []
+        self._bounds = []       # score of every line when the buffer was built
+        self._starts = []       # offset of every line in _text
+        self._text = ""
+        self._loose = set()     # keys visited since then, out of order in the buffer
+        self._built = False
+        self._stale = True      # worth rebuilding in prepare()
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def __contains__(self, key):
+        self._ensure_loaded()
+        return key in self._entries
+
+    @property
+    def path(self) -> str:
+        return self._path or frecency_file()
+
+    # --- Updates ---
+
+    def visit(self, key: str, now: float | None = None):
+        """Count a visit of a directory (or VFS tag)."""
+        if not key:
+            return
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        self._visit(key, now)
+        self._append([key, round(now, 1)])
+
+    def remove(self, key: str):
+        """Forget a location, e.g. one that no longer exists."""
+        self._ensure_loaded()
+        if self._drop(key):
+            self._append([key, None])
+
+    def _visit(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [1.0, now]
+        else:
+            entry[0] += 1
+            entry[1] = max(entry[1], now)
+        self._total += 1
+        self._loose.add(key)
+        if len(self._loose) > LOOSE_KEYS:
+            self._stale = True
+        if self._total > MAX_TOTAL_RANK or len(self._entries) > MAX_ENTRIES:
+            self._age(now)
+
+    def _drop(self, key):
+        # The buffer keeps the key; query() skips keys without an entry
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total -= entry[0]
+        return True
+
+    def _age(self, now):
+        """Scale all ranks down and forget the entries that fall below 1."""
+        while True:
+            for key, entry in list(self._entries.items()):
+                entry[0] *= AGING_FACTOR
+                if entry[0] < 1:
+                    del self._entries[key]
+            self._total = sum(e[0] for e in self._entries.values())
+            if len(self._entries) <= MAX_ENTRIES:
+                break
+        # Lower ranks keep the buffer order valid, but every query would have to skip
+        # the forgotten lines: rebuild it here, on a visit, rather than while typing
+        if self._built:
+            self._update_buffer(now)
+
+    # --- Query ---
+
+    def prepare(self, now: float | None = None):
+        """Load the index and (re)build the search buffer ahead of queries."""
+        self._ensure_loaded()
+        if self._stale or not self._built:
+            self._update_buffer(time.time() if now is None else now)
+
+    def query(self, text: str, limit: int = 50, now: float | None = None) -> list[tuple[str, float]]:
+        """Return up to `limit` (key, score) pairs matching `text`, best first."""
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        if not self._built:
+            self._update_buffer(now)
+        entries, loose = self._entries, self._loose
+        words = [w for w in _SEPARATORS.split(text.lower()) if w]
+        best = []   # min-heap of (score, key)
+
+        def offer(key):
+            entry = entries.get(key)
+            if entry is None:
+                return
+            s = score(entry[0], entry[1], now)
+            if words:
+                s *= _name_bonus(key, words[-1])
+            if len(best) < limit:
+                heapq.heappush(best, (s, key))
+            elif s > best[0][0]:
+                heapq.heapreplace(best, (s, key))
+
+        if limit <= 0:
+            return []
+        if not words:
+            for key in loose:
+                offer(key)
+            for key, bound in zip(self._lines, self._bounds):
+                if len(best) == limit and bound <= best[0][0]:
+                    break
+                if key not in loose:
+                    offer(key)
+        else:
+            tail, head = _patterns(words)
+            for key in loose:
+                low = key.lower()
+                m = tail.search(low)
+                if m and (head is None or head.match(low, 0, m.start())):
+                    offer(key)
+            text, lines, bounds, starts = self._text, self._lines, self._bounds, self._starts
+            for m in tail.finditer(text):
+                i = bisect_right(starts, m.start()) - 1
+                if len(best) == limit and bounds[i] * MAX_BONUS <= best[0][0]:
+                    break
+                if lines[i] in loose or (head is not None and not head.match(text, starts[i], m.start())):
+                    continue
+                offer(lines[i])
+        return [(key, s) for s, key in sorted(best, reverse=True)]
+
+    def _update_buffer(self, now):
+        # A path containing a newline can't be matched line-wise: leave it out
+        ranked = [(score(r, t, now), k) for k, (r, t) in self._entries.items() if "\n" not in k]
+        ranked.sort(key=itemgetter(0), reverse=True)
+        self._bounds = [s for s, _ in ranked]
+        self._lines = [k for _, k in ranked]
+        lowered = [k.lower() for k in self._lines]
+        self._starts, pos = [], 0
+        for low in lowered:
+            self._starts.append(pos)
+            pos += len(low) + 1
+        self._text = "\n".join(lowered)
+        self._loose = set()
+        self._built, self._stale = True, False
+
+    # --- Persistence ---
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def load(self) -> int:
+        """Replay the database file; return the number of entries."""
+        self._loaded = True
+        self._entries, self._total, self._appended = {}, 0.0, 0
+        self._loose, self._built, self._stale = set(), False, True
+        self._replay_file()
+        return len(self._entries)
+
+    def _replay_file(self) -> bool:
+        """Rebuild the entries from the file; False (state kept) if it can't be read."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        except (OSError, UnicodeDecodeError) as e:
+            log.warning(f"[FrecencyIndex] Cannot read {self.path}: {e}")
+            return False
+        self._entries, self._total = {}, 0.0
+        for line in lines:
+            self._replay(line)
+        self._appended = len(lines)
+        return True
+
+    def _replay(self, line):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(record, list) or not record or not isinstance(record[0], str):
+            return
+        key = record[0]
+        if len(record) == 3:
+            rank, last = record[1], record[2]
+            if isinstance(rank, (int, float)) and isinstance(last, (int, float)) and rank > 0:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._total -= old[0]
+                self._entries[key] = [float(rank), float(last)]
+                self._total += rank
+        elif len(record) == 2:
+            if record[1] is None:
+                self._drop(key)
+            elif isinstance(record[1], (int, float)):
+                self._visit(key, float(record[1]))
+
+    def _append(self, record):
+        # Written before any compaction: that replays the file and must see it
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            log.warning(f"[FrecencyIndex] Cannot write {self.path}: {e}")
+        self._appended += 1
+        if self._appended > COMPACT_LINES + len(self._entries):
+            self.compact()
+
+    def compact(self) -> bool:
+        """Merge what other windows appended, then rewrite the database with one line per entry."""
+        if not self._loaded:
+            return False
+        # Our own records are in the file too, so replaying it gives the merged state
+        old, loose, stale = self._entries, set(self._loose), self._stale
+        if self._replay_file():
+            # Keys the others visited may now score above their place in the search buffer
+            # (the file holds rounded ranks and times: allow for that)
+            self._loose = loose | {k for k, (r, t) in self._entries.items()
+                                   if k not in old or r > old[k][0] + 0.01 or t > old[k][1] + 1}
+            self._stale = stale or len(self._loose) > LOOSE_KEYS
+        path = self.path
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, (rank, last) in self._entries.items():
+                    f.write(json.dumps([key, round(rank, 3), round(last, 1)], ensure_ascii=False) + "\n")
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning(f"[FrecencyIndex] Cannot write {path}: {e}")
+            return False
+        self._appended = len(self._entries)
+        return True
+
+
+# Global singleton instance
+frecency = FrecencyIndex()
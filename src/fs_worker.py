@@ -1,146 +1,478 @@
 import os
-import time
-import math
 import stat
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from PySide6.QtCore import QThread, Signal, QObject
 
-try:
-    import pwd
-    import grp
-except ImportError:
-    pwd = None # type: ignore
-    grp = None # type: ignore
+from listing_store import ListingStore
+from listing_cache import local_stamp
+from mount_info import is_slow, mark_slow, stat_workers
+from formatting import format_size, format_date, format_mode, cache_stats
+from logger import log
 
 class FileInfo:
-    def __init__(self, name, ext, size, date, is_dir, full_path, size_bytes=0, mtime=0, owner="", group="", permissions=""):
+    """Single listing entry, built on demand from a ListingStore row or by a VFS.
+
+    size/date/permissions may be passed pre-formatted; when left empty they
+    are formatted lazily from the raw values the first time they are read.
+    """
+    __slots__ = ("name", "ext", "is_dir", "full_path", "owner", "group", "mode",
+                 "_size", "_date", "_permissions", "_size_bytes", "_mtime")
+
+    def __init__(self, name, ext, size="", date="", is_dir=False, full_path="", size_bytes=0, mtime=0, owner="", group="", permissions="", mode=0):
         self.name = name
         self.ext = ext
-        self.size = size
-        self.date = date
         self.is_dir = is_dir
         self.full_path = full_path
         self.owner = owner
         self.group = group
-        self.permissions = permissions
+        self.mode = mode
+        self._size = size
+        self._date = date
+        self._permissions = permissions
         # Raw values for numeric sorting
         self._size_bytes = size_bytes
         self._mtime = mtime
 
+    @property
+    def size(self):
+        if not self._size:
+            self._size = "<DIR>" if self.is_dir else format_size(self._size_bytes or 0)
+        return self._size
+
+    @property
+    def date(self):
+        if not self._date:
+            self._date = format_date(self._mtime)
+        return self._date
+
+    @property
+    def permissions(self):
+        if not self._permissions:
+            self._permissions = format_mode(self.mode)
+        return self._permissions
+
+    @property
+    def size_bytes(self):
+        return self._size_bytes
+
+    @property
+    def mtime(self):
+        return self._mtime
+
+# Chunks are sized by time, not row count: the first screenful goes out as
+# soon as it exists, later chunks at most every CHUNK_INTERVAL seconds so the
+# model merges a few large sorted runs instead of many small ones.
+FIRST_CHUNK = 100
+CHUNK_INTERVAL = 0.05
+
+# Names-first listing: on network/FUSE mounts (or on mounts whose first stat()
+# calls repeatedly average above STAT_SLOW_SECONDS, see mount_info.mark_slow)
+# only names and d_type dir flags are read while scanning; StatWorker fills
+# the other columns afterwards. The threshold is a network round trip, well
+# above a cold local disk's seek.
+STAT_PROBE_ENTRIES = 32
+STAT_SLOW_SECONDS = 0.01
+
 class ScanWorker(QObject):
-    finished = Signal(list)
-    chunk_filled = Signal(list)
+    finished = Signal(object)              # ListingStore
+    chunk_filled = Signal(object, int, int) # store, first row, end row
     error = Signal(str)
 
-    def __init__(self, path):
+    def __init__(self, path, names_first=None, stat_workers=None):
         super().__init__()
         self.path = path
+        self.store = ListingStore(path)
+        # None = decide from the mount type and measured stat latency
+        self.names_first = names_first
+        # Concurrent stat() calls; None = tuned per mount (mount_info)
+        self.stat_workers = stat_workers
+        self.generation = 0      # navigation generation of the requesting panel
         self._is_running = True
+        self._emitted = 0
+        self._last_emit = 0.0
 
     def stop(self):
         self._is_running = False
 
     def run(self):
         try:
-            files = []
+            store = self.store
+            self._emitted, self._last_emit = 0, time.monotonic()
+            # Taken before listing, so changes made during the scan invalidate it
+            store.stamp = local_stamp(self.path)
+            auto = self.names_first is None
+            names_first = is_slow(self.path) if auto else self.names_first
+            workers = 1 if names_first else (self.stat_workers or stat_workers(self.path))
             # Add [..] entry if not at root
             parent = os.path.dirname(self.path)
             if parent != self.path:
-                files.append(FileInfo("..", "", "<DIR>", "", True, parent, 0, 0))
+                store.append("..", True, full_path=parent)
 
             with os.scandir(self.path) as it:
-                for entry in it:
-                    if not self._is_running: break
-                    try:
-                        stats = entry.stat()
-                        is_dir = entry.is_dir()
-                        name = entry.name
-                        mtime = stats.st_mtime
-                        
-                        if is_dir:
-                            ext = ""
-                            size_str = "<DIR>"
-                            size_bytes = 0
-                        else:
-                            name_parts = os.path.splitext(name)
-                            ext = name_parts[1].lstrip('.')
-                            size_bytes = stats.st_size
-                            size_str = self.format_size(size_bytes)
-
-                        date_str = time.strftime('%d.%m.%Y %H:%M', time.localtime(mtime))
-                        
-                        permissions = stat.filemode(stats.st_mode)
-                        
-                        owner, group = "", ""
-                        if pwd:
-                            try:
-                                owner = pwd.getpwuid(stats.st_uid).pw_name
-                            except KeyError:
-                                owner = str(stats.st_uid)
-                        else:
-                            owner = str(stats.st_uid)
-                            
-                        if grp:
-                            try:
-                                group = grp.getgrgid(stats.st_gid).gr_name
-                            except KeyError:
-                                group = str(stats.st_gid)
-                        else:
-                            group = str(stats.st_gid)
-                        
-                        files.append(FileInfo(
-                            name, ext, size_str, date_str, is_dir, entry.path,
-                            size_bytes, mtime, owner, group, permissions
-                        ))
-
-                        # Emit chunk every 100 items
-                        if len(files) % 100 == 0:
-                            self.chunk_filled.emit(files[-100:])
-                    except (PermissionError, OSError):
-                        continue
+                if workers > 1:
+                    self._scan_parallel(it, workers)
+                else:
+                    self._scan(it, names_first, auto)
+
+            if not self._is_running:
+                # Cancelled by a newer navigation: nobody wants the rows
+                self.finished.emit(store)
+                return
 
+            store.compact()
             # Emit final chunk if any
-            remaining = len(files) % 100
-            if remaining > 0:
-                self.chunk_filled.emit(files[-remaining:])
+            if len(store) > self._emitted:
+                self.chunk_filled.emit(store, self._emitted, len(store))
             
             # Note: Final sorting happens in the model/UI after all chunks are in
-            self.finished.emit(files)
+            self.finished.emit(store)
+            log.debug(f"[ScanWorker] {len(store)} entries in {self.path} ({workers} stat workers), "
+                      f"format caches: {cache_stats()}")
             
         except Exception as e:
             self.error.emit(str(e))
 
-    @staticmethod
-    def format_size(size_bytes):
-        if size_bytes == 0: return "0 B"
-        size_name = ("B", "KB", "MB", "GB", "TB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return f"{s} {size_name[i]}"
+    def _scan(self, it, names_first, auto):
+        store = self.store
+        probed, probe_time = 0, 0.0
+        for entry in it:
+            if not self._is_running: break
+            try:
+                if names_first:
+                    store.append(entry.name, entry.is_dir(), pending=True)
+                else:
+                    if auto and probed < STAT_PROBE_ENTRIES:
+                        t0 = time.perf_counter()
+                        stats = entry.stat()
+                        probed += 1
+                        probe_time += time.perf_counter() - t0
+                        if probed == STAT_PROBE_ENTRIES and probe_time / probed > STAT_SLOW_SECONDS:
+                            log.info(f"[ScanWorker] Slow stat ({probe_time / probed * 1000:.1f} ms) "
+                                     f"in {self.path}, switching to names-first")
+                            mark_slow(self.path)
+                            names_first = True
+                    else:
+                        stats = entry.stat()
+                    self._append(entry, stats)
+                self._publish()
+            except (PermissionError, OSError):
+                continue
+
+    def _scan_parallel(self, it, workers):
+        """Stat entries on a thread pool; rows are still appended in listing order.
+
+        os.stat releases the GIL, so on high-latency mounts up to `workers`
+        requests are in flight at once instead of one round trip per entry.
+        """
+        inflight = deque()
+        window = workers * 2
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ScanStat")
+        try:
+            for entry in it:
+                if not self._is_running: break
+                inflight.append((entry, pool.submit(_entry_stat, entry)))
+                if len(inflight) >= window:
+                    self._append_done(*inflight.popleft())
+            while inflight and self._is_running:
+                self._append_done(*inflight.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _append_done(self, entry, future):
+        stats = future.result()
+        if stats is not None:
+            self._append(entry, stats)
+            self._publish()
+
+    def _append(self, entry, stats):
+        is_dir = entry.is_dir()
+        # Raw values only – display strings and owner names
+        # are resolved lazily by FileModel for visible rows.
+        self.store.append(
+            entry.name, is_dir, 0 if is_dir else stats.st_size,
+            stats.st_mtime, stats.st_mode,
+            uid=stats.st_uid, gid=stats.st_gid
+        )
+
+    def _publish(self):
+        # Publish rows to the model in time-budgeted chunks
+        store, emitted = self.store, self._emitted
+        now = time.monotonic()
+        if (not emitted and len(store) >= FIRST_CHUNK) or \
+                (emitted and now - self._last_emit >= CHUNK_INTERVAL):
+            self.chunk_filled.emit(store, emitted, len(store))
+            self._emitted, self._last_emit = len(store), now
+
+class StatWorker(QObject):
+    """Fills the pending rows of a names-first listing, prioritised rows first."""
+    rows_filled = Signal(object, object)   # store, list of store rows
+    finished = Signal(object)              # ListingStore
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.generation = 0
+        self._priority = deque()
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+
+    def prioritize(self, rows):
+        """Stat these store rows next (called from the UI thread, e.g. on scroll)."""
+        self._priority = deque(rows)
+
+    def _next_row(self, sequential):
+        pending = self.store.pending
+        prio = self._priority
+        while prio:
+            try:
+                row = prio.popleft()
+            except IndexError:
+                break
+            if row in pending:
+                return row
+        for row in sequential:
+            if row in pending:
+                return row
+        return None
+
+    def run(self):
+        store = self.store
+        workers = stat_workers(store.base_path)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FillStat") if workers > 1 else None
+        sequential = iter(sorted(store.pending))
+        batch, last_emit = [], time.monotonic()
+        try:
+            while self._is_running:
+                # One round: up to `workers` rows, stat'ed concurrently
+                rows = []
+                while len(rows) < workers:
+                    row = self._next_row(sequential)
+                    if row is None:
+                        break
+                    if row not in rows:
+                        rows.append(row)
+                if not rows:
+                    break
+                paths = [store.full_path(r) for r in rows]
+                for row, stats in zip(rows, pool.map(_path_stat, paths) if pool else map(_path_stat, paths)):
+                    if stats is None:
+                        store.set_stat(row, 0, 0, 0)
+                    else:
+                        store.set_stat(row, 0 if store.is_dir[row] else stats.st_size, stats.st_mtime,
+                                       stats.st_mode, stats.st_uid, stats.st_gid)
+                batch.extend(rows)
+                now = time.monotonic()
+                if now - last_emit >= CHUNK_INTERVAL:
+                    self.rows_filled.emit(store, batch)
+                    batch, last_emit = [], now
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        if batch:
+            self.rows_filled.emit(store, batch)
+        self.finished.emit(store)
+
+
+def _entry_stat(entry):
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+
+def _path_stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        try:
+            return os.lstat(path)   # dangling symlink
+        except OSError:
+            return None
 
 class VfsWorker(QObject):
-    finished = Signal(list)
-    chunk_filled = Signal(list)
+    finished = Signal(object)              # ListingStore
+    chunk_filled = Signal(object, int, int) # store, first row, end row
     error = Signal(str)
 
     def __init__(self, vfs, inner_path):
         super().__init__()
         self.vfs = vfs
         self.inner_path = inner_path
+        self.store = ListingStore((inner_path or "/").rstrip("/") or "/", "/")
+        self.generation = 0
+        self._is_running = True
+
+    def stop(self):
+        # list_dir() itself can't be interrupted; stop publishing its result
+        self._is_running = False
 
     def run(self):
         try:
             files = self.vfs.list_dir(self.inner_path)
             # For VFS we usually get the full list from provider API,
             # but we can still emit it in chunks to keep UI responsive
-            chunk_size = 100
-            for i in range(0, len(files), chunk_size):
-                self.chunk_filled.emit(files[i : i + chunk_size])
-            
-            self.finished.emit(files)
+            store = self.store
+            emitted = 0
+            last_emit = time.monotonic()
+            for fi in files:
+                if not self._is_running: break
+                store.append_info(fi)
+                now = time.monotonic()
+                if (not emitted and len(store) >= FIRST_CHUNK) or \
+                        (emitted and now - last_emit >= CHUNK_INTERVAL):
+                    self.chunk_filled.emit(store, emitted, len(store))
+                    emitted, last_emit = len(store), now
+            if len(store) > emitted and self._is_running:
+                self.chunk_filled.emit(store, emitted, len(store))
+
+            store.compact()
+            self.finished.emit(store)
+        except Exception as e:
+            self.error.emit(str(e))
+
+# Branch view: chunks are rarer (merging into millions of rows isn't free)
+# and local directories are listed on at least BRANCH_MIN_WORKERS threads.
+BRANCH_CHUNK_INTERVAL = 0.25
+BRANCH_MIN_WORKERS = 4
+
+class BranchWorker(QObject):
+    """Flat recursive listing ("branch view") of a local directory or a VFS path.
+
+    Rows are files only, named by their path relative to the branch root.
+    Local trees are walked by a pool of scandir workers; VFS providers are
+    walked one directory at a time, as their connections aren't thread-safe.
+    """
+    finished = Signal(object)              # ListingStore
+    chunk_filled = Signal(object, int, int) # store, first row, end row
+    progress = Signal(int, int)            # files, directories listed so far
+    error = Signal(str)
+
+    def __init__(self, path, vfs=None):
+        super().__init__()
+        self.path = path
+        self.vfs = vfs
+        if vfs is not None:
+            self.store = ListingStore((path or "/").rstrip("/") or "/", "/")
+        else:
+            self.store = ListingStore(path)
+        self.generation = 0
+        self.dirs = 0
+        self._up_rows = 0
+        self._is_running = True
+        self._emitted = 0
+        self._last_emit = 0.0
+
+    def stop(self):
+        self._is_running = False
+
+    def run(self):
+        try:
+            store = self.store
+            self._emitted, self._last_emit = 0, time.monotonic()
+            if self.vfs is not None:
+                self._walk_vfs()
+            else:
+                # '..' leaves the branch view back to the plain listing of the root
+                store.append("..", True, full_path=self.path)
+                self._up_rows = 1
+                self._walk_local()
+            if not self._is_running:
+                self.finished.emit(store)
+                return
+            store.compact()
+            if len(store) > self._emitted:
+                self.chunk_filled.emit(store, self._emitted, len(store))
+            self.progress.emit(self.files, self.dirs)
+            self.finished.emit(store)
+            log.debug(f"[BranchWorker] {self.files} files in {self.dirs} dirs under {self.path}")
         except Exception as e:
             self.error.emit(str(e))
 
+    @property
+    def files(self):
+        return len(self.store) - self._up_rows
+
+    def _walk_local(self):
+        workers = max(BRANCH_MIN_WORKERS, stat_workers(self.path))
+        pending, inflight = deque([""]), deque()
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="BranchScan")
+        try:
+            while self._is_running and (pending or inflight):
+                while pending and len(inflight) < workers * 2:
+                    inflight.append(pool.submit(_list_branch_dir, self.path, pending.popleft()))
+                files, subdirs = inflight.popleft().result()
+                self.dirs += 1
+                pending.extend(subdirs)
+                for rel, size, mtime, mode, uid, gid in files:
+                    self.store.append(rel, False, size, mtime, mode, uid=uid, gid=gid)
+                self._publish()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _walk_vfs(self):
+        pending = deque([(self.path, "")])   # (inner path, relative name prefix)
+        while self._is_running and pending:
+            inner, prefix = pending.popleft()
+            try:
+                files = self.vfs.list_dir(inner)
+            except Exception as e:
+                log.warning(f"[BranchWorker] Cannot list {inner}: {e}")
+                continue
+            self.dirs += 1
+            for fi in files:
+                if fi.name in ("..", " .. ", "."):
+                    continue
+                if fi.is_dir:
+                    pending.append((fi.full_path, prefix + fi.name + "/"))
+                else:
+                    self.store.append_info(fi, prefix + fi.name)
+            self._publish()
+
+    def _publish(self):
+        store, emitted = self.store, self._emitted
+        now = time.monotonic()
+        if (not emitted and len(store) >= FIRST_CHUNK) or \
+                (emitted and now - self._last_emit >= BRANCH_CHUNK_INTERVAL):
+            self.chunk_filled.emit(store, emitted, len(store))
+            self.progress.emit(self.files, self.dirs)
+            self._emitted, self._last_emit = len(store), now
+
+
+def _list_branch_dir(root, rel):
+    """Files (relative name + stat fields) and subdirectories of one branch directory."""
+    files, dirs = [], []
+    prefix = rel + os.sep if rel else ""
+    try:
+        with os.scandir(os.path.join(root, rel) if rel else root) as it:
+            for entry in it:
+                try:
+                    # Symlinked dirs are neither followed (cycles) nor listed
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(prefix + entry.name)
+                        continue
+                    st = entry.stat()
+                    if stat.S_ISDIR(st.st_mode):
+                        continue
+                    files.append((prefix + entry.name, st.st_size, st.st_mtime, st.st_mode, st.st_uid, st.st_gid))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, dirs
+
+class BranchThread(QThread):
+    def __init__(self, path, vfs=None):
+        super().__init__()
+        self.worker = BranchWorker(path, vfs)
+        self.worker.moveToThread(self)
+        self.started.connect(self.worker.run)
+        self.worker.finished.connect(self.quit)
+        self.worker.error.connect(self.quit)
+
 class VfsThread(QThread):
     def __init__(self, vfs, inner_path):
         super().__init__()
@@ -150,10 +482,18 @@ class VfsThread(QThread):
         self.worker.finished.connect(self.quit)
         self.worker.error.connect(self.quit)
 
+class StatThread(QThread):
+    def __init__(self, store):
+        super().__init__()
+        self.worker = StatWorker(store)
+        self.worker.moveToThread(self)
+        self.started.connect(self.worker.run)
+        self.worker.finished.connect(self.quit)
+
 class ScanThread(QThread):
-    def __init__(self, path):
+    def __init__(self, path, names_first=None):
         super().__init__()
-        self.worker = ScanWorker(path)
+        self.worker = ScanWorker(path, names_first)
         self.worker.moveToThread(self)
         self.started.connect(self.worker.run)
         self.worker.finished.connect(self.quit)
@@ -61,21 +61,17 @@ class FTPVFS:
                     # Parse modification time (YYYYMMDDHHMMSS)
                     mtime_str = facts.get("modify")
                     mtime: float = 0.0
-                    date_str = ""
                     if mtime_str:
                         try:
                             # We only care about YYYYMMDDHHMMSS
                             ts = time.strptime(mtime_str[:14], "%Y%m%d%H%M%S")
                             mtime = time.mktime(ts)
-                            date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime))
                         except:
                             pass
 
                     fi = FileInfo(
                         name=name,
                         ext="" if is_dir else os.path.splitext(name)[1].lstrip("."),
-                        size="<DIR>" if is_dir else self.format_size(size_bytes),
-                        date=date_str,
                         is_dir=is_dir,
                         full_path=os.path.join(path, name).replace("\\", "/"),
                         size_bytes=size_bytes,
@@ -153,13 +149,3 @@ class FTPVFS:
             except:
                 pass
             self._ftp = None
-
-    @staticmethod
-    def format_size(size_bytes):
-        if size_bytes == 0: return "0 B"
-        import math
-        size_name = ("B", "KB", "MB", "GB", "TB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return f"{s} {size_name[i]}"
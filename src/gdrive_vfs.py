@@ -123,26 +123,23 @@ class GDriveVFS:
             is_dir = (item['mimeType'] == 'application/vnd.google-apps.folder')
             size_bytes = int(item.get('size', 0)) if not is_dir else 0
             
+            # Size text is formatted lazily; only the special marker is set here
+            size_str = ""
             if is_dir:
                 ext = ""
-                size_str = "<DIR>"
             else:
                 ext = os.path.splitext(name)[1].removeprefix('.')
                 if size_bytes == 0 and not 'size' in item:
                     # Google Docs/Sheets don't have size natively exported
                     size_str = "<DOC>"
-                else:
-                    size_str = self._format_size(size_bytes)
                     
             mtime_str = item.get('modifiedTime', "")
             mtime = 0.0
-            date_str = ""
             try:
                 import datetime
                 # Just a rough parse for string "2023-11-20T08:00:00.000Z"
                 dt = datetime.datetime.strptime(mtime_str[:19], "%Y-%m-%dT%H:%M:%S")
                 mtime = dt.timestamp()
-                date_str = dt.strftime('%d.%m.%Y %H:%M')
             except Exception:
                 pass
                 
@@ -153,7 +150,7 @@ class GDriveVFS:
             full_path = f"{inner_path.strip('/')}/{name}" if inner_path.strip('/') else name
             
             fi = FileInfo(
-                name=name, ext=ext, size=size_str, date=date_str, 
+                name=name, ext=ext, size=size_str, 
                 is_dir=is_dir, full_path=full_path, 
                 size_bytes=size_bytes, mtime=mtime, 
                 owner=owner, group="gdrive", permissions=""
@@ -229,11 +226,3 @@ class GDriveVFS:
 
     def disconnect(self):
         pass
-
-    def _format_size(self, size: float) -> str:
-        if size < 0: return "0 B"
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size < 1024:
-                return f"{size:.0f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
@@ -0,0 +1,455 @@
+"""
+Git status of listing entries without running ``git status``.
+
+The working tree state is read straight from ``.git/index`` (versions 2-4):
+an entry whose size and mtime still match the index is clean; one whose
+stat data differs, or was written in the same second as the index ("racy"),
+is hashed as a blob and compared with the indexed SHA-1, as git does.
+Paths missing from the index are untracked unless a .gitignore rule (or
+.git/info/exclude) matches. A directory holding modified tracked files is
+itself reported modified.
+
+The repository of a directory is cached and checked against the mtimes of
+the directories walked to find it (and of its .git), so a git init or a
+removed .git is noticed. Parsed indexes and ignore rules are cached per
+repository and reread only when their files' mtimes change. dir_state()
+does those checks once for all entries of a directory; the git column gets
+one DirState per batch of rows and keys its values on DirState.stamp()
+(see computed_columns).
+"""
+import hashlib
+import os
+import re
+import stat
+import struct
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+from logger import log
+
+MODIFIED, UNTRACKED, IGNORED = "modified", "untracked", "ignored"
+
+# Files larger than this are reported modified without hashing
+HASH_MAX_BYTES = 64 * 1024 * 1024
+# Directories whose repository lookup is cached
+REPOS_MAX = 1024
+# Tracked files stat'ed to tell which subdirectories hold changes
+ROLLUP_MAX_FILES = 20000
+
+_ENTRY = struct.Struct(">10I20sH")     # ctime..size, sha1, flags
+_FLAG_EXTENDED = 0x4000
+_FLAG_ASSUME_VALID = 0x8000
+_XFLAG_SKIP_WORKTREE = 0x4000
+_S_IFGITLINK = 0o160000
+
+
+class IndexEntry:
+    __slots__ = ("mtime", "size", "mode", "sha", "assume_clean")
+
+    def __init__(self, mtime, size, mode, sha, assume_clean):
+        self.mtime = mtime           # whole seconds, as compared by git without USE_NSEC
+        self.size = size
+        self.mode = mode
+        self.sha = sha
+        self.assume_clean = assume_clean
+
+
+class GitIndex:
+    def __init__(self, entries: dict[str, IndexEntry], mtime: int = 0):
+        self.entries = entries
+        self.mtime = mtime              # index file mtime in seconds, see is_racy()
+        self.paths = sorted(entries)    # for "anything tracked below this dir" lookups
+
+    def is_racy(self, entry: IndexEntry) -> bool:
+        """Entry written in the same second as the index: matching stat data proves nothing."""
+        return entry.mtime >= self.mtime
+
+    def tracks_below(self, rel_dir: str) -> bool:
+        prefix = rel_dir + "/"
+        k = bisect_left(self.paths, prefix)
+        return k < len(self.paths) and self.paths[k].startswith(prefix)
+
+
+def parse_index(data: bytes) -> GitIndex:
+    """Parse the binary contents of a git index file."""
+    if data[:4] != b"DIRC":
+        raise ValueError("not a git index")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise ValueError(f"unsupported index version {version}")
+    entries, pos, prev = {}, 12, b""
+    for _ in range(count):
+        fields = _ENTRY.unpack_from(data, pos)
+        mtime, mode, size, sha, flags = fields[2], fields[6], fields[9], fields[10], fields[11]
+        start = pos
+        pos += _ENTRY.size
+        xflags = 0
+        if flags & _FLAG_EXTENDED and version >= 3:
+            xflags, = struct.unpack_from(">H", data, pos)
+            pos += 2
+        if version == 4:
+            # Path = previous path minus N trailing bytes + NUL-terminated suffix
+            strip, pos = _varint(data, pos)
+            end = data.index(b"\0", pos)
+            name = prev[:len(prev) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            end = data.index(b"\0", pos)
+            name = data[pos:end]
+            # Entries are NUL-padded to a multiple of 8 bytes
+            pos = start + ((end - start + 8) & ~7)
+        prev = name
+        if (flags >> 12) & 3:
+            continue    # merge stages: the file is conflicted, stage 0 is absent
+        assume_clean = bool(flags & _FLAG_ASSUME_VALID or xflags & _XFLAG_SKIP_WORKTREE)
+        entries[name.decode("utf-8", "surrogateescape")] = IndexEntry(mtime, size, mode, sha, assume_clean)
+    return GitIndex(entries)
+
+
+def _varint(data, pos):
+    # git's offset encoding: each continuation adds one before shifting
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+# ---------------------------------------------------------------------- ignore rules
+class IgnoreRules:
+    """Ordered .gitignore rules; the last matching rule decides."""
+
+    def __init__(self):
+        self._rules = []   # (base dir, regex, negate, dir_only, anchored)
+
+    def add_file(self, path: str, base: str = ""):
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            self.add(line, base)
+
+    def add(self, line: str, base: str = ""):
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            return
+        negate = line.startswith("!")
+        if negate or line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line:
+            self._rules.append((base, re.compile(_glob_regex(line)), negate, dir_only, anchored))
+
+    def match(self, rel: str, is_dir: bool) -> bool:
+        ignored = False
+        for base, regex, negate, dir_only, anchored in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel.startswith(base + "/"):
+                    continue
+                sub = rel[len(base) + 1:]
+            else:
+                sub = rel
+            if regex.fullmatch(sub if anchored else sub.rpartition("/")[2]):
+                ignored = not negate
+        return ignored
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        """True if rel or one of its parent directories is ignored."""
+        parts = rel.split("/")
+        for n in range(1, len(parts)):
+            if self.match("/".join(parts[:n]), True):
+                return True
+        return self.match(rel, is_dir)
+
+
+def _glob_regex(pattern: str) -> str:
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            break
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+# ---------------------------------------------------------------------- repositories
+def find_repo(directory: str):
+    """(work tree root, git dir) of the repository holding directory, or None."""
+    return repo_cache.repo(directory)
+
+
+def _walk_to_repo(d: str):
+    """Look for .git from d upwards: (repo or None, [(path, mtime_ns)] of what was looked at).
+
+    Creating or removing a .git changes the mtime of its directory, so the
+    stamps tell when the answer may have changed.
+    """
+    stamps = []
+    while True:
+        stamps.append((d, _mtime(d)))
+        dot_git = os.path.join(d, ".git")
+        if os.path.isdir(dot_git):
+            stamps.append((dot_git, _mtime(dot_git)))
+            return (d, dot_git), stamps
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules: ".git" is a file "gitdir: <path>"
+            stamps.append((dot_git, _mtime(dot_git)))
+            try:
+                with open(dot_git, encoding="utf-8") as f:
+                    target = f.read().strip()
+            except OSError:
+                return None, stamps
+            if target.startswith("gitdir:"):
+                return (d, os.path.normpath(os.path.join(d, target[7:].strip()))), stamps
+            return None, stamps
+        parent = os.path.dirname(d)
+        if parent == d:
+            return None, stamps
+        d = parent
+
+
+def index_path(directory: str) -> str | None:
+    repo = find_repo(directory)
+    return os.path.join(repo[1], "index") if repo else None
+
+
+class DirState:
+    """Repository, index and ignore rules for the entries of one directory.
+
+    Built by dir_state(), which validates the caches once; status() calls
+    for the entries of that directory then touch no other file.
+    """
+
+    def __init__(self, root=None, git_dir=None, rel_dir="", index=None, rules=None, stamps=None):
+        self.root = root            # None outside a repository
+        self.git_dir = git_dir
+        self.rel_dir = rel_dir      # directory relative to root, "/"-separated
+        self.index = index
+        self.rules = rules
+        self._stamps = stamps       # mtimes of the index and the ignore files
+        self._changed = None        # names of subdirectories holding changes
+
+    def stamp(self, path: str, is_dir: bool):
+        """What the status of path depends on besides its own stat data."""
+        if self.root is None:
+            return None
+        if is_dir:
+            return self._stamps, os.path.basename(path) in self.changed_dirs()
+        return self._stamps
+
+    def changed_dirs(self) -> frozenset:
+        """Names of the subdirectories holding modified or deleted tracked files.
+
+        Stats the tracked files below the directory (at most
+        ROLLUP_MAX_FILES), skipping the rest of a subdirectory at its first
+        change; computed on first use.
+        """
+        if self._changed is not None:
+            return self._changed
+        paths, entries = self.index.paths, self.index.entries
+        prefix = f"{self.rel_dir}/" if self.rel_dir else ""
+        changed, checked = set(), 0
+        k = bisect_left(paths, prefix)
+        while k < len(paths) and paths[k].startswith(prefix) and checked < ROLLUP_MAX_FILES:
+            rel = paths[k]
+            name, sep, _ = rel[len(prefix):].partition("/")
+            if not sep:
+                k += 1       # an entry of this directory: not rolled up
+                continue
+            checked += 1
+            full = os.path.join(self.root, *rel.split("/"))
+            try:
+                st = os.lstat(full)
+                dirty = _file_status(self.index, entries[rel], full, st.st_size, st.st_mtime) == MODIFIED
+            except OSError:
+                dirty = True     # deleted
+            if dirty:
+                changed.add(name)
+                # "/" + 1: past every path below this subdirectory
+                k = bisect_left(paths, f"{prefix}{name}0", k)
+            else:
+                k += 1
+        self._changed = frozenset(changed)
+        return self._changed
+
+
+def dir_state(directory: str) -> DirState:
+    """Validated repository state for the entries of directory."""
+    repo = find_repo(directory)
+    if repo is None:
+        return DirState()
+    root, git_dir = repo
+    rel_dir = os.path.relpath(directory, root).replace(os.sep, "/")
+    rel_dir = "" if rel_dir == "." else rel_dir
+    index_mtime = _mtime(os.path.join(git_dir, "index"))
+    index = repo_cache.index(git_dir)
+    ignore_stamps, rules = repo_cache.ignores(root, git_dir, rel_dir)
+    return DirState(root, git_dir, rel_dir, index, rules, (index_mtime,) + ignore_stamps)
+
+
+class RepoCache:
+    """Repository lookups, parsed indexes and ignore rules, redone when the files change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._repos = OrderedDict()   # directory -> (repo or None, stamps of what was looked at)
+        self._indexes = {}    # git dir -> (index mtime_ns, GitIndex)
+        self._ignores = {}    # (root, rel dir) -> (stamps of the ignore files, IgnoreRules)
+
+    def repo(self, directory: str):
+        d = os.path.abspath(directory)
+        with self._lock:
+            cached = self._repos.get(d)
+            if cached is not None:
+                self._repos.move_to_end(d)
+        if cached is not None and all(_mtime(p) == m for p, m in cached[1]):
+            return cached[0]
+        repo, stamps = _walk_to_repo(d)
+        with self._lock:
+            self._repos[d] = (repo, stamps)
+            if len(self._repos) > REPOS_MAX:
+                self._repos.popitem(last=False)
+        return repo
+
+    def index(self, git_dir: str) -> GitIndex:
+        path = os.path.join(git_dir, "index")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return GitIndex({})    # fresh repository: nothing tracked yet
+        with self._lock:
+            cached = self._indexes.get(git_dir)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                with open(path, "rb") as f:
+                    index = parse_index(f.read())
+                index.mtime = mtime // 1_000_000_000
+            except (OSError, ValueError, struct.error) as e:
+                log.warning(f"[RepoCache] Cannot read {path}: {e}")
+                index = GitIndex({})
+            self._indexes[git_dir] = (mtime, index)
+            return index
+
+    def ignores(self, root: str, git_dir: str, rel_dir: str) -> tuple[tuple, IgnoreRules]:
+        """(mtimes of the ignore files, rules) for entries of rel_dir: info/exclude
+        and every .gitignore above."""
+        dirs = [""]
+        if rel_dir:
+            parts = rel_dir.split("/")
+            dirs += ["/".join(parts[:n]) for n in range(1, len(parts) + 1)]
+        files = [os.path.join(git_dir, "info", "exclude")] + \
+                [os.path.join(root, d, ".gitignore") for d in dirs]
+        stamps = tuple(_mtime(f) for f in files)
+        key = (root, rel_dir)
+        with self._lock:
+            cached = self._ignores.get(key)
+            if cached and cached[0] == stamps:
+                return cached
+        rules = IgnoreRules()
+        rules.add_file(files[0])
+        for d, f in zip(dirs, files[1:]):
+            rules.add_file(f, d)
+        with self._lock:
+            self._ignores[key] = (stamps, rules)
+        return stamps, rules
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _blob_sha(path: str, size: int, mode: int) -> bytes | None:
+    h = hashlib.sha1()
+    try:
+        if stat.S_ISLNK(mode):
+            target = os.fsencode(os.readlink(path))
+            h.update(b"blob %d\0" % len(target))
+            h.update(target)
+            return h.digest()
+        h.update(b"blob %d\0" % size)
+        with open(path, "rb") as f:
+            while block := f.read(1 << 20):
+                h.update(block)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def _file_status(index: GitIndex, entry: IndexEntry, path: str, size: int, mtime: float) -> str:
+    """MODIFIED or "" for a tracked file."""
+    if entry.assume_clean:
+        return ""
+    if entry.size == size & 0xFFFFFFFF and entry.mtime == int(mtime) and not index.is_racy(entry):
+        return ""
+    if entry.size != size & 0xFFFFFFFF or size > HASH_MAX_BYTES:
+        return MODIFIED
+    return "" if _blob_sha(path, size, entry.mode) == entry.sha else MODIFIED
+
+
+def status(path: str, is_dir: bool, size: int, mtime: float, state: DirState | None = None) -> str:
+    """MODIFIED, UNTRACKED, IGNORED or "" (clean / outside a repository).
+
+    state is the dir_state() of the entry's directory, looked up if not given.
+    """
+    directory, name = os.path.split(path)
+    if state is None:
+        state = dir_state(directory)
+    if state.root is None or name == ".git":
+        return ""
+    rel = f"{state.rel_dir}/{name}" if state.rel_dir else name
+    index = state.index
+    entry = index.entries.get(rel)
+    if is_dir:
+        if entry is not None and entry.mode == _S_IFGITLINK:
+            return ""
+        if index.tracks_below(rel):
+            return MODIFIED if name in state.changed_dirs() else ""
+    elif entry is not None:
+        return _file_status(index, entry, path, size, mtime)
+    if state.rules.ignored(rel, is_dir):
+        return IGNORED
+    return UNTRACKED
+
+
+# Global singleton instance
+repo_cache = RepoCache()
@@ -0,0 +1,119 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
+                               QLineEdit, QListWidget, QListWidgetItem, QPushButton)
+from PySide6.QtCore import Qt, QEvent
+import qtawesome as qta
+
+from frecency import frecency
+
+# Number of matches listed
+JUMP_RESULTS = 50
+
+
+class JumpDialog(QDialog):
+    """Fuzzy "jump to" prompt over the frecency index of visited folders."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.FramelessWindowHint | Qt.Dialog)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setMinimumSize(640, 420)
+        self.target = None
+        # Build the search buffer now rather than on the first keystroke
+        frecency.prepare()
+        self.setup_ui()
+        self.update_matches()
+
+    def setup_ui(self):
+        outer = QVBoxLayout(self)
+        outer.setContentsMargins(0, 0, 0, 0)
+
+        container = QWidget()
+        container.setObjectName("DialogContainer")
+        outer.addWidget(container)
+
+        main_layout = QVBoxLayout(container)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.setSpacing(0)
+
+        # Title Bar
+        title_bar = QWidget()
+        title_bar.setFixedHeight(38)
+        title_bar.setObjectName("DialogTitleBar")
+        tb_layout = QHBoxLayout(title_bar)
+        tb_layout.setContentsMargins(12, 0, 6, 0)
+        icon_lbl = QLabel()
+        icon_lbl.setPixmap(qta.icon("fa5s.location-arrow", color="#89dceb").pixmap(16, 16))
+        tb_layout.addWidget(icon_lbl)
+        title_lbl = QLabel("Přejít do složky")
+        title_lbl.setStyleSheet("color: #cdd6f4; font-weight: bold;")
+        tb_layout.addWidget(title_lbl)
+        tb_layout.addStretch()
+        close_btn = QPushButton()
+        close_btn.setIcon(qta.icon("fa5s.times", color="#cdd6f4"))
+        close_btn.setFixedSize(28, 28)
+        close_btn.setObjectName("TitleCloseBtn")
+        close_btn.clicked.connect(self.reject)
+        tb_layout.addWidget(close_btn)
+        main_layout.addWidget(title_bar)
+
+        content = QWidget()
+        content.setObjectName("DialogContent")
+        layout = QVBoxLayout(content)
+        layout.setContentsMargins(12, 12, 12, 12)
+
+        self.edit = QLineEdit()
+        self.edit.setPlaceholderText("Části cesty, např. „doc pro“ …")
+        self.edit.textChanged.connect(self.update_matches)
+        self.edit.returnPressed.connect(self.accept_current)
+        self.edit.installEventFilter(self)
+        layout.addWidget(self.edit)
+
+        self.list = QListWidget()
+        self.list.itemActivated.connect(self.accept_current)
+        layout.addWidget(self.list, 1)
+
+        self.info = QLabel()
+        self.info.setStyleSheet("color: #6c7086;")
+        layout.addWidget(self.info)
+
+        main_layout.addWidget(content, 1)
+
+        self.setStyleSheet("""
+            #DialogContainer { background-color: #1e1e2e; border: 1px solid #313244; border-radius: 8px; }
+            #DialogTitleBar { background-color: #11111b; border-top-left-radius: 8px; border-top-right-radius: 8px; border-bottom: 1px solid #313244; }
+            #TitleCloseBtn { background: transparent; border: none; border-radius: 14px; }
+            #TitleCloseBtn:hover { background-color: #f38ba8; }
+            #DialogContent { background-color: #1e1e2e; border-bottom-left-radius: 8px; border-bottom-right-radius: 8px; }
+            QLineEdit { background-color: #181825; border: 1px solid #45475a; border-radius: 4px; color: #cdd6f4; padding: 6px; }
+            QLineEdit:focus { border-color: #89b4fa; }
+            QListWidget { background-color: #181825; border: 1px solid #313244; color: #cdd6f4; }
+            QListWidget::item { padding: 3px; }
+            QListWidget::item:selected { background-color: #313244; color: #89dceb; }
+        """)
+        self.edit.setFocus()
+
+    def update_matches(self):
+        self.list.clear()
+        matches = frecency.query(self.edit.text(), JUMP_RESULTS)
+        for key, score in matches:
+            icon = "fa5s.network-wired" if key.startswith("[") else "fa5s.folder"
+            item = QListWidgetItem(qta.icon(icon, color="#f9e2af"), key)
+            item.setToolTip(f"Skóre: {score:.1f}")
+            self.list.addItem(item)
+        if matches:
+            self.list.setCurrentRow(0)
+        self.info.setText(f"{len(matches)} z {len(frecency)} navštívených složek")
+
+    def eventFilter(self, obj, event):
+        # Arrows and paging move through the list while typing continues in the edit
+        if obj is self.edit and event.type() == QEvent.KeyPress:
+            if event.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+                self.list.keyPressEvent(event)
+                return True
+        return super().eventFilter(obj, event)
+
+    def accept_current(self, *_):
+        item = self.list.currentItem()
+        if item is None:
+            return
+        self.target = item.text()
+        self.accept()
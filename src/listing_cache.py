@@ -0,0 +1,126 @@
+"""
+Process-wide directory listing cache shared by all panels and tabs.
+
+Listings (ListingStore objects) are keyed by (VFS identity, path). Local
+directories and archives are validated by a stamp – the mtime of the
+directory or archive file – and dropped by the panels' file-system watchers;
+remote listings simply expire after a TTL. Entries are evicted in LRU order
+once the total ListingStore.nbytes exceeds the memory budget.
+
+Cached stores are shared between panels and must be treated as read-only.
+"""
+import os
+import time
+from collections import OrderedDict
+
+from logger import log
+
+DEFAULT_BUDGET_MB = 64
+REMOTE_TTL = 30.0  # seconds
+
+# Attributes that identify a VFS connection/archive across instances
+_IDENTITY_ATTRS = ("archive_path", "host", "port", "share", "user", "token_path")
+
+
+def vfs_identity(vfs):
+    """Stable cache identity of a VFS (None for the local file system)."""
+    if vfs is None:
+        return None
+    parts = tuple((a, getattr(vfs, a)) for a in _IDENTITY_ATTRS if getattr(vfs, a, None))
+    # Without identifying attributes (e.g. search results) the instance is the identity
+    return (type(vfs).__name__,) + (parts or (id(vfs),))
+
+
+def local_stamp(path):
+    """mtime_ns of a path, or None if it can't be stat'ed."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ListingCache:
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024,
+                 remote_ttl: float = REMOTE_TTL):
+        self.budget_bytes = budget_bytes
+        self.remote_ttl = remote_ttl
+        # key -> (store, stamp, stored_at, nbytes)
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, stamp=None):
+        """Return the cached store for key, or None if missing or stale.
+
+        Entries stored with a stamp are valid while the caller's current
+        stamp matches; entries without one expire after remote_ttl.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            store, cached_stamp, stored_at, _ = entry
+            if cached_stamp is not None:
+                valid = stamp is not None and stamp == cached_stamp
+            else:
+                valid = time.monotonic() - stored_at < self.remote_ttl
+            if valid:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return store
+            self.invalidate(key)
+        self.misses += 1
+        return None
+
+    def put(self, key, store, stamp=None):
+        self.invalidate(key)
+        size = store.nbytes
+        if size > self.budget_bytes:
+            return
+        self._entries[key] = (store, stamp, time.monotonic(), size)
+        self._bytes += size
+        while self._bytes > self.budget_bytes and self._entries:
+            old_key, (_, _, _, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            log.debug(f"[ListingCache] Evicted {old_key}")
+
+    def invalidate(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def apply_changes(self, batch):
+        """Drop local listings a change_monitor batch made stale.
+
+        A changed directory also goes stale in its parent's listing (its
+        mtime is shown there); a lost root takes everything below it.
+        """
+        for d in batch.dirs:
+            self.invalidate((None, d))
+            self.invalidate((None, os.path.dirname(d)))
+        for root in batch.lost:
+            prefix = root.rstrip(os.sep) + os.sep
+            for key in [k for k in self._entries
+                        if k[0] is None and (k[1] == root or k[1].startswith(prefix))]:
+                self.invalidate(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._entries), "bytes": self._bytes}
+
+
+# Global singleton instance
+listing_cache = ListingCache()
@@ -0,0 +1,107 @@
+"""
+Listings of the open tabs saved at shutdown and shown again at startup.
+
+At exit the main window hands the complete local listings of its tabs to
+save(); they are written as one zlib-compressed file of
+ListingStore.to_bytes() records. At the next start load() reads that file
+once, each panel takes the listing of its directory with take() and shows
+it before anything on disk is touched, then rescans in the background and
+applies the difference (stale-while-revalidate). Listings no panel claims
+go to the listing cache, where the usual directory-mtime check applies.
+
+The file is a cache: a missing, damaged or foreign one is simply ignored.
+"""
+import os
+import struct
+import zlib
+
+from listing_store import ListingStore
+from logger import log
+
+MAGIC = b"KCSNAP"
+VERSION = 1
+# Listings larger than this (ListingStore.nbytes, summed) are not saved
+SNAPSHOT_MAX_BYTES = 32 * 1024 * 1024
+
+_HEADER = struct.Struct("<6sHI")    # magic, version, number of listings
+_LEN = struct.Struct("<Q")
+
+
+def snapshot_file() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "kicommander", "listings.snap")
+
+
+class ListingSnapshots:
+    def __init__(self):
+        self._stores = {}     # path -> ListingStore read by load()
+
+    def save(self, stores, path: str | None = None, max_bytes: int = SNAPSHOT_MAX_BYTES) -> int:
+        """Write the given listings (most important first) and return how many fit."""
+        path = path or snapshot_file()
+        records, total, seen = [], 0, set()
+        for store in stores:
+            if store.base_path in seen or store.pending or not len(store):
+                continue
+            if total + store.nbytes > max_bytes:
+                continue
+            seen.add(store.base_path)
+            total += store.nbytes
+            records.append(store.to_bytes())
+        body = b"".join(_LEN.pack(len(r)) + r for r in records)
+        data = _HEADER.pack(MAGIC, VERSION, len(records)) + zlib.compress(body, 1)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning(f"[ListingSnapshots] Cannot write {path}: {e}")
+            return 0
+        log.info(f"[ListingSnapshots] Saved {len(records)} listings ({len(data) // 1024} KB)")
+        return len(records)
+
+    def load(self, path: str | None = None) -> int:
+        """Read the listings saved by the last session; returns how many were read."""
+        path = path or snapshot_file()
+        self._stores = {}
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return 0
+        try:
+            magic, version, count = _HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"unknown snapshot format {magic!r} v{version}")
+            body = zlib.decompress(data[_HEADER.size:])
+            pos = 0
+            for _ in range(count):
+                size, = _LEN.unpack_from(body, pos)
+                pos += _LEN.size
+                store = ListingStore.from_bytes(body[pos:pos + size])
+                pos += size
+                self._stores[store.base_path] = store
+        except (ValueError, struct.error, zlib.error) as e:
+            log.warning(f"[ListingSnapshots] Ignoring {path}: {e}")
+            self._stores = {}
+        return len(self._stores)
+
+    def take(self, path: str):
+        """The saved listing of path (once), or None."""
+        return self._stores.pop(path, None)
+
+    def seed(self, cache):
+        """Hand the listings no panel took to a ListingCache (validated by stamp there)."""
+        for path, store in self._stores.items():
+            if store.stamp is not None:
+                cache.put((None, path), store, store.stamp)
+        self._stores = {}
+
+    def __len__(self):
+        return len(self._stores)
+
+
+# Global singleton instance
+listing_snapshots = ListingSnapshots()
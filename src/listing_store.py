@@ -0,0 +1,302 @@
+"""
+Columnar listing store – compact storage for (very) large directory listings.
+
+Instead of one FileInfo object per row, every attribute lives in its own
+column: names share a single string buffer, numeric values sit in typed
+``array`` columns and repeating strings (extensions, owners, groups) are
+interned. FileInfo objects are only built on demand for rows that an
+operation actually touches.
+
+A store is filled by exactly one producer thread (ScanWorker / VfsWorker)
+while the UI thread may already read the rows that were published to it.
+"""
+import json
+import os
+import struct
+import sys
+from array import array
+
+from formatting import format_size, format_date, format_mode, owner_name, group_name
+
+# Pending names are merged into the shared buffer once they outnumber the
+# rows already in it, which keeps appends amortised O(1).
+_MIN_FLUSH = 256
+
+# Columns written by to_bytes(), in this order
+_COLUMNS = ("_offsets", "is_dir", "sizes", "mtimes", "modes", "ext_ids",
+            "owner_ids", "group_ids", "uids", "gids")
+_LEN = struct.Struct("<Q")
+
+
+class ListingStore:
+    def __init__(self, base_path: str = "", sep: str = os.sep):
+        self.base_path = base_path
+        self.sep = sep
+        self.stamp = None   # mtime_ns of the listed directory, set by ScanWorker
+        # Rows listed names-first whose stat() is still outstanding
+        self.pending: set[int] = set()
+
+        # (buffer, rows in buffer, pending names) – swapped atomically so a
+        # reader in another thread always sees a consistent snapshot.
+        self._names: tuple[str, int, list[str]] = ("", 0, [])
+        self._offsets = array("Q", [0])
+
+        self.is_dir = array("B")
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.modes = array("L")
+        self.ext_ids = array("I")
+        self.owner_ids = array("I")
+        self.group_ids = array("I")
+        self.uids = array("l")   # -1 when the producer supplies owner names
+        self.gids = array("l")
+
+        # Interned strings; index 0 is always the empty string
+        self._exts: list[str] = [""]
+        self._ext_index: dict[str, int] = {"": 0}
+        self._idents: list[str] = [""]
+        self._ident_index: dict[str, int] = {"": 0}
+
+        # Sparse per-row data for rows that don't fit the columns
+        self._paths: dict[int, str] = {}            # full path not derived from base_path
+        self._labels: dict[int, dict[str, str]] = {}  # display text supplied by a VFS
+
+    # ------------------------------------------------------------------ build
+    @classmethod
+    def from_infos(cls, infos, base_path: str = "", sep: str = os.sep) -> "ListingStore":
+        store = cls(base_path, sep)
+        for fi in infos:
+            store.append_info(fi)
+        store.compact()
+        return store
+
+    def append(self, name: str, is_dir: bool, size: int = 0, mtime: float = 0,
+               mode: int = 0, owner: str = "", group: str = "",
+               ext: str | None = None, full_path: str | None = None,
+               uid: int = -1, gid: int = -1, pending: bool = False) -> int:
+        """Append one entry and return its row index.
+
+        Local scanners pass raw uid/gid; names are only resolved when the
+        owner is displayed. VFS providers pass owner/group text instead.
+        pending rows carry only name and dir flag until set_stat() fills them.
+        """
+        row = len(self.is_dir)
+        if pending:
+            self.pending.add(row)
+        if ext is None:
+            ext = "" if is_dir else os.path.splitext(name)[1].lstrip(".")
+
+        self.ext_ids.append(self._intern(self._exts, self._ext_index, ext))
+        self.owner_ids.append(self._intern(self._idents, self._ident_index, owner))
+        self.group_ids.append(self._intern(self._idents, self._ident_index, group))
+        self.sizes.append(int(size or 0))
+        self.mtimes.append(float(mtime or 0))
+        self.modes.append(mode or 0)
+        self.uids.append(uid)
+        self.gids.append(gid)
+
+        if full_path is not None and full_path != self._join(name):
+            self._paths[row] = full_path
+
+        buf, flushed, pending = self._names
+        pending.append(name)
+        if len(pending) >= max(_MIN_FLUSH, flushed):
+            self._flush_names()
+
+        # Row becomes visible to readers (len()) only once every column is set
+        self.is_dir.append(1 if is_dir else 0)
+        return row
+
+    def append_info(self, fi, name: str | None = None) -> int:
+        """Append a FileInfo produced by a VFS provider (optionally renamed)."""
+        row = self.append(name or fi.name, fi.is_dir, fi.size_bytes, fi.mtime, fi.mode,
+                          fi.owner or "", fi.group or "", fi.ext, fi.full_path)
+        labels = {}
+        if fi.size.startswith("<") and not fi.is_dir:
+            labels["size"] = fi.size          # e.g. "<DOC>" for Google Docs
+        if fi.permissions and not fi.mode:
+            labels["permissions"] = fi.permissions
+        if labels:
+            self._labels[row] = labels
+        return row
+
+    def set_stat(self, row: int, size: int, mtime: float, mode: int, uid: int = -1, gid: int = -1):
+        """Fill the metadata of a pending row (deferred stat)."""
+        self.sizes[row] = int(size or 0)
+        self.mtimes[row] = float(mtime or 0)
+        self.modes[row] = mode or 0
+        self.uids[row] = uid
+        self.gids[row] = gid
+        # Readers treat the row as complete once it left the pending set
+        self.pending.discard(row)
+
+    def compact(self):
+        """Merge all pending names into the shared buffer."""
+        if self._names[2]:
+            self._flush_names()
+
+    def _flush_names(self):
+        buf, flushed, pending = self._names
+        offsets = self._offsets
+        pos = offsets[-1]
+        for name in pending:
+            pos += len(name)
+            offsets.append(pos)
+        self._names = (buf + "".join(pending), flushed + len(pending), [])
+
+    @staticmethod
+    def _intern(table: list[str], index: dict[str, int], value: str) -> int:
+        idx = index.get(value)
+        if idx is None:
+            idx = len(table)
+            table.append(value)
+            index[value] = idx
+        return idx
+
+    def _join(self, name: str) -> str:
+        base = self.base_path
+        if not base:
+            return name
+        if base.endswith(self.sep):
+            return base + name
+        return base + self.sep + name
+
+    # ------------------------------------------------------------------ access
+    def __len__(self):
+        return len(self.is_dir)
+
+    def name(self, row: int) -> str:
+        buf, flushed, pending = self._names
+        if row < flushed:
+            return buf[self._offsets[row]:self._offsets[row + 1]]
+        return pending[row - flushed]
+
+    def ext(self, row: int) -> str:
+        return self._exts[self.ext_ids[row]]
+
+    @property
+    def exts(self) -> list[str]:
+        """Interned extensions, indexed by ext_ids (read-only)."""
+        return self._exts
+
+    def owner(self, row: int) -> str:
+        idx = self.owner_ids[row]
+        return self._idents[idx] if idx else owner_name(self.uids[row])
+
+    def group(self, row: int) -> str:
+        idx = self.group_ids[row]
+        return self._idents[idx] if idx else group_name(self.gids[row])
+
+    def full_path(self, row: int) -> str:
+        path = self._paths.get(row)
+        return path if path is not None else self._join(self.name(row))
+
+    def size_text(self, row: int) -> str:
+        if self.is_dir[row]:
+            return "<DIR>"
+        label = self._labels.get(row)
+        if label and "size" in label:
+            return label["size"]
+        return format_size(self.sizes[row])
+
+    def date_text(self, row: int) -> str:
+        return format_date(self.mtimes[row])
+
+    def permissions(self, row: int) -> str:
+        label = self._labels.get(row)
+        if label and "permissions" in label:
+            return label["permissions"]
+        return format_mode(self.modes[row])
+
+    def name_index(self) -> dict[str, int]:
+        """Map every name to its row (names are unique within a directory)."""
+        return {self.name(i): i for i in range(len(self))}
+
+    def same_entry(self, row: int, other: "ListingStore", orow: int) -> bool:
+        """True when two rows carry identical attributes (name aside)."""
+        return (self.is_dir[row] == other.is_dir[orow]
+                and self.sizes[row] == other.sizes[orow]
+                and self.mtimes[row] == other.mtimes[orow]
+                and self.modes[row] == other.modes[orow]
+                and self.uids[row] == other.uids[orow]
+                and self.gids[row] == other.gids[orow]
+                and self.owner(row) == other.owner(orow)
+                and self.full_path(row) == other.full_path(orow))
+
+    def file_info(self, row: int):
+        """Materialise a FileInfo for a single row."""
+        from fs_worker import FileInfo
+        label = self._labels.get(row) or {}
+        return FileInfo(
+            self.name(row), self.ext(row), label.get("size", ""), "",
+            bool(self.is_dir[row]), self.full_path(row),
+            self.sizes[row], self.mtimes[row],
+            self.owner(row), self.group(row), label.get("permissions", ""),
+            self.modes[row],
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the listing data."""
+        total = sys.getsizeof(self._names[0])
+        for col in (self._offsets, self.is_dir, self.sizes, self.mtimes,
+                    self.modes, self.ext_ids, self.owner_ids, self.group_ids,
+                    self.uids, self.gids):
+            total += col.itemsize * len(col)
+        total += sum(len(s) for s in self._exts) + sum(len(s) for s in self._idents)
+        return total
+
+    # ------------------------------------------------------------------ snapshot
+    def to_bytes(self) -> bytes:
+        """Serialise a complete listing (no pending rows) for an on-disk snapshot.
+
+        The columns are written as raw machine arrays, so the bytes are only
+        meant to be read back on the same machine (from_bytes checks that).
+        """
+        self.compact()
+        meta = {"base_path": self.base_path, "sep": self.sep, "stamp": self.stamp,
+                "exts": self._exts, "idents": self._idents,
+                "paths": list(self._paths.items()), "labels": list(self._labels.items()),
+                "columns": [(c, getattr(self, c).typecode, getattr(self, c).itemsize)
+                            for c in _COLUMNS]}
+        parts = [json.dumps(meta).encode("utf-8"),
+                 self._names[0].encode("utf-8", "surrogatepass")]
+        parts += [getattr(self, c).tobytes() for c in _COLUMNS]
+        return b"".join(_LEN.pack(len(p)) + p for p in parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ListingStore":
+        """Inverse of to_bytes(); raises ValueError on foreign or damaged data."""
+        parts, pos = [], 0
+        try:
+            while pos < len(data):
+                size, = _LEN.unpack_from(data, pos)
+                pos += _LEN.size
+                parts.append(data[pos:pos + size])
+                pos += size
+            meta = json.loads(parts[0])
+        except (struct.error, IndexError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"damaged listing snapshot: {e}") from None
+        if len(parts) != 2 + len(_COLUMNS) or pos != len(data):
+            raise ValueError("damaged listing snapshot")
+        store = cls(meta["base_path"], meta["sep"])
+        store.stamp = meta["stamp"]
+        store._exts = meta["exts"]
+        store._ext_index = {e: i for i, e in enumerate(store._exts)}
+        store._idents = meta["idents"]
+        store._ident_index = {e: i for i, e in enumerate(store._idents)}
+        store._paths = {int(r): p for r, p in meta["paths"]}
+        store._labels = {int(r): l for r, l in meta["labels"]}
+        for (name, typecode, itemsize), raw in zip(meta["columns"], parts[2:]):
+            col = array(typecode)
+            if col.itemsize != itemsize or len(raw) % itemsize:
+                raise ValueError(f"listing snapshot from another platform ({name})")
+            col.frombytes(raw)
+            setattr(store, name, col)
+        names = parts[1].decode("utf-8", "surrogatepass")
+        rows = len(store.is_dir)
+        if len(store._offsets) != rows + 1 or store._offsets[-1] != len(names) \
+                or any(len(getattr(store, c)) != rows for c in _COLUMNS[1:]):
+            raise ValueError("damaged listing snapshot")
+        store._names = (names, rows, [])
+        return store
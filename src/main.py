@@ -33,6 +33,12 @@ from ui.panels.file_panel import FilePanel
 from action_manager import ActionManager
 from logger import setup_logger, log
 from event_bus import bus
+from listing_cache import listing_cache
+from listing_snapshot import listing_snapshots
+from frecency import frecency
+from change_monitor import change_monitor
+from mount_info import mount_monitor
+from folder_sizes import folder_size_cache
 
 class KiCommander(QMainWindow):
     def __init__(self):
@@ -81,6 +87,9 @@ class KiCommander(QMainWindow):
         cmd_menu.addAction("Refresh", self.refresh_all, "Ctrl+R")
         cmd_menu.addAction("Search", lambda: bus.action_requested.emit("search"), "Alt+F7")
         cmd_menu.addAction("Filter", lambda: bus.action_requested.emit("filter"), "Ctrl+F")
+        cmd_menu.addAction(qta.icon("fa5s.stream", color="#89dceb"), "Branch View (All Files)", lambda: bus.action_requested.emit("branch_view"), "Ctrl+B")
+        cmd_menu.addAction(qta.icon("fa5s.th", color="#f5c2e7"), "Thumbnail View", lambda: bus.action_requested.emit("thumbnail_view"), "Ctrl+Shift+F1")
+        cmd_menu.addAction(qta.icon("fa5s.weight-hanging", color="#fab387"), "Calculate Folder Sizes", lambda: bus.action_requested.emit("folder_sizes"), "Alt+Shift+Return")
         cmd_menu.addAction(qta.icon("fa5s.globe", color="#f9e2af"), "Connect to FTP", lambda: bus.action_requested.emit("connect_ftp"), "Ctrl+K")
         cmd_menu.addAction(qta.icon("fa5s.lock", color="#a6e3a1"), "Connect to SFTP/SSH", lambda: bus.action_requested.emit("connect_sftp"), "Ctrl+Shift+K")
         cmd_menu.addAction(qta.icon("fa5s.server", color="#cba6f7"), "Connect to SMB/Windows Share", lambda: bus.action_requested.emit("connect_smb"), "Ctrl+M")
@@ -89,7 +98,10 @@ class KiCommander(QMainWindow):
         cmd_menu.addAction(qta.icon("fa5s.bookmark", color="#fab387"), "Saved Connections…", lambda: bus.action_requested.emit("connection_manager"), "Ctrl+L")
         cmd_menu.addSeparator()
         cmd_menu.addAction(qta.icon("fa5s.star", color="#f9e2af"), "Favorites (Hotlist)", lambda: bus.action_requested.emit("favorites"), "Ctrl+D")
+        cmd_menu.addAction(qta.icon("fa5s.location-arrow", color="#89dceb"), "Jump to Folder…", lambda: bus.action_requested.emit("jump"), "Ctrl+J")
         cmd_menu.addAction(qta.icon("fa5s.columns", color="#89dceb"), "Compare Files (Side-by-side)", lambda: bus.action_requested.emit("compare"), "Ctrl+Alt+D")
+        cmd_menu.addAction(qta.icon("fa5s.not-equal", color="#a6e3a1"), "Compare Directories", lambda: bus.action_requested.emit("compare_dirs"), "Shift+F2")
+        cmd_menu.addAction(qta.icon("fa5s.not-equal", color="#f9e2af"), "Compare Directories (Content)", lambda: bus.action_requested.emit("compare_dirs_content"), "Ctrl+Shift+F2")
         cmd_menu.addAction(qta.icon("fa5s.copy", color="#f5c2e7"), "Find Duplicate Files", lambda: bus.action_requested.emit("duplicates"), "Ctrl+Shift+D")
         cmd_menu.addAction(qta.icon("fa5s.edit", color="#89b4fa"), "Multi-Rename Tool", lambda: bus.action_requested.emit("multi_rename"), "F11")
         cmd_menu.addAction(qta.icon("fa5s.sync", color="#89b4fa"), "Synchronize Directories", lambda: bus.action_requested.emit("sync"), "Alt+Y")
@@ -449,10 +461,10 @@ class KiCommander(QMainWindow):
             right_active = self.right_tabs.currentWidget()
             
             if active == left_active and right_active:
-                right_active.table.setFocus()
+                right_active.thumbs.current().setFocus()
                 self._last_active_panel = right_active
             elif active == right_active and left_active:
-                left_active.table.setFocus()
+                left_active.thumbs.current().setFocus()
                 self._last_active_panel = left_active
             event.accept()
         else:
@@ -475,9 +487,19 @@ class KiCommander(QMainWindow):
         # Default fallback
         left_path = self.settings.value("panels/left/path", os.path.expanduser("~") if hasattr(os, 'expanduser') else os.path.expanduser("~"))
         right_path = self.settings.value("panels/right/path", "C:\\")
-        
+
+        # Caches follow changes below the panels' directories (before the panels react)
+        bus.paths_changed.connect(listing_cache.apply_changes)
+        bus.paths_changed.connect(folder_size_cache.apply_changes)
+
+        # Live mount table for the drive bars and the scanners' mount lookups
+        mount_monitor.start()
+
+        # Listings saved at the last exit let the panels show up filled at once
+        listing_snapshots.load()
         self.add_tab(self.left_tabs, left_path)
         self.add_tab(self.right_tabs, right_path)
+        listing_snapshots.seed(listing_cache)
         
         self._last_active_panel = self.left_tabs.currentWidget()
 
@@ -495,6 +517,7 @@ class KiCommander(QMainWindow):
         if tab_widget.count() > 1:
             w = tab_widget.widget(index)
             tab_widget.removeTab(index)
+            w.release_watches()
             w.deleteLater()
 
     def _on_panel_focus(self, panel):
@@ -527,10 +550,24 @@ class KiCommander(QMainWindow):
     def closeEvent(self, event):
         self.settings.setValue("window/geometry", self.saveGeometry())
         self.settings.setValue("window/state", self.saveState())
+        self._save_listing_snapshots()
+        frecency.compact()
+        change_monitor.stop()
+        mount_monitor.stop()
         if hasattr(self, 'terminal_widget'):
             self.terminal_widget.stop()
         super().closeEvent(event)
 
+    def _save_listing_snapshots(self):
+        """Save the listings of the open tabs (visible ones first) for the next start."""
+        panels = []
+        for tabs in (self.left_tabs, self.right_tabs):
+            panels.append(tabs.currentWidget())
+        for tabs in (self.left_tabs, self.right_tabs):
+            panels += [tabs.widget(i) for i in range(tabs.count())]
+        stores = [p.snapshot_store() for p in panels if p is not None]
+        listing_snapshots.save(s for s in stores if s is not None)
+
 if __name__ == "__main__":
     # Force Taskbar Icon on Windows
     if sys.platform == "win32":
@@ -0,0 +1,336 @@
+"""
+Mount information – which filesystem a path lives on and how fast it is.
+
+On Linux the mount table comes from /proc/self/mountinfo; other platforms
+only recognise UNC paths (\\\\server\\share) as network locations. Scanners use
+is_slow() to pick names-first listing, stat_workers() to size their stat
+pool, and mark_slow() to report a slow stat latency probe. A mount is
+treated as slow after SLOW_PROBES such reports within SLOW_MARK_SECONDS,
+and only for SLOW_MARK_SECONDS after that, so one cold-cache listing does
+not flip a local disk for the rest of the session.
+
+While mount_monitor runs, the table is parsed once and re-read only when
+the kernel reports a change (mountinfo signals POLLPRI on mount and
+unmount), so the lookups above cost no file read. The monitor also answers
+free-space queries from a small pool, because statvfs() on a hung network
+mount blocks for as long as the server does.
+"""
+import os
+import re
+import select
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from logger import log
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+KIND_LOCAL, KIND_NETWORK, KIND_FUSE = "local", "network", "fuse"
+
+NETWORK_FS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph",
+    "glusterfs", "lustre", "gpfs", "beegfs", "davfs", "coda", "ocfs2", "gfs2",
+})
+# FUSE filesystems that talk to a remote end (fuse.<subtype>)
+NETWORK_FUSE = frozenset({"sshfs", "rclone", "s3fs", "gcsfuse", "davfs2", "curlftpfs", "smbnetfs"})
+
+# Concurrent stat() calls used by the scanners, by mount kind; fstype
+# entries override the kind, probed-slow local mounts get SLOW_LOCAL_WORKERS
+STAT_WORKERS = {KIND_LOCAL: 1, KIND_NETWORK: 16, KIND_FUSE: 4}
+STAT_WORKERS_FSTYPE = {"nfs": 32, "nfs4": 32, "fuse.sshfs": 8, "fuse.rclone": 8}
+SLOW_LOCAL_WORKERS = 8
+
+# Pseudo and system filesystems never shown as drives
+PSEUDO_FS = frozenset({
+    "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "securityfs", "cgroup", "cgroup2",
+    "pstore", "efivarfs", "bpf", "debugfs", "tracefs", "configfs", "fusectl", "mqueue",
+    "hugetlbfs", "autofs", "binfmt_misc", "rpc_pipefs", "nsfs", "squashfs", "overlay",
+    "ramfs", "selinuxfs", "fuse.portal", "fuse.gvfsd-fuse",
+})
+# Mount points below these are system internals (unless removable media)
+SYSTEM_PREFIXES = ("/proc", "/sys", "/dev", "/run", "/snap", "/boot", "/var/lib", "/tmp")
+REMOVABLE_PREFIXES = ("/media/", "/run/media/", "/mnt/")
+
+USAGE_TTL = 30.0       # seconds a free-space answer is reused
+USAGE_WORKERS = 4
+
+SLOW_PROBES = 2            # slow probes of a mount before it is marked slow
+SLOW_MARK_SECONDS = 600.0  # how long probes count and a mark lasts
+
+# Mounts found slow by stat latency probes: mount key -> time the mark ends
+_slow_mounts: dict[str, float] = {}
+# Recent slow probes of mounts not marked yet: mount key -> probe times
+_slow_probes: dict[str, list[float]] = {}
+# Mount table kept current by mount_monitor (None: read on every lookup)
+_table: list | None = None
+
+
+class MountEntry:
+    __slots__ = ("mount_point", "fstype", "source", "options")
+
+    def __init__(self, mount_point, fstype, source, options=""):
+        self.mount_point = mount_point
+        self.fstype = fstype
+        self.source = source
+        self.options = options
+
+    @property
+    def kind(self) -> str:
+        return classify(self.fstype)
+
+    @property
+    def removable(self) -> bool:
+        return self.mount_point.startswith(REMOVABLE_PREFIXES)
+
+    def __repr__(self):
+        return f"MountEntry({self.mount_point!r}, {self.fstype!r}, {self.source!r})"
+
+
+_OCTAL = re.compile(r"\\([0-7]{3})")
+
+
+def _unescape(field: str) -> str:
+    # mountinfo escapes space, tab, newline and backslash as \ooo
+    return _OCTAL.sub(lambda m: chr(int(m.group(1), 8)), field) if "\\" in field else field
+
+
+def parse_mountinfo(text: str) -> list[MountEntry]:
+    """Parse the contents of a mountinfo file (see proc(5))."""
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            sep = fields.index("-", 6)
+            mounts.append(MountEntry(_unescape(fields[4]), fields[sep + 1],
+                                     _unescape(fields[sep + 2]), fields[5]))
+        except (ValueError, IndexError):
+            continue
+    return mounts
+
+
+def read_mounts() -> list[MountEntry]:
+    try:
+        with open(MOUNTINFO, encoding="utf-8", errors="replace") as f:
+            return parse_mountinfo(f.read())
+    except OSError:
+        return []
+
+
+def mount_table() -> list[MountEntry]:
+    """Current mounts: mount_monitor's copy while it runs, else read now."""
+    table = _table
+    return table if table is not None else read_mounts()
+
+
+def user_mounts(mounts=None) -> list[MountEntry]:
+    """Mounts worth a drive button: "/" first, then data volumes and network shares."""
+    if mounts is None:
+        mounts = mount_table()
+    shown, seen = [], set()
+    for m in mounts:
+        mp = m.mount_point
+        if m.fstype in PSEUDO_FS or mp in seen:
+            continue
+        if mp != "/" and not m.removable and (mp + "/").startswith(
+                tuple(p + "/" for p in SYSTEM_PREFIXES)):
+            continue
+        if m.kind == KIND_LOCAL and mp != "/" and not m.source.startswith("/dev/"):
+            continue    # zfs datasets, bind helpers and the like
+        seen.add(mp)
+        shown.append(m)
+    shown.sort(key=lambda m: (m.mount_point != "/", m.mount_point))
+    if not shown or shown[0].mount_point != "/":
+        shown.insert(0, MountEntry("/", "", ""))
+    return shown
+
+
+def classify(fstype: str) -> str:
+    """Map a filesystem type to KIND_LOCAL, KIND_NETWORK or KIND_FUSE."""
+    if fstype in NETWORK_FS:
+        return KIND_NETWORK
+    if fstype == "fuse" or fstype == "fuseblk" or fstype.startswith("fuse."):
+        subtype = fstype.partition(".")[2]
+        return KIND_NETWORK if subtype in NETWORK_FUSE else KIND_FUSE
+    return KIND_LOCAL
+
+
+def mount_for(path: str, mounts=None) -> MountEntry | None:
+    """Mount entry holding path (longest matching mount point)."""
+    if mounts is None:
+        mounts = mount_table()
+    path = os.path.abspath(path)
+    best = None
+    for m in mounts:
+        mp = m.mount_point
+        if path == mp or path.startswith(mp.rstrip("/") + "/"):
+            if best is None or len(mp) >= len(best.mount_point):
+                best = m   # later entries shadow earlier ones on the same point
+    return best
+
+
+def _locate(path: str):
+    """(kind, mount key, fstype) of the filesystem holding path."""
+    if sys.platform == "win32":
+        kind = KIND_NETWORK if path.startswith(("\\\\", "//")) else KIND_LOCAL
+        return kind, os.path.splitdrive(os.path.abspath(path))[0].lower() or path, ""
+    m = mount_for(path, mount_table())
+    return (m.kind, m.mount_point, m.fstype) if m else (KIND_LOCAL, "/", "")
+
+
+def mount_kind(path: str) -> str:
+    return _locate(path)[0]
+
+
+def is_slow(path: str) -> bool:
+    """True if stat() on this path is expected to be slow (network/FUSE or probed)."""
+    kind, key, _ = _locate(path)
+    return kind != KIND_LOCAL or _marked_slow(key)
+
+
+def stat_workers(path: str) -> int:
+    """How many stat() calls to keep in flight when listing path."""
+    kind, key, fstype = _locate(path)
+    if fstype in STAT_WORKERS_FSTYPE:
+        return STAT_WORKERS_FSTYPE[fstype]
+    if kind == KIND_LOCAL and _marked_slow(key):
+        return SLOW_LOCAL_WORKERS
+    return STAT_WORKERS[kind]
+
+
+def mark_slow(path: str):
+    """Report that the mount holding path answered a stat() probe slowly."""
+    key, now = _locate(path)[1], time.monotonic()
+    probes = [t for t in _slow_probes.get(key, ()) if now - t < SLOW_MARK_SECONDS] + [now]
+    if len(probes) >= SLOW_PROBES:
+        _slow_probes.pop(key, None)
+        _slow_mounts[key] = now + SLOW_MARK_SECONDS
+        log.info(f"[MountInfo] {key} marked slow for {SLOW_MARK_SECONDS:.0f} s")
+    else:
+        _slow_probes[key] = probes
+
+
+def _marked_slow(key: str) -> bool:
+    until = _slow_mounts.get(key)
+    if until is None:
+        return False
+    if time.monotonic() < until:
+        return True
+    _slow_mounts.pop(key, None)     # expired: probe it again
+    return False
+
+
+class MountWorker(QObject):
+    """Re-reads mountinfo whenever the kernel flags a mount or unmount."""
+    mounts_changed = Signal(object)   # list[MountEntry]
+
+    POLL_MS = 500          # how often stop() is noticed
+
+    def __init__(self):
+        super().__init__()
+        self.generation = 0
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+
+    def run(self):
+        global _table
+        try:
+            f = open(MOUNTINFO, encoding="utf-8", errors="replace")
+        except OSError as e:
+            log.warning(f"[MountWorker] Cannot watch {MOUNTINFO}: {e}")
+            return
+        with f:
+            poller = select.poll()
+            poller.register(f.fileno(), select.POLLPRI | select.POLLERR)
+            last = None
+            while self._is_running:
+                f.seek(0)
+                mounts = parse_mountinfo(f.read())
+                key = [(m.mount_point, m.fstype, m.source) for m in mounts]
+                if key != last:
+                    _table = mounts
+                    if last is not None:
+                        log.info(f"[MountWorker] Mount table changed ({len(mounts)} mounts)")
+                        self.mounts_changed.emit(mounts)
+                    last = key
+                while self._is_running and not poller.poll(self.POLL_MS):
+                    pass
+        _table = None
+
+
+class MountThread(QThread):
+    def __init__(self):
+        super().__init__()
+        self.worker = MountWorker()
+        self.worker.moveToThread(self)
+        self.started.connect(self.worker.run)
+
+
+class MountMonitor(QObject):
+    """Live mount table and cached free-space figures for the drive bar."""
+    mounts_changed = Signal(object)      # list[MountEntry]
+    usage_ready = Signal(str, object)    # mount point, (total, free) bytes or None
+
+    def __init__(self):
+        super().__init__()
+        self._thread = None
+        self._pool = None
+        self._usage = {}                 # mount point -> (checked at, (total, free) | None)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._thread is not None or not os.path.exists(MOUNTINFO):
+            return
+        self._thread = MountThread()
+        self._thread.worker.mounts_changed.connect(self.mounts_changed)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.worker.stop()
+            thread.quit()
+            thread.wait(2000)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def usage(self, mount_point: str):
+        """(total, free) bytes of a mount if known; refreshed in the background when old.
+
+        The answer arrives through usage_ready; until then the last known
+        value (or None) is returned.
+        """
+        now = time.monotonic()
+        with self._lock:
+            checked, value = self._usage.get(mount_point, (None, None))
+            if (checked is None or now - checked > USAGE_TTL) and mount_point not in self._pending:
+                self._pending.add(mount_point)
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=USAGE_WORKERS,
+                                                    thread_name_prefix="Statvfs")
+                self._pool.submit(self._query, mount_point)
+        return value
+
+    def _query(self, mount_point):
+        try:
+            du = shutil.disk_usage(mount_point)
+            value = (du.total, du.free)
+        except OSError as e:
+            log.debug(f"[MountMonitor] No usage for {mount_point}: {e}")
+            value = None
+        with self._lock:
+            self._usage[mount_point] = (time.monotonic(), value)
+            self._pending.discard(mount_point)
+        self.usage_ready.emit(mount_point, value)
+
+
+# Global singleton instance
+mount_monitor = MountMonitor()
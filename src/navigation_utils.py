@@ -3,6 +3,7 @@ import platform
 import string
 from PySide6.QtCore import QStandardPaths, Qt, Signal
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QLabel
+from mount_info import user_mounts
 
 def get_drives():
     drives = []
@@ -13,8 +14,8 @@ def get_drives():
             if os.path.exists(drive):
                 drives.append(drive)
     else:
-        # For Linux/Mac, just root for now, could expand to /media or /Volumes
-        drives.append("/")
+        # Root first, then mounted data volumes and shares (mount_info)
+        drives += [m.mount_point for m in user_mounts()]
     return drives
 
 def get_quick_links():
@@ -4,6 +4,8 @@ Each plugin is a Python module exporting:
   - name: str          – display name
   - menu_text: str     – text shown in Commands menu
   - action(selected_files: list[str], panel) -> None  – the action to run
+Optionally it may export:
+  - file_styles: dict  – extra file list categories/extensions (see file_styles)
 """
 import os
 import importlib
@@ -44,6 +46,12 @@ def discover_plugins(plugins_dir: str) -> list[PluginInfo]:
             sys.modules[mod_name] = mod
             spec.loader.exec_module(mod)
 
+            # File list styles don't require the action interface
+            file_styles = getattr(mod, "file_styles", None)
+            if isinstance(file_styles, dict):
+                from file_styles import styles
+                styles.register(file_styles)
+
             # Validate plugin interface
             name = getattr(mod, "name", None)
             menu_text = getattr(mod, "menu_text", None)
@@ -0,0 +1,57 @@
+"""
+Prefix index for type-ahead search – lowercased names kept sorted.
+
+The index follows one ListingStore: update() merges rows appended since
+the last call (a streaming scan adds them chunk by chunk) in one linear
+merge, so the keys are never re-sorted while a listing grows. Lookups are two bisects;
+the matches of a prefix are the contiguous range [lo, hi).
+"""
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+from sort_engine import UP_NAMES
+
+# Chunks up to this size are inserted one by one, larger ones merged
+_INSORT_ROWS = 16
+
+
+class PrefixIndex:
+    def __init__(self, store):
+        self.store = store
+        self._keys: list[str] = []     # lowercased names, ascending
+        self._rows = array("I")        # store row of every key
+        self._indexed = 0              # store rows [0, _indexed) are in the index
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self):
+        """Index the rows appended to the store since the last call."""
+        st, start = self.store, self._indexed
+        end = len(st)
+        if end <= start:
+            return
+        new = sorted((st.name(i).lower(), i) for i in range(start, end) if st.name(i) not in UP_NAMES)
+        self._indexed = end
+        if len(new) <= _INSORT_ROWS:
+            for key, row in new:
+                pos = bisect_left(self._keys, key)
+                self._keys.insert(pos, key)
+                self._rows.insert(pos, row)
+            return
+        merged = list(merge(zip(self._keys, self._rows), new))
+        self._keys = [k for k, _ in merged]
+        self._rows = array("I", (r for _, r in merged))
+
+    def matches(self, prefix: str) -> tuple[int, int]:
+        """Index range [lo, hi) of the names starting with prefix (case-insensitive)."""
+        prefix = prefix.lower()
+        keys = self._keys
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def row(self, k: int) -> int:
+        """Store row of the k-th name in the index."""
+        return self._rows[k]
@@ -1,6 +1,7 @@
 import uuid
 from PySide6.QtCore import QObject, Signal, QThread
 from vfs_ops import VfsOperationWorker
+from folder_sizes import folder_size_cache
 
 class QueueItem:
     def __init__(self, op_type, sources, target_path, source_vfs=None, target_vfs=None):
@@ -92,6 +93,9 @@ class QueueManager(QObject):
                 item.status = "Completed" if success else "Error"
                 item.error_msg = "" if success else message
                 item.progress = 100
+                # Even a failed operation may have changed part of the tree
+                if item.source_vfs is None and item.target_vfs is None:
+                    folder_size_cache.forget_above([p for p in [*item.sources, item.target_path] if p])
                 break
         
         # Clean up thread
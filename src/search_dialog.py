@@ -124,11 +124,8 @@ class SearchWorker(QObject):
                         stats = os.stat(full)
                         size_bytes = stats.st_size
                         mtime = stats.st_mtime
-                        size_str = self.format_size(size_bytes)
-                        date_str = time.strftime('%d.%m.%Y %H:%M', time.localtime(mtime))
                         ext = os.path.splitext(fname)[1].lstrip('.')
-                        perms = stat.filemode(stats.st_mode)
-                        file_info = FileInfo(fname, ext, size_str, date_str, False, full, size_bytes, mtime, permissions=perms)
+                        file_info = FileInfo(fname, ext, "", "", False, full, size_bytes, mtime, mode=stats.st_mode)
                     except OSError:
                         # Fallback
                         file_info = FileInfo(fname, "", "0 B", "", False, full)
@@ -0,0 +1,61 @@
+"""
+Range-based selection helpers for FilePanel.
+
+QItemSelectionModel already stores selections as row ranges, but
+selectedRows() turns them into one QModelIndex per row. These helpers
+stay on (first, last) ranges instead, so selecting, counting and mapping
+100k rows costs O(ranges) Qt calls rather than O(rows).
+"""
+from fnmatch import translate
+import re
+
+from PySide6.QtCore import QItemSelection, QItemSelectionModel
+
+
+def selection_ranges(selection) -> list[tuple[int, int]]:
+    """Sorted, merged (first, last) row ranges of a QItemSelection."""
+    spans = sorted((r.top(), r.bottom()) for r in selection)
+    merged = []
+    for first, last in spans:
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def rows_to_ranges(rows) -> list[tuple[int, int]]:
+    """Collapse ascending row numbers into (first, last) ranges."""
+    ranges = []
+    for r in rows:
+        if ranges and ranges[-1][1] == r - 1:
+            ranges[-1] = (ranges[-1][0], r)
+        else:
+            ranges.append((r, r))
+    return ranges
+
+
+def to_item_selection(model, ranges) -> QItemSelection:
+    last_col = model.columnCount() - 1
+    selection = QItemSelection()
+    for first, last in ranges:
+        selection.select(model.index(first, 0), model.index(last, last_col))
+    return selection
+
+
+def select_ranges(selection_model, ranges, select=True):
+    """Add (or remove) whole rows in one selection change."""
+    flags = QItemSelectionModel.Select if select else QItemSelectionModel.Deselect
+    selection_model.select(to_item_selection(selection_model.model(), ranges),
+                           flags | QItemSelectionModel.Rows)
+
+
+def pattern_matcher(text: str):
+    """Case-insensitive name test for select-by-pattern ("*.py;*.txt", "re:...")."""
+    if text.startswith("re:"):
+        return re.compile(text[3:], re.IGNORECASE).search
+    patterns = [p.strip() for p in text.split(";") if p.strip()] or ["*"]
+    # "*.*" also matches names without an extension, as in Total Commander
+    patterns = ["*" if p == "*.*" else p for p in patterns]
+    return re.compile("|".join(translate(p) for p in patterns), re.IGNORECASE).match
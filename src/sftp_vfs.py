@@ -4,7 +4,6 @@ Implements the VFS interface to return FileInfo objects, using paramiko.
 """
 import os
 import stat
-import time
 import paramiko
 from fs_worker import FileInfo
 from logger import log
@@ -73,10 +72,6 @@ class SFTPVFS:
                 is_dir = stat.S_ISDIR(attr.st_mode) if attr.st_mode else False
                 size_bytes = attr.st_size or 0
                 mtime = attr.st_mtime or 0
-                date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime)) if mtime else ""
-
-                import stat
-                permissions = stat.filemode(attr.st_mode) if attr.st_mode else ""
                 owner, group = str(attr.st_uid or 0), str(attr.st_gid or 0)
                 
                 # Attempt to parse longname for string owner/group
@@ -89,15 +84,13 @@ class SFTPVFS:
                 fi = FileInfo(
                     name=name,
                     ext="" if is_dir else os.path.splitext(name)[1].lstrip("."),
-                    size="<DIR>" if is_dir else self.format_size(size_bytes),
-                    date=date_str,
                     is_dir=is_dir,
                     full_path=f"{path.rstrip('/')}/{name}",
                     size_bytes=size_bytes,
                     mtime=mtime,
                     owner=owner,
                     group=group,
-                    permissions=permissions
+                    mode=attr.st_mode or 0
                 )
                 files.append(fi)
         except Exception as e:
@@ -205,18 +198,3 @@ class SFTPVFS:
             except Exception as e:
                 log.error(f"[SFTPVFS] Error closing SSH session: {e}")
             self._ssh = None
-
-    # ------------------------------------------------------------------ #
-    #  Helpers
-    # ------------------------------------------------------------------ #
-
-    @staticmethod
-    def format_size(size_bytes: int) -> str:
-        if size_bytes == 0:
-            return "0 B"
-        import math
-        size_name = ("B", "KB", "MB", "GB", "TB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return f"{s} {size_name[i]}"
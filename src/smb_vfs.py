@@ -4,8 +4,6 @@ Implements the VFS interface using pysmb.
 """
 import os
 import io
-import time
-import math
 import socket
 from smb.SMBConnection import SMBConnection
 from fs_worker import FileInfo
@@ -80,13 +78,10 @@ class SMBVFS:
                 size_bytes = entry.file_size
                 # SMB returns create_time / last_write_time as Unix timestamps
                 mtime = entry.last_write_time or 0
-                date_str = time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime)) if mtime else ""
 
                 fi = FileInfo(
                     name=name,
                     ext="" if is_dir else os.path.splitext(name)[1].lstrip("."),
-                    size="<DIR>" if is_dir else self.format_size(size_bytes),
-                    date=date_str,
                     is_dir=is_dir,
                     full_path=f"{path.rstrip('/')}/{name}",
                     size_bytes=size_bytes,
@@ -172,17 +167,3 @@ class SMBVFS:
             except Exception:
                 pass
             self._conn = None
-
-    # ------------------------------------------------------------------ #
-    #  Helpers
-    # ------------------------------------------------------------------ #
-
-    @staticmethod
-    def format_size(size_bytes: int) -> str:
-        if size_bytes == 0:
-            return "0 B"
-        size_name = ("B", "KB", "MB", "GB", "TB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return f"{s} {size_name[i]}"
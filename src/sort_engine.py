@@ -0,0 +1,134 @@
+"""
+Sort engine for FileModel – cached sort keys and permutations per listing.
+
+Key columns are computed once per ListingStore (and extended as a scan
+appends rows); every (column, direction) permutation is cached, and the
+descending one is derived from the ascending one by reversing the dir and
+file groups in O(n). Names compare naturally ("file2" < "file10"), and the
+name is the secondary key for all other columns.
+"""
+import re
+from array import array
+
+UP_NAMES = ("..", " .. ")
+
+COL_NAME, COL_EXT, COL_SIZE, COL_DATE, COL_ATTR, COL_OWNER = range(6)
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(text: str) -> tuple:
+    """Case-insensitive key that orders embedded numbers by value."""
+    text = text.lower()
+    parts = _DIGITS.split(text)
+    if len(parts) == 1:
+        return (text,)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+class SortEngine:
+    def __init__(self, store):
+        self.store = store
+        self._keys: dict[int, list] = {}    # column -> key per store row
+        self._perms: dict = {}              # (column, ascending) -> (perm, up, dirs)
+        self._perm_rows = 0                 # row count the cached perms cover
+        self._by_name = None                # rows [0, n) in name order (secondary key)
+        self._dir_sizes = {}                # store row -> calculated folder size
+
+    # ------------------------------------------------------------------ keys
+    def keys(self, col: int, n: int):
+        """Key column for rows [0, n), computed on first use."""
+        st = self.store
+        if col == COL_SIZE:
+            if not self._dir_sizes:
+                return st.sizes
+            keys = self._keys.get(COL_SIZE)
+            if keys is None or len(keys) < n:
+                keys = self._keys[COL_SIZE] = array("q", st.sizes)
+                for row, size in self._dir_sizes.items():
+                    keys[row] = size
+            return keys
+        if col == COL_DATE:
+            return st.mtimes
+        keys = self._keys.setdefault(col, [])
+        if len(keys) < n:
+            rows = range(len(keys), n)
+            if col == COL_EXT:
+                keys.extend(st.ext(i).lower() for i in rows)
+            elif col == COL_ATTR:
+                keys.extend(st.permissions(i) for i in rows)
+            elif col == COL_OWNER:
+                keys.extend(st.owner(i) for i in rows)
+            else:
+                keys.extend(natural_key(st.name(i)) for i in rows)
+        return keys
+
+    def invalidate(self):
+        """Forget keys and orders that depend on row metadata (deferred stat)."""
+        for col in (COL_SIZE, COL_ATTR, COL_OWNER):
+            self._keys.pop(col, None)
+        self._perms.clear()
+
+    def set_dir_sizes(self, sizes: dict):
+        """Sort directories by calculated folder sizes (store row -> bytes)."""
+        self._dir_sizes = dict(sizes)
+        self._keys.pop(COL_SIZE, None)
+        for key in [k for k in self._perms if k[0] == COL_SIZE]:
+            del self._perms[key]
+
+    def key_fn(self, col: int):
+        """Per-row key (primary, name) matching the order of order()."""
+        n = len(self.store)
+        names = self.keys(COL_NAME, n)
+        if col == COL_NAME:
+            return names.__getitem__
+        primary = self.keys(col, n)
+        return lambda i: (primary[i], names[i])
+
+    def group(self, i: int) -> int:
+        """Sort group of a row: 0 = '..', 1 = dirs, 2 = files."""
+        st = self.store
+        if st.is_dir[i]:
+            return 0 if st.name(i) in UP_NAMES else 1
+        return 2
+
+    # ------------------------------------------------------------------ order
+    def order(self, col: int, ascending: bool, n: int) -> array:
+        """Sorted copy of store rows [0, n): '..' first, then dirs, then files."""
+        if n != self._perm_rows:
+            self._perms.clear()
+            self._by_name = None
+            self._perm_rows = n
+        entry = self._perms.get((col, ascending))
+        if entry is None:
+            if ascending:
+                entry = self._sort(col, n)
+            else:
+                perm, up, dirs = self._ascending(col, n)
+                desc = perm[:up]
+                desc.extend(perm[up:up + dirs][::-1])
+                desc.extend(perm[up + dirs:][::-1])
+                entry = (desc, up, dirs)
+            self._perms[(col, ascending)] = entry
+        return array("I", entry[0])
+
+    def _ascending(self, col: int, n: int):
+        entry = self._perms.get((col, True))
+        if entry is None:
+            entry = self._perms[(col, True)] = self._sort(col, n)
+        return entry
+
+    def _sort(self, col: int, n: int):
+        # Secondary key first; the stable primary sort keeps it for ties
+        if self._by_name is None:
+            self._by_name = sorted(range(n), key=self.keys(COL_NAME, n).__getitem__)
+        perm = self._by_name
+        if col != COL_NAME:
+            perm = sorted(perm, key=self.keys(col, n).__getitem__)
+        group = self.group
+        groups = ([], [], [])
+        for i in perm:
+            groups[group(i)].append(i)
+        up, dirs, files = groups
+        return array("I", up + dirs + files), len(up), len(dirs)
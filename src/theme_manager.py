@@ -79,6 +79,14 @@ THEMES = {
     }
 }
 
+# Per-theme overrides of file list styles (see file_styles.FileStyleTable):
+# theme -> {category: {"icon"/"color"/"text_color": ...}}
+THEME_FILE_STYLES = {
+    "Latte": {
+        "file": {"color": "subtext0"},
+    },
+}
+
 class ThemeManager:
     @staticmethod
     def get_theme_colors(theme_name: str) -> dict:
@@ -126,3 +134,6 @@ class ThemeManager:
             
         compiled = ThemeManager.compile_stylesheet(qss_content, theme_name)
         app.setStyleSheet(compiled)
+
+        from file_styles import styles
+        styles.set_theme(theme_name)
@@ -0,0 +1,306 @@
+"""
+Thumbnails for the panel's grid view, cached on disk per the freedesktop
+Thumbnail Managing Standard.
+
+A thumbnail lives in $XDG_CACHE_HOME/thumbnails/<normal|large>/ as
+md5(file URI).png and carries the source's URI and mtime in PNG text
+chunks (Thumb::URI, Thumb::MTime); a cached file whose Thumb::MTime no
+longer matches is regenerated. The directory is shared with other desktop
+applications, so evict() only counts and deletes the thumbnails this app
+wrote (Software text chunk), oldest first, to keep them under
+CACHE_MAX_BYTES.
+
+Images are decoded with Pillow (JPEGs via draft(), i.e. already scaled by
+the decoder; HEIC/HEIF with pillow-heif) or, without Pillow, with
+QImageReader scaled reads. ThumbnailLoader runs this on a pool for the rows
+the view asks for; everything here produces QImage, which unlike QPixmap
+may be created outside the UI thread.
+"""
+import hashlib
+import io
+import os
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
+from PySide6.QtGui import QImage, QImageReader
+
+from logger import log
+
+try:
+    from PIL import Image, ImageOps
+    from PIL.PngImagePlugin import PngInfo
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+else:
+    try:
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+    except ImportError:
+        pass
+
+NORMAL, LARGE = 128, 256
+_SIZE_DIRS = {NORMAL: "normal", LARGE: "large"}
+
+THUMB_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif", "bmp", "webp", "tif", "tiff",
+                              "heic", "heif", "ico", "tga", "ppm"})
+
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+EVICT_EVERY = 200          # new thumbnails written between eviction passes
+_stored = 0
+_stored_lock = threading.Lock()
+SOFTWARE = "KiCommander"
+
+POOL_WORKERS = 4
+FLUSH_MS = 80
+
+
+def cache_root() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "thumbnails")
+
+
+def file_uri(path: str) -> str:
+    return Path(os.path.abspath(path)).as_uri()
+
+
+def cache_path(path: str, size: int = NORMAL) -> str:
+    digest = hashlib.md5(file_uri(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_root(), _SIZE_DIRS[size], digest + ".png")
+
+
+def load_cached(path: str, mtime: float, size: int = NORMAL) -> QImage | None:
+    """The cached thumbnail of path if it is still valid for mtime."""
+    image = QImage(cache_path(path, size))
+    if image.isNull():
+        return None
+    if image.text("Thumb::MTime") != str(int(mtime)) or image.text("Thumb::URI") != file_uri(path):
+        return None
+    return image
+
+
+def thumbnail(path: str, mtime: float, size: int = NORMAL) -> QImage | None:
+    """Thumbnail of an image file from the cache, generated (and stored) if needed."""
+    image = load_cached(path, mtime, size)
+    if image is not None:
+        return image
+    if os.path.abspath(path).startswith(cache_root() + os.sep):
+        return None          # never thumbnail thumbnails
+    data = _render_pil(path, mtime, size) if HAS_PIL else _render_qt(path, mtime, size)
+    if data is None:
+        return None
+    _store(cache_path(path, size), data)
+    image = QImage.fromData(data, "PNG")
+    return None if image.isNull() else image
+
+
+def _render_pil(path, mtime, size):
+    try:
+        with Image.open(path) as im:
+            im.draft("RGB", (size, size))    # JPEG: let the decoder downscale
+            im = ImageOps.exif_transpose(im)
+            im.thumbnail((size, size))
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGBA")
+            info = PngInfo()
+            for key, value in _text_chunks(path, mtime):
+                info.add_text(key, value)
+            out = io.BytesIO()
+            im.save(out, "PNG", pnginfo=info)
+            return out.getvalue()
+    except Exception as e:
+        log.debug(f"[thumbnails] Pillow cannot thumbnail {path}: {e}")
+        return None
+
+
+def _render_qt(path, mtime, size):
+    from PySide6.QtCore import QBuffer, QByteArray, QIODevice
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    full = reader.size()
+    if full.isValid() and (full.width() > size or full.height() > size):
+        reader.setScaledSize(full.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        log.debug(f"[thumbnails] Cannot read {path}: {reader.errorString()}")
+        return None
+    for key, value in _text_chunks(path, mtime):
+        image.setText(key, value)
+    buf = QByteArray()
+    device = QBuffer(buf)
+    device.open(QIODevice.WriteOnly)
+    image.save(device, "PNG")
+    return bytes(buf)
+
+
+def _text_chunks(path, mtime):
+    return (("Thumb::URI", file_uri(path)), ("Thumb::MTime", str(int(mtime))),
+            ("Software", SOFTWARE))
+
+
+def _store(target: str, data: bytes):
+    """Write a thumbnail atomically (temp file + rename), private to the user."""
+    try:
+        os.makedirs(os.path.dirname(target), mode=0o700, exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except OSError as e:
+        log.debug(f"[thumbnails] Cannot store {target}: {e}")
+        return
+    global _stored
+    with _stored_lock:
+        _stored += 1
+        due = _stored % EVICT_EVERY == 0
+    if due:
+        evict()
+
+
+def _written_by_us(path: str) -> bool:
+    """Whether a cached PNG carries our Software text chunk (read up to IDAT only)."""
+    marker = b"Software\0" + SOFTWARE.encode("latin-1")
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != b"\x89PNG\r\n\x1a\n":
+                return False
+            while True:
+                head = f.read(8)
+                if len(head) < 8:
+                    return False
+                length, kind = struct.unpack(">I4s", head)
+                if kind == b"IDAT" or kind == b"IEND":
+                    return False
+                if kind == b"tEXt" and length == len(marker):
+                    if f.read(length) == marker:
+                        return True
+                    f.seek(4, os.SEEK_CUR)
+                else:
+                    f.seek(length + 4, os.SEEK_CUR)
+    except OSError:
+        return False
+
+
+def evict(max_bytes: int = CACHE_MAX_BYTES):
+    """Delete our oldest thumbnails until the ones we wrote fit in max_bytes.
+
+    Thumbnails of other applications in the shared directory are neither
+    counted nor touched.
+    """
+    files, total = [], 0
+    for sub in _SIZE_DIRS.values():
+        try:
+            with os.scandir(os.path.join(cache_root(), sub)) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if not entry.name.endswith(".png") or not _written_by_us(entry.path):
+                        continue
+                    files.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError:
+            continue
+    if total <= max_bytes:
+        return 0
+    files.sort()
+    removed = 0
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    log.info(f"[thumbnails] Evicted {removed} thumbnails, cache now {total // 1024} KB")
+    return removed
+
+
+class ThumbnailLoader(QObject):
+    """Makes thumbnails for one view on the shared pool, wanted rows first.
+
+    want() replaces the queue with the rows the view shows (and the ones
+    just around them), so scrolling away drops work nobody waits for.
+    Finished images are handed over in batches every FLUSH_MS.
+    """
+    ready = Signal(object, object)   # store, [(store row, QImage or None)]
+
+    _pool = None
+
+    def __init__(self, size=NORMAL, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self._store = None
+        self._generation = 0
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._active = 0               # pool jobs draining the queue
+        self._results = deque()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(FLUSH_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    @classmethod
+    def _executor(cls):
+        if cls._pool is None:
+            cls._pool = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="Thumbs")
+            cls._pool.submit(evict)    # trim what earlier sessions left behind
+        return cls._pool
+
+    def want(self, store, rows):
+        """Thumbnail these store rows (in this order) and nothing else queued before."""
+        if store is not self._store:
+            self._store = store
+            self._generation += 1
+        gen = self._generation
+        jobs = [(gen, r, store.full_path(r), store.mtimes[r]) for r in rows]
+        with self._lock:
+            self._queue = deque(jobs)
+            start = max(0, min(POOL_WORKERS - self._active, len(jobs)))
+            self._active += start
+        pool = self._executor()
+        for _ in range(start):
+            pool.submit(self._drain)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def cancel(self):
+        with self._lock:
+            self._queue.clear()
+        self._generation += 1
+
+    def _drain(self):
+        """Pool thread: take rows off the shared queue until it is empty."""
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._active -= 1
+                    return
+                gen, row, path, mtime = self._queue.popleft()
+            try:
+                image = thumbnail(path, mtime, self.size)
+            except Exception as e:
+                log.warning(f"[ThumbnailLoader] {path}: {e}")
+                image = None
+            self._results.append((gen, row, image))
+
+    def flush(self):
+        results, gen, batch = self._results, self._generation, []
+        while results:
+            rgen, row, image = results.popleft()
+            if rgen == gen:
+                batch.append((row, image))
+        with self._lock:
+            idle = not self._active
+        if idle and not results:
+            self._flush_timer.stop()
+        if batch:
+            self.ready.emit(self._store, batch)
@@ -1,24 +1,42 @@
 import os
+import re
 import sys
+from array import array
 from collections import deque
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, 
                              QHeaderView, QLabel, QPushButton, QLineEdit, 
                              QMenu, QTabWidget, QInputDialog, QMessageBox, QApplication)
-from PySide6.QtCore import Qt, QSettings, QTimer, QFileSystemWatcher, QSortFilterProxyModel, QEvent, Signal, QItemSelectionModel
+from PySide6.QtCore import Qt, QSettings, QTimer, QFileSystemWatcher, QEvent, Signal, QItemSelectionModel
 from PySide6.QtGui import QDrag, QPixmap
 
 import qtawesome as qta
 
-from file_model import FileModel
-from fs_worker import ScanThread, FileInfo, VfsThread
+from file_model import FileModel, BASE_COLUMNS
+from computed_columns import columns
+import git_status
+from filter_proxy import FilterProxyModel
+from fs_worker import ScanThread, VfsThread, StatThread, BranchThread
+from folder_sizes import FolderSizeThread, folder_size_cache
+from sort_engine import COL_SIZE
 from navigation_utils import get_drives, get_quick_links, BreadcrumbsWidget
 from preview_dialog import PreviewDialog
 from properties_dialog import PropertiesDialog
 from archive_vfs import ArchiveVFS, is_archive
+from listing_cache import listing_cache, vfs_identity, local_stamp
+from listing_snapshot import listing_snapshots
+from frecency import frecency
+from change_monitor import change_monitor
+from mount_info import mount_monitor, mount_for, mount_table, user_mounts, is_slow, KIND_NETWORK, KIND_FUSE
+from formatting import format_size
+from selection import selection_ranges, rows_to_ranges, select_ranges, pattern_matcher
+from dir_compare import MARK_NEWER, MARK_UNIQUE
 
 from ui.panels.interaction_handler import InteractionHandler
 from ui.panels.context_menu import ContextMenuBuilder
+from ui.panels.type_ahead import TypeAhead
+from ui.panels.thumbnail_view import ThumbnailView
 from event_bus import bus
+from logger import log
 
 class FilePanel(QWidget):
     got_focus = Signal(object) # emits self
@@ -31,16 +49,32 @@ class FilePanel(QWidget):
         self.settings = QSettings("KiCommander", "Desktop")
         
         last_path = self.settings.value(f"panels/{self.panel_id}/path")
-        if last_path and os.path.exists(last_path):
+        # Listing saved at the last exit: shown before the disk is touched
+        snapshot = listing_snapshots.take(last_path) if last_path else None
+        if snapshot is not None or (last_path and os.path.exists(last_path)):
             self.current_path = last_path
 
         # File system watcher for auto-refresh
         self._watcher = QFileSystemWatcher(self)
         self._watcher.directoryChanged.connect(self._on_dir_changed)
+        self._watcher.fileChanged.connect(self._on_git_index_changed)
         self._debounce = QTimer(self)
         self._debounce.setSingleShot(True)
         self._debounce.setInterval(300)
         self._debounce.timeout.connect(self._do_auto_refresh)
+        # Recursive watch (change_monitor, Linux): changes anywhere below current_path
+        self._monitored = None
+        bus.paths_changed.connect(self._on_paths_changed)
+        self._refresh_thread = None
+        # Deferred stat of names-first listings (slow mounts)
+        self._stat_thread = None
+        # Folder size calculation (Space on a directory, Alt+Shift+Enter)
+        self._size_thread = None
+        # Navigation generation: every navigation cancels the scans of the
+        # previous one, and results tagged with an older generation are dropped
+        self._generation = 0
+        self.thread = None
+        self._stopped_threads = []
 
         # VFS state (unified for archives and network protocols)
         self._vfs = None           # Any VFS instance supporting list_dir/extract_file
@@ -49,13 +83,20 @@ class FilePanel(QWidget):
         self._locked = False
 
         self.history = deque(maxlen=20)
+        self._select_pattern = "*.*"   # last Num+/Num- pattern
+        self._branch = False           # flat recursive listing (branch view) shown
+        self._branch_root = ""
 
         # Components
         self.interaction_handler = InteractionHandler(self)
         self.menu_builder = ContextMenuBuilder(self)
+        self.type_ahead = TypeAhead(self)
 
         self.setup_ui()
-        self.refresh_path(self.current_path)
+        if snapshot is not None:
+            self.show_snapshot(snapshot)
+        else:
+            self.refresh_path(self.current_path)
 
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -63,9 +104,12 @@ class FilePanel(QWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(2)
 
-        # Drive Selector Bar
+        # Drive Selector Bar (kept current by mount_monitor)
         self.drive_bar = QHBoxLayout()
         self.drive_bar.setSpacing(2)
+        self._drive_buttons = {}
+        mount_monitor.mounts_changed.connect(self._on_mounts_changed)
+        mount_monitor.usage_ready.connect(self._on_mount_usage)
         self.update_drive_bar()
         main_layout.addLayout(self.drive_bar)
 
@@ -127,23 +171,37 @@ class FilePanel(QWidget):
         header.setSectionsClickable(True)
         header.sectionClicked.connect(self._on_header_clicked)
         header.setCursor(Qt.PointingHandCursor)
+        # Right-click on the header picks the computed columns
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self._show_columns_menu)
+        self.set_extra_columns(self.settings.value(f"panels/{self.panel_id}/columns", []) or [])
+        # Names-first listings stat the rows in the viewport first
+        self.table.verticalScrollBar().valueChanged.connect(self._prioritize_visible)
         
         body_layout.addWidget(self.table, 1)
+
+        # Thumbnail grid (Ctrl+Shift+F1), shown instead of the table
+        self.thumbs = ThumbnailView(self)
+        body_layout.addWidget(self.thumbs.view, 1)
         main_layout.addLayout(body_layout, 1)
 
         # Inline filter bar (hidden by default)
         self.filter_bar = QLineEdit()
-        self.filter_bar.setPlaceholderText("Type to filter files... (Escape to close)")
+        self.filter_bar.setPlaceholderText("Type to filter files... (*.py glob, re: regex, ~ fuzzy; Escape to close)")
         self.filter_bar.setObjectName("FilterBar")
         self.filter_bar.textChanged.connect(self.on_filter_changed)
         self.filter_bar.setVisible(False)
         main_layout.addWidget(self.filter_bar)
 
-        # Proxy model for filtering
-        self.proxy = QSortFilterProxyModel()
+        # Type-ahead quick search prefix (shown while typing)
+        main_layout.addWidget(self.type_ahead.label)
+
+        # Proxy model for filtering (indexed, case-insensitive name match)
+        self.proxy = FilterProxyModel(self)
         self.proxy.setSourceModel(self.model)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        self.proxy.setFilterKeyColumn(0)
+
+        if self.settings.value(f"panels/{self.panel_id}/thumbnails", "false") == "true":
+            self.thumbs.set_active(True)
 
     def update_drive_bar(self):
         # Clear existing
@@ -152,15 +210,39 @@ class FilePanel(QWidget):
             if item.widget():
                 item.widget().deleteLater()
         
+        self._drive_buttons = {}
+        mounts = mount_table() if sys.platform != "win32" else None
         for drive in get_drives():
-            btn = QPushButton(drive.replace("\\", ""))
-            btn.setFixedWidth(40)
+            label = drive.replace("\\", "")
+            if label != "/" and sys.platform != "win32":
+                label = os.path.basename(drive)[:12]    # mount point name
+            btn = QPushButton(label)
+            btn.setMinimumWidth(40)
             btn.setStyleSheet("padding: 2px; font-size: 9pt;")
-            btn.setToolTip(f"Open drive {drive}")
             btn.clicked.connect(lambda checked, d=drive: self.refresh_path(d))
             self.drive_bar.addWidget(btn)
+            self._drive_buttons[drive] = btn
+            # Free space comes later from mount_monitor's pool (usage_ready)
+            self._on_mount_usage(drive, mount_monitor.usage(drive), mounts)
         self.drive_bar.addStretch()
 
+    def _on_mount_usage(self, drive, usage, mounts=None):
+        btn = self._drive_buttons.get(drive)
+        if btn is None:
+            return
+        tip = f"Open drive {drive}"
+        m = mount_for(drive, mounts) if sys.platform != "win32" else None
+        if m is not None and m.mount_point == drive and m.fstype:
+            tip += f"\n{m.fstype} ({m.kind}) – {m.source}"
+        if usage is not None:
+            total, free = usage
+            tip += f"\n{format_size(free)} free of {format_size(total)}"
+        btn.setToolTip(tip)
+
+    def _on_mounts_changed(self, mounts):
+        self.update_drive_bar()
+        self.update_sidebar()
+
     def update_sidebar(self):
         # Clear existing
         while self.sidebar.count():
@@ -176,37 +258,87 @@ class FilePanel(QWidget):
             btn.clicked.connect(lambda checked, p=link["path"]: self.refresh_path(p))
             self.sidebar.addWidget(btn)
 
-    def get_selected_paths(self):
-        indices = self.table.selectionModel().selectedRows()
-        if not indices:
+        # Removable media and network shares below the quick links
+        if sys.platform == "win32":
+            return
+        for m in user_mounts():
+            if m.kind == KIND_NETWORK:
+                icon = "fa5s.network-wired"
+            elif m.kind == KIND_FUSE:
+                icon = "fa5s.plug"
+            elif m.removable:
+                icon = "fa5s.hdd"
+            else:
+                continue
+            btn = QPushButton()
+            btn.setIcon(qta.icon(icon, color="#89dceb"))
+            btn.setFixedSize(32, 32)
+            btn.setToolTip(f"{m.mount_point}\n{m.fstype} – {m.source}")
+            btn.clicked.connect(lambda checked, p=m.mount_point: self.refresh_path(p))
+            self.sidebar.addWidget(btn)
+
+    def _selected_store_rows(self):
+        """Store rows of the selection (or of the current row), in view order."""
+        ranges = selection_ranges(self.table.selectionModel().selection())
+        if not ranges:
             # Fallback to current index
             curr = self.table.currentIndex()
-            if curr.isValid():
-                indices = [curr]
-                
-        paths = []
-        for index in indices:
-            row = index.row()
-            if self.filter_visible:
-                row = self.proxy.mapToSource(index).row()
-            file_info = self.model.get_file(row)
-            if file_info and file_info.name != " .. ":
-                paths.append(file_info.full_path)
-        return paths
+            if not curr.isValid():
+                return array("I")
+            ranges = [(curr.row(), curr.row())]
+        if self.filter_visible:
+            ranges = self.proxy.source_ranges(ranges)
+        return self.model.store_rows_in(ranges)
+
+    def get_selected_paths(self):
+        st = self.model.store
+        return [st.full_path(i) for i in self._selected_store_rows() if st.name(i) != " .. "]
 
     def _on_selection_changed(self, selected, deselected):
         # Notify the rest of the app (e.g. QuickView) about the newly focused item
-        indices = self.table.selectionModel().selectedRows()
-        if indices:
-            row = indices[0].row()
+        selection = self.table.selectionModel().selection()
+        if not selection.isEmpty():
+            index = self.table.model().index(selection.first().top(), 0)
             if self.filter_visible:
-                row = self.proxy.mapToSource(indices[0]).row()
-            file_info = self.model.get_file(row)
+                index = self.proxy.mapToSource(index)
+            file_info = self.model.get_file(index.row())
             if file_info:
                 bus.selection_changed.emit(file_info)
         else:
             bus.selection_changed.emit(None)
 
+    def select_by_pattern(self, select=True):
+        """Num+ / Num-: select or deselect files whose name matches a pattern."""
+        title = "Select Files" if select else "Deselect Files"
+        text, ok = QInputDialog.getText(self, title, "Pattern (*.py;*.txt or re:regex):",
+                                        text=self._select_pattern)
+        if not ok:
+            return
+        self._select_pattern = text
+        try:
+            test = pattern_matcher(text)
+        except re.error as e:
+            QMessageBox.warning(self, title, f"Invalid pattern: {e}")
+            return
+        rows = self.model.match_rows(test)
+        if self.filter_visible:
+            rows = self.proxy.rows_from_source(rows)
+        select_ranges(self.table.selectionModel(), rows_to_ranges(rows), select)
+
+    def is_scanning(self):
+        return any(t is not None and t.isRunning()
+                   for t in (self.thread, self._refresh_thread, self._stat_thread))
+
+    def show_compare_marks(self, store, marks):
+        """Colour rows by a directory comparison and select the ones to copy over."""
+        if not self.model.set_marks(store, marks):
+            return False   # the panel moved on while comparing
+        rows = self.model.marked_rows((MARK_NEWER, MARK_UNIQUE))
+        if self.filter_visible:
+            rows = self.proxy.rows_from_source(rows)
+        self.table.clearSelection()
+        select_ranges(self.table.selectionModel(), rows_to_ranges(rows))
+        return True
 
     def _enter_vfs(self, vfs, vfs_type, inner=""):
         """Enter VFS mode (archive, ftp, etc.)."""
@@ -259,14 +391,16 @@ class FilePanel(QWidget):
         self.filter_bar.setVisible(self.filter_visible)
         if self.filter_visible:
             self.table.setModel(self.proxy)
+            self.thumbs.sync_model()
             self.filter_bar.setFocus()
         else:
             self.filter_bar.clear()
             self.table.setModel(self.model)
-            self.table.setFocus()
+            self.thumbs.sync_model()
+            self.thumbs.current().setFocus()
 
     def on_filter_changed(self, text):
-        self.proxy.setFilterFixedString(text)
+        self.proxy.setFilterText(text)
 
     def eventFilter(self, source, event):
         if self.interaction_handler.eventFilter(source, event):
@@ -275,12 +409,16 @@ class FilePanel(QWidget):
 
     def refresh(self):
         """Standard refresh: works for both real filesystem and VFS."""
-        if self._vfs:
-            self._refresh_vfs()
+        # Folder sizes cached by directory mtime miss changes deeper in the tree
+        folder_size_cache.clear()
+        if self._branch:
+            self.show_branch_view()
+        elif self._vfs:
+            self._refresh_vfs(use_cache=False)
         else:
-            self.refresh_path(self.current_path)
+            self.refresh_path(self.current_path, use_cache=False)
 
-    def refresh_path(self, path):
+    def refresh_path(self, path, use_cache=True):
         # Exit VFS mode if entering a real path
         self._vfs = None
         self._vfs_inner = ""
@@ -295,39 +433,200 @@ class FilePanel(QWidget):
                 self.window().add_tab(tw, new_abs)
                 return
 
+        self._cancel_scans()
+        self.type_ahead.reset()
+        self._branch = False
+        self.model.computed_local = True
         self.current_path = new_abs
         self.path_label.setText(self.current_path)
         self.breadcrumbs.set_path(self.current_path)
         self.folder_changed.emit(os.path.basename(self.current_path) or self.current_path)
         bus.directory_selected.emit(self.current_path)
         
-        # Update history
+        # Update history and the frecency index of the jump prompt
         if not self.history or self.history[-1] != self.current_path:
             self.history.append(self.current_path)
+            frecency.visit(self.current_path)
 
         self.settings.setValue(f"panels/{self.panel_id}/path", self.current_path)
-        
-        # Update watcher to new directory
-        watched = self._watcher.directories()
+        self._watch_current()
+        # Free space on the drive buttons: refreshed in the background once stale
+        for drive in self._drive_buttons:
+            mount_monitor.usage(drive)
+
+        # Cached listing (other panel, tab or history): show it now, revalidate after
+        if use_cache:
+            cached = listing_cache.get((None, self.current_path), local_stamp(self.current_path))
+            if cached is not None:
+                self.model.update_files(cached)
+                self._restore_selection(None, 0)
+                self._do_auto_refresh()
+                return
+
+        self._start_scan(ScanThread(self.current_path), self.on_scan_finished)
+
+    def _watch_current(self):
+        """Point the file-system watcher at the current directory."""
+        watched = self._watcher.directories() + self._watcher.files()
         if watched:
             self._watcher.removePaths(watched)
         if os.path.isdir(self.current_path):
             self._watcher.addPath(self.current_path)
-        
-        self.model.clear_for_scan()
-        self.thread = ScanThread(self.current_path)
-        self.thread.worker.chunk_filled.connect(self.model.add_files)
-        self.thread.worker.finished.connect(self.on_scan_finished)
-        self.thread.start()
+            # Staging or committing changes the git column without touching the directory.
+            # Finding the repository stats every ancestor: not on network/FUSE mounts
+            index = None if is_slow(self.current_path) else git_status.index_path(self.current_path)
+            if index and os.path.exists(index):
+                self._watcher.addPath(index)
+        if self._monitored != self.current_path:
+            self.release_watches()
+            if change_monitor.watch(self.current_path):
+                self._monitored = self.current_path
+
+    def release_watches(self):
+        """Drop the recursive watch (navigation away, tab closed)."""
+        if self._monitored is not None:
+            change_monitor.unwatch(self._monitored)
+            self._monitored = None
+
+    def _on_paths_changed(self, batch):
+        """Changes below the current directory, coalesced by change_monitor."""
+        if self._vfs or self._branch or self._monitored != self.current_path:
+            return
+        if self.current_path in batch.dirs or self.current_path in batch.lost:
+            # Also catches files rewritten in place, which the directory watcher misses
+            self._debounce.start()
+        # Measured folder sizes go stale with any change inside the folder
+        store = self.model.store
+        rows = [r for r in self.model.dir_rows()
+                if self.model.dir_size(r) is not None and batch.touches(store.full_path(r))]
+        if rows:
+            self.calculate_folder_sizes(rows)
+
+    def show_snapshot(self, store):
+        """Show a listing saved at the last exit and rescan it in the background.
+
+        Nothing here touches the directory, so a slow or absent mount can't
+        hold up the window; the watcher is set up once the rescan is back.
+        """
+        self._cancel_scans()
+        self.type_ahead.reset()
+        self._branch = False
+        self.model.computed_local = True
+        self.current_path = store.base_path
+        self.path_label.setText(self.current_path)
+        self.breadcrumbs.set_path(self.current_path)
+        self.folder_changed.emit(os.path.basename(self.current_path) or self.current_path)
+        self.history.append(self.current_path)
+        self.model.update_files(store)
+        self._restore_selection(None, 0)
+
+        self._refresh_thread = ScanThread(self.current_path, names_first=False)
+        self._refresh_thread.worker.generation = self._generation
+        self._refresh_thread.worker.finished.connect(self._on_snapshot_revalidated)
+        self._refresh_thread.worker.error.connect(self._on_snapshot_failed)
+        self._refresh_thread.start()
+
+    def _on_snapshot_revalidated(self, store):
+        if self._is_stale() or self._vfs or store.base_path != self.current_path:
+            return
+        self._watch_current()
+        self._on_auto_refresh_finished(store)
+
+    def _on_snapshot_failed(self, message):
+        if self._is_stale():
+            return
+        log.warning(f"[FilePanel] Saved listing of {self.current_path} is gone: {message}")
+        self.refresh_path(os.path.expanduser("~"))
+
+    def snapshot_store(self):
+        """The listing to save at exit: complete local directories only."""
+        store = self.model.store
+        scanning = self.thread is not None and self.thread.isRunning()
+        if self._vfs or self._branch or scanning or store.pending \
+                or store.base_path != self.current_path:
+            return None
+        return store
+
+    def _cancel_scans(self):
+        """Start a new navigation generation and stop all scans of the old one."""
+        self._generation += 1
+        for thread in (self.thread, self._refresh_thread, self._stat_thread, self._size_thread):
+            self._retire(thread)
+        self.thread = self._refresh_thread = self._stat_thread = self._size_thread = None
+
+    def _retire(self, thread):
+        if thread is not None and thread.isRunning():
+            thread.worker.stop()
+            # Keep a reference until the thread has really exited
+            if thread not in self._stopped_threads:
+                self._stopped_threads.append(thread)
+                thread.finished.connect(lambda t=thread: self._stopped_threads.remove(t))
+
+    def _start_scan(self, thread, on_finished):
+        """Run a listing thread for the current navigation generation."""
+        thread.worker.generation = self._generation
+        self.thread = thread
+        self.model.clear_for_scan(thread.worker.store)
+        thread.worker.chunk_filled.connect(self._on_chunk_filled)
+        thread.worker.finished.connect(on_finished)
+        thread.start()
+
+    def _is_stale(self):
+        """True inside a worker slot whose sender belongs to an older navigation."""
+        return getattr(self.sender(), "generation", None) != self._generation
+
+    def _on_chunk_filled(self, store, start, end):
+        if not self._is_stale():
+            self.model.add_rows(store, start, end)
+
+    def toggle_thumbnail_view(self):
+        """Ctrl+Shift+F1: switch between the table and the thumbnail grid."""
+        on = not self.thumbs.active
+        self.thumbs.set_active(on)
+        self.settings.setValue(f"panels/{self.panel_id}/thumbnails", "true" if on else "false")
+
+    def toggle_branch_view(self):
+        """Ctrl+B: switch between the directory and all files below it."""
+        if not self._branch:
+            self.show_branch_view()
+        elif self._vfs:
+            self._refresh_vfs()
+        else:
+            self.refresh_path(self.current_path)
+
+    def show_branch_view(self):
+        """List every file under the current directory (or VFS path) as one flat list."""
+        self._cancel_scans()
+        self.type_ahead.reset()
+        self._branch = True
+        root = (self._vfs_inner or "/") if self._vfs else self.current_path
+        self._branch_root = f"[{self._vfs_type.upper()}] {root}" if self._vfs else root
+        self.path_label.setText(f"[BRANCH] {self._branch_root}")
+        thread = BranchThread(root, self._vfs)
+        thread.worker.progress.connect(self._on_branch_progress)
+        self._start_scan(thread, self._on_branch_finished)
+
+    def _on_branch_progress(self, files, dirs):
+        if not self._is_stale():
+            self.path_label.setText(f"[BRANCH] {self._branch_root} – {files:,} files in {dirs:,} dirs…")
+
+    def _on_branch_finished(self, store):
+        if self._is_stale() or store is not self.model.store:
+            return
+        worker = self.sender()
+        self.path_label.setText(f"[BRANCH] {self._branch_root} – {worker.files:,} files "
+                                f"in {worker.dirs:,} dirs")
+        self.table.horizontalHeader().viewport().update()
+        self._restore_selection(None, 0)
 
     def _start_manual_drag(self):
         """Starts a manual QDrag for the selected items."""
-        selected_indexes = self.table.selectionModel().selectedRows()
-        if not selected_indexes:
+        if not self.table.selectionModel().hasSelection():
             return
 
         drag = QDrag(self.table)
-        mime_data = self.model.mimeData(selected_indexes)
+        # URLs are only built when the drop target asks for them
+        mime_data = self.model.mime_for(self._selected_store_rows())
         drag.setMimeData(mime_data)
 
         # Create a simple icon as drag pixmap
@@ -338,28 +637,50 @@ class FilePanel(QWidget):
         # Force CopyAction so files are NEVER moved when dragging to desktop
         drag.exec(Qt.CopyAction)
 
-    def _refresh_vfs(self):
+    def _vfs_cache_key(self):
+        return (vfs_identity(self._vfs), self._vfs_inner or "/")
+
+    def _vfs_cache_stamp(self):
+        # Archives are validated by the archive file's mtime, remote VFS by TTL
+        path = getattr(self._vfs, "archive_path", None)
+        return local_stamp(path) if path else None
+
+    def _refresh_vfs(self, use_cache=True):
         """List contents of the current VFS + inner path."""
         if not self._vfs: return
+        self._cancel_scans()
+        self.type_ahead.reset()
+        self._branch = False
+        self.model.computed_local = False
+        self.release_watches()
         
         display_path = self._vfs_inner if self._vfs_inner else "/"
         self.path_label.setText(f"[{self._vfs_type.upper()}] {display_path}")
         self.breadcrumbs.set_path(display_path, vfs_type=self._vfs_type)
         self.folder_changed.emit(f"[{self._vfs_type.upper()}] {os.path.basename(display_path) or '/'}")
         
-        # Update history with VFS type tag
+        # Update history (and the frecency index) with VFS type tag
         vfs_tag = f"[{self._vfs_type.upper()}] {display_path}"
         if not self.history or self.history[-1] != vfs_tag:
             self.history.append(vfs_tag)
-        
-        self.model.clear_for_scan()
+            frecency.visit(vfs_tag)
+
+        if use_cache:
+            cached = listing_cache.get(self._vfs_cache_key(), self._vfs_cache_stamp())
+            if cached is not None:
+                self.model.update_files(cached)
+                self._restore_selection(None, 0)
+                return
+        else:
+            listing_cache.invalidate(self._vfs_cache_key())
+
         # Use VfsThread for asynchronous listing
-        self.thread = VfsThread(self._vfs, self._vfs_inner)
-        self.thread.worker.chunk_filled.connect(self.model.add_files)
-        self.thread.worker.finished.connect(self._on_vfs_scan_finished)
-        self.thread.start()
+        self._start_scan(VfsThread(self._vfs, self._vfs_inner), self._on_vfs_scan_finished)
 
-    def _on_vfs_scan_finished(self, files):
+    def _on_vfs_scan_finished(self, store):
+        # Ignore listings superseded by a newer navigation
+        if self._is_stale() or store is not self.model.store or not self._vfs:
+            return
         # Capture current selection
         prev_name = None
         prev_row = self.table.currentIndex().row() if self.table.currentIndex().isValid() else 0
@@ -369,11 +690,11 @@ class FilePanel(QWidget):
             if fi: prev_name = fi.name
 
         # Add '..' entry to go back
-        up = FileInfo(name=" .. ", ext="", size="", date="", is_dir=True,
-                      full_path="..")
-        up._size_bytes = 0
-        up._mtime = 0
-        self.model.update_files([up] + files)
+        row = store.append(" .. ", True, full_path="..")
+        store.stamp = self._vfs_cache_stamp()
+        listing_cache.put(self._vfs_cache_key(), store, store.stamp)
+        # Rows were merged in sorted order while streaming; only '..' is new
+        self.model.add_rows(store, row, row + 1)
         
         self._restore_selection(prev_name, prev_row)
 
@@ -398,9 +719,17 @@ class FilePanel(QWidget):
         self.table.selectionModel().clearSelection()
         self.table.selectRow(row_to_select)
         self.table.setCurrentIndex(new_idx)
-        self.table.scrollTo(new_idx)
+        self.thumbs.current().scrollTo(new_idx)
 
-    def on_scan_finished(self, files):
+    def on_scan_finished(self, store):
+        # Ignore listings superseded by a newer navigation
+        if self._is_stale() or store is not self.model.store:
+            return
+        if store.pending:
+            # Names-first listing: cached once the deferred stat completed
+            self._start_stat_fill(store)
+        else:
+            listing_cache.put((None, store.base_path), store, store.stamp)
         # Capture current selection
         prev_name = None
         prev_row = self.table.currentIndex().row() if self.table.currentIndex().isValid() else 0
@@ -409,21 +738,133 @@ class FilePanel(QWidget):
             fi = self.model.get_file(idx.row())
             if fi: prev_name = fi.name
         
-        self.model.update_files(files)
+        # All chunks are already merged in sorted order – no final reset
         self.table.horizontalHeader().viewport().update()
         
         self._restore_selection(prev_name, prev_row)
 
+    def _start_stat_fill(self, store):
+        self._stat_thread = StatThread(store)
+        self._stat_thread.worker.generation = self._generation
+        self._stat_thread.worker.rows_filled.connect(self.model.update_rows)
+        self._stat_thread.worker.finished.connect(self._on_stat_finished)
+        self._prioritize_visible()
+        self._stat_thread.start()
+
+    def _prioritize_visible(self, *args):
+        """Let the deferred stat fill the rows in the viewport first."""
+        thread = self._stat_thread
+        if thread is None or thread.isFinished():
+            return
+        view = self.table
+        first = view.rowAt(0)
+        if first < 0:
+            return
+        last = view.rowAt(view.viewport().height() - 1)
+        if last < 0:
+            last = view.model().rowCount() - 1
+        rows = range(first, last + 1)
+        if self.filter_visible:
+            rows = [self.proxy.mapToSource(self.proxy.index(r, 0)).row() for r in rows]
+        thread.worker.prioritize(self.model.store_rows(rows))
+
+    def _on_stat_finished(self, store):
+        if self._is_stale() or store is not self.model.store or store.pending:
+            return
+        listing_cache.put((None, store.base_path), store, store.stamp)
+        self.model.resort()
+
     def _on_dir_changed(self, path):
         """Called by QFileSystemWatcher when directory contents change."""
+        listing_cache.invalidate((None, path))
         self._debounce.start()  # restart 300ms timer
 
+    def calculate_folder_sizes(self, rows=None):
+        """Measure directories (store rows, default: all in view) in the background."""
+        if self._vfs:
+            return     # walking remote trees is left to the properties dialog
+        store = self.model.store
+        if rows is None:
+            rows = self.model.dir_rows()
+        if not rows:
+            return
+        thread = self._size_thread
+        if thread is not None and thread.isRunning() and thread.worker.store is store \
+                and thread.worker.add(rows):
+            return
+        self._retire(thread)
+        thread = self._size_thread = FolderSizeThread(store, rows)
+        thread.worker.generation = self._generation
+        thread.worker.sizes_ready.connect(self._on_folder_sizes)
+        thread.worker.finished.connect(self._on_folder_sizes_finished)
+        thread.start()
+
+    def _on_folder_sizes(self, store, sizes):
+        if self._is_stale():
+            return
+        self.model.set_dir_sizes(store, sizes)
+
+    def _on_folder_sizes_finished(self, store):
+        if self._is_stale() or store is not self.model.store:
+            return
+        if self.model._sort_col == COL_SIZE:
+            self.model.resort()
+
+    def _on_git_index_changed(self, path):
+        # git replaces the index by renaming index.lock, which ends the watch
+        if os.path.exists(path) and path not in self._watcher.files():
+            self._watcher.addPath(path)
+        self.model.refresh_column("git")
+
     def _do_auto_refresh(self):
-        """Debounced auto-refresh – re-scan current directory."""
-        if os.path.isdir(self.current_path):
-            self.thread = ScanThread(self.current_path)
-            self.thread.worker.finished.connect(self.on_scan_finished)
-            self.thread.start()
+        """Debounced auto-refresh – re-scan and apply only the differences."""
+        if self._vfs or self._branch or not os.path.isdir(self.current_path):
+            return
+        if self.is_scanning():
+            # A scan is still filling the model; try again after it settles
+            self._debounce.start()
+            return
+        # Full stat in the background: the delta needs complete rows
+        self._refresh_thread = ScanThread(self.current_path, names_first=False)
+        self._refresh_thread.worker.generation = self._generation
+        self._refresh_thread.worker.finished.connect(self._on_auto_refresh_finished)
+        self._refresh_thread.start()
+
+    def _on_auto_refresh_finished(self, store):
+        # Drop the result if the user navigated away meanwhile
+        if self._is_stale() or self._vfs or store.base_path != self.current_path:
+            return
+        listing_cache.put((None, store.base_path), store, store.stamp)
+        self.model.apply_delta(store)
+
+    def _show_columns_menu(self, pos):
+        menu = QMenu(self)
+        shown = [c.key for c in self.model.extra_columns()]
+        for column in columns.all():
+            action = menu.addAction(column.title)
+            action.setCheckable(True)
+            action.setChecked(column.key in shown)
+            action.toggled.connect(lambda on, k=column.key: self._toggle_column(k, on))
+        menu.exec(self.table.horizontalHeader().mapToGlobal(pos))
+
+    def _toggle_column(self, key, on):
+        keys = [c.key for c in self.model.extra_columns() if c.key != key]
+        if on:
+            keys.append(key)
+        self.set_extra_columns(keys)
+        self.settings.setValue(f"panels/{self.panel_id}/columns", keys)
+
+    def set_extra_columns(self, keys):
+        """Show computed columns (see computed_columns) after the base ones."""
+        if isinstance(keys, str):
+            keys = [keys]   # QSettings returns a one-item list as a plain string
+        widths = [self.table.columnWidth(c) for c in range(BASE_COLUMNS)]
+        self.model.set_extra_columns(keys)
+        # A model reset resizes the sections; restore the base widths
+        for c, w in enumerate(widths):
+            self.table.setColumnWidth(c, w)
+        for n, column in enumerate(self.model.extra_columns()):
+            self.table.setColumnWidth(BASE_COLUMNS + n, column.width)
 
     def _on_header_clicked(self, col: int):
         """Toggle asc/desc on same column, switch to asc on new column."""
@@ -441,6 +882,24 @@ class FilePanel(QWidget):
         else:
             self.refresh_path(path)
 
+    def jump_to(self, target):
+        """Navigate to a local path or a "[TYPE] /inner" VFS tag; False if it can't be opened.
+
+        A VFS tag doesn't say which connection or archive it belongs to, so
+        (as in the history menu) it only applies inside a VFS of that type.
+        """
+        if target.startswith("["):
+            tag_end = target.find("]")
+            if tag_end == -1 or not self._vfs or target[1:tag_end] != self._vfs_type.upper():
+                return False
+            self._vfs_inner = target[tag_end+2:]
+            self._refresh_vfs()
+            return True
+        if not os.path.isdir(target):
+            return False
+        self.refresh_path(target)
+        return True
+
     def show_history(self):
         """Shows a popup menu with directory history."""
         if not self.history: return
@@ -509,21 +968,5 @@ class FilePanel(QWidget):
 
     def get_selected_items(self):
         """Returns list of FileInfo objects for selected rows."""
-        rows = set(index.row() for index in self.table.selectionModel().selectedRows())
-        if self.filter_visible:
-            rows = set(self.proxy.mapToSource(self.table.model().index(r, 0)).row() for r in rows)
-        
-        if not rows:
-            # Fallback to current index if nothing selected
-            curr = self.table.currentIndex()
-            if curr.isValid():
-                r = curr.row()
-                if self.filter_visible: r = self.proxy.mapToSource(curr).row()
-                rows = {r}
-
-        items = []
-        for r in sorted(rows):
-            fi = self.model.get_file(r)
-            if fi and fi.name != " .. ":
-                items.append(fi)
-        return items
+        st = self.model.store
+        return [st.file_info(i) for i in self._selected_store_rows() if st.name(i) != " .. "]
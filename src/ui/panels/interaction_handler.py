@@ -17,7 +17,14 @@ class InteractionHandler:
         self._drag_start_pos = None
 
     def eventFilter(self, source, event):
-        if event.type() == QEvent.KeyPress and source is self.p.table:
+        if event.type() == QEvent.KeyPress and source in (self.p.table, self.p.thumbs.view):
+            # Num+ / Num- select or deselect by pattern (Total Commander style)
+            if event.key() in (Qt.Key_Plus, Qt.Key_Minus) and event.modifiers() & Qt.KeypadModifier:
+                self.p.select_by_pattern(event.key() == Qt.Key_Plus)
+                return True
+            # Typing the start of a name jumps to it (quick search)
+            if self.p.type_ahead.handle_key(event):
+                return True
             # Enter to open
             # Enter to open, or Ctrl+Enter to copy name to command line
             if event.key() in (Qt.Key_Return, Qt.Key_Enter):
@@ -45,6 +52,11 @@ class InteractionHandler:
                 index = self.p.table.currentIndex()
                 if index.isValid():
                     self.p.table.selectionModel().select(index, QItemSelectionModel.Toggle | QItemSelectionModel.Rows)
+                    # On a directory Space also calculates its size
+                    row = self.p.proxy.mapToSource(index).row() if self.p.filter_visible else index.row()
+                    f = self.p.model.get_file(row)
+                    if f and f.is_dir and f.name != "..":
+                        self.p.calculate_folder_sizes(self.p.model.store_rows([row]))
                     self.p.table.setCurrentIndex(self.p.model.index(index.row() + 1, 0))
                     return True
             # Ctrl + Up for New Tab: Open current path in a new tab
@@ -176,7 +188,6 @@ class InteractionHandler:
                     if f and f.is_dir and f.name != "..":
                         target_path = f.full_path if not self.p._vfs else os.path.join(self.p._vfs_inner, f.name)
 
-                from event_bus import bus
                 bus.file_operation_requested.emit('copy', sources, target_path)
                 event.acceptProposedAction()
                 return True
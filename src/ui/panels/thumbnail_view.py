@@ -0,0 +1,112 @@
+from PySide6.QtCore import Qt, QPoint, QSize, QTimer
+from PySide6.QtWidgets import QListView
+
+from thumbnails import NORMAL, ThumbnailLoader
+
+
+class ThumbnailView:
+    """Thumbnail grid (Total Commander style, Ctrl+Shift+F1) in place of the table.
+
+    The grid shows the table's model and shares its selection model, so
+    marking, the cursor and every command keep working on either view.
+    Thumbnails are requested only for the cells on screen and one screen
+    above and below; a scroll replaces that request, so flinging through a
+    large folder never queues the rows it passed.
+    """
+    PREFETCH_MS = 50
+
+    def __init__(self, panel):
+        self.p = panel # FilePanel instance
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.IconMode)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setMovement(QListView.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setWordWrap(True)
+        self.view.setIconSize(QSize(NORMAL, NORMAL))
+        self.view.setGridSize(QSize(NORMAL + 24, NORMAL + 40))
+        self.view.setSelectionMode(QListView.ExtendedSelection)
+        self.view.setDragEnabled(True)
+        self.view.setDragDropMode(QListView.DragOnly)
+        self.view.setVisible(False)
+        self.view.doubleClicked.connect(self.p.on_double_click)
+        self.view.installEventFilter(self.p)
+
+        self.loader = ThumbnailLoader(NORMAL, self.p)
+        self.loader.ready.connect(self.p.model.set_thumbnails)
+
+        self._timer = QTimer(self.p)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.PREFETCH_MS)
+        self._timer.timeout.connect(self._request_visible)
+        self.view.verticalScrollBar().valueChanged.connect(self.schedule)
+        model = self.p.model
+        model.modelReset.connect(self.schedule)
+        model.rowsInserted.connect(self.schedule)
+        model.layoutChanged.connect(self.schedule)
+
+    @property
+    def active(self):
+        return self.p.model.thumbnails_on
+
+    def set_active(self, on):
+        p = self.p
+        p.model.thumbnails_on = on
+        if on:
+            self.sync_model()
+        else:
+            self.loader.cancel()
+        p.table.setVisible(not on)
+        self.view.setVisible(on)
+        self.current().setFocus()
+        self.schedule()
+
+    def current(self):
+        """The view the user looks at."""
+        return self.view if self.active else self.p.table
+
+    def sync_model(self):
+        """Follow the table to its current model (the filter swaps in the proxy)."""
+        if not self.active:
+            return
+        table = self.p.table
+        if self.view.model() is not table.model():
+            self.view.setModel(table.model())
+        self.view.setSelectionModel(table.selectionModel())
+        self.view.scrollTo(table.currentIndex())
+
+    def schedule(self, *args):
+        if self.active:
+            self._timer.start()
+
+    def _request_visible(self):
+        p, model = self.p, self.p.model
+        if not self.active or not model.computed_local:
+            return
+        count = self.view.model().rowCount() if self.view.model() else 0
+        if not count:
+            return
+        first, last = self._visible_rows(count)
+        page = last - first + 1
+        # On screen first, then the next screen, then the previous one
+        rows = list(range(first, last + 1)) + \
+            list(range(last + 1, min(count, last + 1 + page))) + \
+            list(range(first - 1, max(-1, first - 1 - page), -1))
+        if p.filter_visible:
+            proxy = p.proxy
+            rows = [proxy.mapToSource(proxy.index(r, 0)).row() for r in rows]
+        self.loader.want(model.store, model.thumb_rows(model.store_rows(rows)))
+
+    def _visible_rows(self, count):
+        view, grid = self.view, self.view.gridSize()
+        area = view.viewport().rect()
+        per_line = max(1, area.width() // max(1, grid.width()))
+        lines = area.height() // max(1, grid.height()) + 2
+        first = 0
+        for y in (grid.height() // 2, grid.height()):
+            index = view.indexAt(QPoint(grid.width() // 2, y))
+            if index.isValid():
+                first = index.row() - index.row() % per_line
+                break
+        return first, min(count - 1, first + per_line * lines - 1)
@@ -0,0 +1,96 @@
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QLabel, QApplication
+
+class TypeAhead:
+    """Quick search (Total Commander style): typing the start of a name jumps to it.
+
+    Matches come from the model's PrefixIndex, so a jump is two bisects;
+    Down/Up cycle through the matches, Backspace shortens the prefix and
+    Escape or a pause in typing ends the search.
+    """
+    TIMEOUT_MS = 2000
+
+    def __init__(self, panel):
+        self.p = panel # FilePanel instance
+        self.prefix = ""
+        self._lo = self._hi = self._pos = 0
+
+        self.label = QLabel()
+        self.label.setObjectName("QuickSearch")
+        self.label.setStyleSheet("font-size: 11px; color: #89b4fa; padding-left: 4px;")
+        self.label.setVisible(False)
+
+        self._timer = QTimer(self.p)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.TIMEOUT_MS)
+        self._timer.timeout.connect(self.reset)
+
+    def handle_key(self, event):
+        """Consume a key press on the table if it belongs to the quick search."""
+        if event.modifiers() & (Qt.ControlModifier | Qt.AltModifier | Qt.MetaModifier):
+            return False
+        key, text = event.key(), event.text()
+        if self.prefix:
+            if key == Qt.Key_Escape:
+                self.reset()
+                return True
+            if key == Qt.Key_Backspace:
+                self.prefix = self.prefix[:-1]
+                if self.prefix:
+                    self._search()
+                else:
+                    self.reset()
+                return True
+            if key in (Qt.Key_Down, Qt.Key_Up):
+                self._step(1 if key == Qt.Key_Down else -1)
+                return True
+        # Space keeps toggling the selection unless a search is running
+        if text and text.isprintable() and (text != " " or self.prefix):
+            self.prefix += text
+            if not self._search():
+                self.prefix = self.prefix[:-1]   # no such name: refuse the key
+                QApplication.beep()
+            return True
+        return False
+
+    def reset(self):
+        self.prefix = ""
+        self._timer.stop()
+        self.label.setVisible(False)
+
+    def _search(self):
+        lo, hi = self.p.model.prefix_index().matches(self.prefix)
+        if lo == hi or not self._jump(lo, lo, hi, 1):
+            return False
+        self._lo, self._hi = lo, hi
+        self.label.setText(f"Quick search: {self.prefix}")
+        self.label.setVisible(True)
+        self._timer.start()
+        return True
+
+    def _step(self, step):
+        self._timer.start()
+        if self._hi > self._lo:
+            span = self._hi - self._lo
+            start = self._lo + (self._pos - self._lo + step) % span
+            self._jump(start, self._lo, self._hi, step)
+
+    def _jump(self, start, lo, hi, step):
+        """Move the cursor to the first shown match from start on, cycling in [lo, hi)."""
+        model, index_of = self.p.model, self.p.model.prefix_index()
+        span = hi - lo
+        for n in range(span):
+            k = lo + (start - lo + n * step) % span
+            row = model.view_row(index_of.row(k))
+            if row < 0:
+                continue          # not published yet
+            index = model.index(row, 0)
+            if self.p.filter_visible:
+                index = self.p.proxy.mapFromSource(index)
+                if not index.isValid():
+                    continue      # hidden by the filter
+            self._pos = k
+            self.p.table.setCurrentIndex(index)
+            self.p.thumbs.current().scrollTo(index)
+            return True
+        return False
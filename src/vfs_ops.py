@@ -34,15 +34,11 @@ class VfsOperationWorker(QObject):
             else:
                 target_full = os.path.join(self.target_path, name)
                 if os.path.exists(target_full):
-                    import time
                     stats = os.stat(target_full)
                     is_dir = os.path.isdir(target_full)
-                    mtime = stats.st_mtime
-                    date_str = time.strftime('%d.%m.%Y %H:%M', time.localtime(mtime))
-                    size_bytes = stats.st_size
-                    # Generic format_size if needed, but we'll use raw for compare
+                    # Size/date text is formatted lazily by FileInfo
                     from fs_worker import FileInfo
-                    return FileInfo(name, "", "", date_str, is_dir, target_full, size_bytes, mtime)
+                    return FileInfo(name, "", "", "", is_dir, target_full, stats.st_size, stats.st_mtime)
                 return None
         except:
             return None
@@ -120,11 +116,7 @@ class VfsOperationWorker(QObject):
                         if not hasattr(src_info, 'size'):
                             # It's likely a local path string
                             stats = os.stat(src_path)
-                            mtime = stats.st_mtime
-                            d_str = time.strftime('%d.%m.%Y %H:%M', time.localtime(mtime))
-                            from fs_worker import ScanWorker
-                            s_str = ScanWorker.format_size(stats.st_size)
-                            src_meta = FileInfo(name, "", s_str, d_str, is_dir, src_path, stats.st_size, mtime)
+                            src_meta = FileInfo(name, "", "", "", is_dir, src_path, stats.st_size, stats.st_mtime)
                         else:
                             src_meta = src_info
 
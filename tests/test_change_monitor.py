@@ -0,0 +1,152 @@
+"""Tests for change_monitor – recursive inotify watches publishing coalesced batches."""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+import change_monitor
+from change_monitor import ChangeBatch, InotifyThread, HAS_INOTIFY
+from listing_cache import ListingCache
+from listing_store import ListingStore
+
+needs_inotify = pytest.mark.skipif(not HAS_INOTIFY, reason="inotify is Linux only")
+
+
+def wait_for(cond, timeout=5.0):
+    end = time.time() + timeout
+    while not cond() and time.time() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    return cond()
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    thread = InotifyThread()
+    batches = []
+    thread.worker.changed.connect(batches.append)
+    thread.start()
+    yield thread.worker, batches
+    thread.worker.stop()
+    thread.quit()
+    thread.wait(2000)
+
+
+def seen(batches):
+    dirs, paths = set(), set()
+    for b in batches:
+        dirs |= b.dirs
+        paths |= b.paths or set()
+    return dirs, paths
+
+
+class TestChangeBatch:
+    def test_touches(self):
+        batch = ChangeBatch()
+        batch.dirs.add("/a/b/c")
+        assert batch.touches("/a/b") and batch.touches("/a/b/c")
+        assert not batch.touches("/a/bc") and not batch.touches("/x")
+
+    def test_touches_lost_roots(self):
+        batch = ChangeBatch()
+        batch.lost.add("/r/x")
+        assert batch.touches("/r") and batch.touches("/r/x/y/z")
+        assert not batch.touches("/r/y")
+
+    def test_listing_cache_drops_changed_dirs_and_parents(self):
+        cache = ListingCache()
+        for path in ("/a", "/a/b", "/a/b/c", "/z", "/r/x/y"):
+            cache.put((None, path), ListingStore(path), 1)
+        batch = ChangeBatch()
+        batch.dirs.add("/a/b")
+        batch.lost.add("/r")
+        cache.apply_changes(batch)
+        assert [(None, p) in cache for p in ("/a", "/a/b", "/a/b/c", "/z", "/r/x/y")] == \
+            [False, False, True, True, False]
+
+
+@needs_inotify
+class TestInotifyWorker:
+    def test_recursive_events_are_coalesced(self, tmp_path, monitor):
+        worker, batches = monitor
+        (tmp_path / "sub" / "deep").mkdir(parents=True)
+        worker.watch(str(tmp_path))
+        assert wait_for(lambda: len(worker._path_wd) == 3)
+        for n in range(200):
+            (tmp_path / "sub" / "deep" / f"f{n}").write_text("x")
+        (tmp_path / "top.txt").write_text("y")
+        assert wait_for(lambda: str(tmp_path / "sub" / "deep") in seen(batches)[0]
+                        and str(tmp_path) in seen(batches)[0])
+        assert len(batches) < 20
+        assert str(tmp_path / "sub" / "deep" / "f199") in seen(batches)[1]
+
+    def test_new_and_moved_directories(self, tmp_path, monitor):
+        worker, batches = monitor
+        worker.watch(str(tmp_path))
+        assert wait_for(lambda: str(tmp_path) in worker._path_wd)
+        (tmp_path / "new").mkdir()
+        assert wait_for(lambda: str(tmp_path / "new") in worker._path_wd)
+        (tmp_path / "new" / "inner.txt").write_text("z")
+        assert wait_for(lambda: str(tmp_path / "new") in seen(batches)[0])
+        os.rename(tmp_path / "new", tmp_path / "renamed")
+        assert wait_for(lambda: str(tmp_path / "renamed") in worker._path_wd
+                        and str(tmp_path / "new") not in worker._path_wd)
+
+    def test_unwatch_removes_watches(self, tmp_path, monitor):
+        worker, batches = monitor
+        (tmp_path / "a").mkdir()
+        worker.watch(str(tmp_path))
+        assert wait_for(lambda: len(worker._path_wd) == 2)
+        worker.unwatch(str(tmp_path))
+        assert wait_for(lambda: not worker._path_wd)
+
+    def test_overflow_rescans_by_mtime(self, tmp_path):
+        worker = change_monitor.InotifyWorker()
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        worker._fd = change_monitor._libc.inotify_init1(change_monitor.IN_CLOEXEC)
+        try:
+            worker._roots.add(str(tmp_path))
+            worker._add_tree(str(tmp_path))
+            time.sleep(0.01)
+            (tmp_path / "a" / "f").write_text("x")
+            batches = []
+            worker.changed.connect(batches.append)
+            worker._overflow()
+            worker._flush()
+        finally:
+            os.close(worker._fd)
+        assert batches[0].lost == {str(tmp_path)}
+        assert str(tmp_path / "a") in batches[0].dirs
+        assert str(tmp_path / "b") not in batches[0].dirs
+
+    def test_watches_per_root_are_capped(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(change_monitor, "ROOT_WATCHES", 3)
+        for name in ("a", "b", "c", "d"):
+            (tmp_path / name / "deep").mkdir(parents=True)
+        worker = change_monitor.InotifyWorker()
+        worker._fd = change_monitor._libc.inotify_init1(change_monitor.IN_CLOEXEC)
+        try:
+            assert worker._add_tree(str(tmp_path)) == 3
+            # Nearest levels first: the root and two of its children
+            assert str(tmp_path) in worker._path_wd
+            assert not any(p.endswith("deep") for p in worker._path_wd)
+        finally:
+            os.close(worker._fd)
+
+    def test_shallow_roots(self, tmp_path):
+        (tmp_path / "a" / "deep").mkdir(parents=True)
+        worker = change_monitor.InotifyWorker()
+        worker._fd = change_monitor._libc.inotify_init1(change_monitor.IN_CLOEXEC)
+        try:
+            assert worker._add_tree(str(tmp_path), depth=1) == 2
+            assert set(worker._path_wd) == {str(tmp_path), str(tmp_path / "a")}
+        finally:
+            os.close(worker._fd)
+        assert os.path.expanduser("~") in change_monitor._shallow_roots()
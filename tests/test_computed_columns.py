@@ -0,0 +1,153 @@
+"""Tests for computed_columns – lazily computed FileModel columns."""
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+from listing_store import ListingStore
+from file_model import FileModel, BASE_COLUMNS
+from computed_columns import (ComputedColumn, ColumnComputer, ValueCache, content_type, media_duration,
+                              item_count)
+
+
+def wait_for(cond, timeout=5.0):
+    end = time.time() + timeout
+    while not cond() and time.time() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    return cond()
+
+
+class TestBuiltinColumns:
+    def test_content_type_sniffs_signatures(self, tmp_path):
+        (tmp_path / "pic.dat").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 8)
+        (tmp_path / "notes").write_text("plain words\n")
+        (tmp_path / "empty").write_bytes(b"")
+        assert content_type(str(tmp_path / "pic.dat")) == "image/png"
+        assert content_type(str(tmp_path / "notes")) == "text/plain"
+        assert content_type(str(tmp_path / "empty")) == "inode/x-empty"
+
+    def test_wav_duration(self, tmp_path):
+        path = str(tmp_path / "tone.wav")
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(1000)
+            w.writeframes(b"\0\0" * 1000 * 75)
+        assert media_duration(path) == "1:15"
+
+    def test_item_count(self, tmp_path):
+        for name in ("a", "b", "c"):
+            (tmp_path / name).touch()
+        assert item_count(str(tmp_path)) == "3"
+
+
+class TestValueCache:
+    def test_cached_by_size_and_mtime(self):
+        calls = []
+        column = ComputedColumn("t", "T", lambda p: calls.append(p) or "v")
+        cache = ValueCache()
+        assert cache.text(column, "/x", 1, 1.0) == "v"
+        assert cache.text(column, "/x", 1, 1.0) == "v"
+        assert calls == ["/x"]
+        cache.text(column, "/x", 1, 2.0)
+        assert calls == ["/x", "/x"]
+
+    def test_failures_become_empty(self):
+        column = ComputedColumn("t", "T", lambda p: 1 / 0)
+        assert ValueCache().text(column, "/x", 1, 1.0) == ""
+
+    def test_keyed_by_context_stamp(self):
+        class Context:
+            def __init__(self, stamp):
+                self.value = stamp
+
+            def stamp(self, path, is_dir):
+                return self.value
+
+        calls = []
+        column = ComputedColumn("t", "T", lambda p, d, s, m, ctx: calls.append(ctx.value) or "v",
+                                with_stat=True, context=Context)
+        cache = ValueCache()
+        cache.text(column, "/x", 1, 1.0, False, Context(1))
+        cache.text(column, "/x", 1, 1.0, False, Context(1))
+        cache.text(column, "/x", 1, 1.0, False, Context(2))
+        assert calls == [1, 2]
+
+
+class TestColumnComputer:
+    def test_one_context_per_directory_and_batch(self, tmp_path):
+        st = ListingStore(str(tmp_path), "/")
+        for n in range(20):                 # more than JOB_ROWS: several pool jobs
+            st.append(f"f{n}", False, n, 1.0)
+
+        class Context:
+            def stamp(self, path, is_dir):
+                return None
+
+        built = []
+        column = ComputedColumn("ctx", "C", lambda p, d, s, m, ctx: os.path.basename(p),
+                                with_stat=True, context=lambda d: built.append(d) or Context())
+        computer = ColumnComputer()
+        computer.reset(st)
+        got = []
+        computer.ready.connect(lambda store, batch: got.extend(batch))
+        for row in range(len(st)):
+            computer.request(column, row)
+        assert wait_for(lambda: len(got) == len(st))
+        assert built == [str(tmp_path)]
+        assert sorted(text for _, _, text in got) == sorted(f"f{n}" for n in range(20))
+
+
+class TestFileModelComputed:
+    def make_model(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "f").touch()
+        (tmp_path / "a.txt").write_text("hi\n")
+        st = ListingStore(str(tmp_path), "/")
+        st.append("..", True)
+        for entry in os.scandir(tmp_path):
+            s = entry.stat()
+            st.append(entry.name, entry.is_dir(), s.st_size, s.st_mtime)
+        model = FileModel(st)
+        model.set_extra_columns(["type", "items"])
+        return model
+
+    def test_values_arrive_as_batched_data_changed(self, tmp_path):
+        model = self.make_model(tmp_path)
+        assert model.columnCount() == BASE_COLUMNS + 2
+        assert model.headers[BASE_COLUMNS:] == ["Type", "Items"]
+        changed = []
+        model.dataChanged.connect(lambda a, b, roles=(): changed.append((a.row(), b.row(), a.column())))
+
+        def texts():
+            return {model.index(r, 0).data(): (model.index(r, BASE_COLUMNS).data(),
+                                                model.index(r, BASE_COLUMNS + 1).data())
+                    for r in range(model.rowCount())}
+
+        texts()   # as if painted: requests the visible cells
+        assert wait_for(lambda: texts()["a.txt"][0] and texts()["sub"][1])
+        assert texts() == {"..": ("", ""), "sub": ("", "1"), "a.txt": ("text/plain", "")}
+        assert changed and all(c >= BASE_COLUMNS for _, _, c in changed)
+
+    def test_not_computed_off_local(self, tmp_path):
+        model = self.make_model(tmp_path)
+        model.computed_local = False
+        for r in range(model.rowCount()):
+            model.index(r, BASE_COLUMNS).data()
+        app.processEvents()
+        time.sleep(0.2)
+        app.processEvents()
+        assert all(model.index(r, BASE_COLUMNS).data() == "" for r in range(model.rowCount()))
+
+    def test_sorting_by_computed_column_is_ignored(self, tmp_path):
+        model = self.make_model(tmp_path)
+        before = list(model.view_names())
+        model.sort(BASE_COLUMNS)
+        assert list(model.view_names()) == before
+        assert model._sort_col == 0
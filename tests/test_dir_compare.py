@@ -0,0 +1,126 @@
+"""Tests for dir_compare – merged two-panel directory comparison."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from listing_store import ListingStore
+import dir_compare
+from dir_compare import (compare_stores, summarize, HashCache, CompareWorker,
+                         MARK_NONE, MARK_SAME, MARK_NEWER, MARK_OLDER, MARK_UNIQUE, MARK_DIFFERENT)
+
+
+def make_store(base, entries):
+    st = ListingStore(base, "/")
+    st.append("..", True)
+    for name, is_dir, size, mtime in entries:
+        st.append(name, is_dir, size, mtime)
+    return st
+
+
+def marks_by_name(store, marks):
+    return {store.name(i): marks[i] for i in range(len(store))}
+
+
+class TestCompareStores:
+    def test_marks_both_sides(self):
+        left = make_store("/l", [
+            ("same.txt", False, 10, 1000.0),
+            ("new.txt", False, 10, 5000.0),
+            ("old.txt", False, 10, 1000.0),
+            ("only_left", False, 1, 1.0),
+            ("size.txt", False, 10, 1000.0),
+            ("kind", True, 0, 1.0),
+            ("sub", True, 0, 1.0),
+        ])
+        right = make_store("/r", [
+            ("sub", True, 0, 9.0),
+            ("only_right", False, 1, 1.0),
+            ("old.txt", False, 10, 5000.0),
+            ("new.txt", False, 10, 1000.0),
+            ("same.txt", False, 10, 1001.5),   # within the 2 s tolerance
+            ("size.txt", False, 11, 1000.0),
+            ("kind", False, 0, 1.0),
+        ])
+        lm, rm = compare_stores(left, right, fold=False)
+        lmap, rmap = marks_by_name(left, lm), marks_by_name(right, rm)
+        assert lmap == {"..": MARK_NONE, "same.txt": MARK_SAME, "new.txt": MARK_NEWER,
+                        "old.txt": MARK_OLDER, "only_left": MARK_UNIQUE, "size.txt": MARK_DIFFERENT,
+                        "kind": MARK_DIFFERENT, "sub": MARK_NONE}
+        assert rmap["new.txt"] == MARK_OLDER and rmap["old.txt"] == MARK_NEWER
+        assert rmap["only_right"] == MARK_UNIQUE and rmap["sub"] == MARK_NONE
+        assert summarize(lm) == {"same": 1, "newer": 1, "older": 1, "unique": 1, "different": 2}
+
+    def test_fold_case_matches_names(self):
+        left = make_store("/l", [("A.TXT", False, 1, 1.0)])
+        right = make_store("/r", [("a.txt", False, 1, 1.0)])
+        assert compare_stores(left, right, fold=True)[0][1] == MARK_SAME
+        assert compare_stores(left, right, fold=False)[0][1] == MARK_UNIQUE
+
+    def test_same_content_overrides_time(self):
+        left = make_store("/l", [("f", False, 5, 9000.0), ("g", False, 5, 9000.0)])
+        right = make_store("/r", [("f", False, 5, 1000.0), ("g", False, 5, 1000.0)])
+        lm, _ = compare_stores(left, right, same_content=lambda li, ri: left.name(li) == "f")
+        assert list(lm) == [MARK_NONE, MARK_SAME, MARK_NEWER]
+
+    def test_large_listing_is_fast(self):
+        n = 100_000
+        left = make_store("/l", ((f"file{i:06d}", False, i, 1000.0) for i in range(n)))
+        right = make_store("/r", ((f"file{i:06d}", False, i, 1000.0 + (i % 3) * 10) for i in range(0, n, 2)))
+        t0 = time.perf_counter()
+        lm, rm = compare_stores(left, right)
+        elapsed = time.perf_counter() - t0
+        counts = summarize(lm)
+        assert counts["unique"] == n // 2
+        assert sum(counts.values()) == n
+        assert elapsed < 2.0
+
+
+class TestHashCache:
+    def test_digest_is_cached_by_size_and_mtime(self, tmp_path):
+        f = tmp_path / "a.bin"
+        f.write_bytes(b"x" * 100)
+        cache = HashCache(maxsize=1)
+        d1 = cache.digest(str(f), 100, 1.0)
+        f.write_bytes(b"y" * 100)
+        assert cache.digest(str(f), 100, 1.0) == d1        # same key: cached
+        assert cache.digest(str(f), 100, 2.0) != d1        # new mtime: re-hashed
+        assert cache.digest(str(tmp_path / "missing"), 0, 0.0) is None
+
+
+class TestCompareWorker:
+    def test_contents_are_hashed_in_parallel(self, tmp_path, monkeypatch):
+        (tmp_path / "l").mkdir()
+        (tmp_path / "r").mkdir()
+        lentries, rentries = [], []
+        for n in range(6):
+            (tmp_path / "l" / f"f{n}").write_bytes(b"a" * 10)
+            (tmp_path / "r" / f"f{n}").write_bytes(b"a" * 10 if n % 2 else b"b" * 10)
+            lentries.append((f"f{n}", False, 10, 9000.0 + n))
+            rentries.append((f"f{n}", False, 10, 1000.0 + n))
+        left, right = make_store(str(tmp_path / "l"), lentries), make_store(str(tmp_path / "r"), rentries)
+
+        running, peak, lock = [0], [0], threading.Lock()
+        hash_file = dir_compare._hash_file
+
+        def slow_hash(path):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return hash_file(path)
+        monkeypatch.setattr(dir_compare, "_hash_file", slow_hash)
+        monkeypatch.setattr(dir_compare, "hash_cache", HashCache())
+        worker = CompareWorker(left, right, use_hashes=True)
+        got = []
+        worker.finished.connect(lambda l, r, lm, rm: got.append((lm, rm)))
+        worker.run()
+        lm, rm = got[0]
+        assert {left.name(i): lm[i] for i in range(1, len(left))} == {
+            f"f{n}": MARK_SAME if n % 2 else MARK_NEWER for n in range(6)}
+        assert rm[right.name_index()["f0"]] == MARK_OLDER
+        assert peak[0] == dir_compare.HASH_WORKERS      # not one pair at a time
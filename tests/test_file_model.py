@@ -188,3 +188,140 @@ class TestFileModelIcons:
         idx = model.index(3, 0)  # first file
         icon = model.data(idx, Qt.DecorationRole)
         assert icon is not None
+
+
+class TestFileModelDelta:
+    """apply_delta() – incremental refresh keyed by name."""
+
+    @staticmethod
+    def _store(entries):
+        from listing_store import ListingStore
+        st = ListingStore("/fake", "/")
+        for name, is_dir, size, mtime in entries:
+            st.append(name, is_dir, size, mtime)
+        return st
+
+    def _names(self, model):
+        return [model.get_file(r).name for r in range(model.rowCount())]
+
+    def test_insert_remove_change(self):
+        base = [("..", True, 0, 0), ("src", True, 0, 1)] + \
+               [(f"f{i:02}.txt", False, i, i) for i in range(40)]
+        m = FileModel(self._store(base))
+        events = []
+        m.rowsInserted.connect(lambda p, a, b: events.append(("ins", a, b)))
+        m.rowsRemoved.connect(lambda p, a, b: events.append(("rem", a, b)))
+        m.dataChanged.connect(lambda a, b: events.append(("chg", a.row())))
+
+        new = [e for e in base if e[0] != "f05.txt"]
+        new = [("f10.txt", False, 999, 10) if e[0] == "f10.txt" else e for e in new]
+        new.append(("f05b.txt", False, 1, 1))
+        m.apply_delta(self._store(new))
+
+        names = self._names(m)
+        assert "f05.txt" not in names
+        assert names.index("f05b.txt") == names.index("f06.txt") - 1
+        assert m.get_file(names.index("f10.txt")).size_bytes == 999
+        assert ("rem", 7, 7) in events
+        assert ("ins", 7, 7) in events
+        assert any(e[0] == "chg" for e in events)
+
+    def test_sort_key_change_moves_row(self):
+        base = [("a", False, 1, 0), ("b", False, 2, 0), ("c", False, 3, 0)] + \
+               [(f"z{i:02}", False, 100 + i, 0) for i in range(20)]
+        m = FileModel(self._store(base))
+        m.sort(2, Qt.SortOrder.AscendingOrder)  # by size
+        new = [("a", False, 50, 0) if e[0] == "a" else e for e in base]
+        m.apply_delta(self._store(new))
+        assert self._names(m)[:3] == ["b", "c", "a"]
+
+    def test_view_rows_follow_a_reordered_store(self):
+        base = [("a", False, 1, 0), ("b", False, 2, 0), ("c", False, 3, 0)]
+        m = FileModel(self._store(base))
+        assert m.view_row(0) == 0                       # inverse built for the old store
+        # Same names, rescanned in another order, one size changed: no rows move
+        new = self._store([("c", False, 3, 0), ("b", False, 5, 0), ("a", False, 1, 0)])
+        m.apply_delta(new)
+        assert self._names(m) == ["a", "b", "c"]
+        assert [m.view_row(j) for j in range(3)] == [2, 1, 0]
+
+    def test_large_change_falls_back_to_reset(self):
+        m = FileModel(self._store([("a", False, 1, 0)]))
+        resets = []
+        m.modelReset.connect(lambda: resets.append(1))
+        m.apply_delta(self._store([(f"n{i}", False, i, 0) for i in range(50)]))
+        assert resets and m.rowCount() == 50
+
+
+class TestFileModelStreaming:
+    """add_rows() – chunks are merged into sorted position while scanning."""
+
+    @staticmethod
+    def _names(model):
+        return [model.get_file(r).name for r in range(model.rowCount())]
+
+    @pytest.mark.parametrize("count", [10, 500])  # few runs / layout-change merge
+    def test_chunks_stay_sorted(self, count):
+        import random
+        from listing_store import ListingStore
+        st = ListingStore("/fake", "/")
+        m = FileModel()
+        m.clear_for_scan(st)
+        names = [f"f{i:04}" for i in range(count)]
+        random.Random(1).shuffle(names)
+        st.append("..", True)
+        start = 0
+        for chunk in range(0, count, 37):
+            for name in names[chunk:chunk + 37]:
+                st.append(name, name.endswith("7"))
+            m.add_rows(st, start, len(st))
+            start = len(st)
+        got = self._names(m)
+        dirs = sorted(n for n in names if n.endswith("7"))
+        files = sorted(n for n in names if not n.endswith("7"))
+        assert got == [".."] + dirs + files
+
+    def test_chunk_respects_descending_sort(self):
+        from listing_store import ListingStore
+        st = ListingStore("/fake", "/")
+        m = FileModel()
+        m.clear_for_scan(st)
+        m.sort(2, Qt.SortOrder.DescendingOrder)
+        for sizes in ([5, 1, 9], [7, 3]):
+            start = len(st)
+            for size in sizes:
+                st.append(f"s{size}", False, size)
+            m.add_rows(st, start, len(st))
+        assert self._names(m) == ["s9", "s7", "s5", "s3", "s1"]
+
+
+class TestFileModelNamesFirst:
+    """Names-first listing – rows appear before their stat() data."""
+
+    def test_deferred_stat_fills_rows(self, tmp_path):
+        from fs_worker import ScanWorker, StatWorker
+        from formatting import format_size
+        for i, size in enumerate((300, 100, 200)):
+            (tmp_path / f"f{i}.bin").write_bytes(b"x" * size)
+        scan = ScanWorker(str(tmp_path), names_first=True)
+        scan.run()
+        st = scan.store
+        m = FileModel()
+        m.clear_for_scan(st)
+        m.add_rows(st, 0, len(st))
+        m.sort(2, Qt.SortOrder.AscendingOrder)   # by size, all still 0
+        assert len(st.pending) == 3
+        assert m.data(m.index(1, 3)) == ""
+
+        filled = []
+        stat = StatWorker(st)
+        stat.prioritize(m.store_rows([3]))
+        stat.rows_filled.connect(lambda store, rows: filled.extend(rows))
+        stat.rows_filled.connect(m.update_rows)
+        stat.run()
+        assert filled[0] == m.store_rows([3])[0] and not st.pending
+
+        m.resort()
+        names = [m.get_file(r).name for r in range(m.rowCount())]
+        assert names[1:] == ["f1.bin", "f2.bin", "f0.bin"]
+        assert m.data(m.index(3, 2)) == format_size(300)
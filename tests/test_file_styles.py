@@ -0,0 +1,54 @@
+"""Tests for FileStyleTable – categories, shared styles, theme and plugin extension."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt
+app = QApplication.instance() or QApplication(sys.argv)
+
+from file_styles import FileStyleTable, styles
+from file_model import FileModel
+from listing_store import ListingStore
+
+
+class TestFileStyleTable:
+    def test_default_categories(self):
+        table = FileStyleTable()
+        assert table.category_for("ZIP") == "archive"
+        assert table.category_for("py") == "exec"
+        assert table.category_for("unknown") == "file"
+        assert table.category_for("", is_dir=True) == "dir"
+        assert table.category_for("", is_dir=True, is_up=True) == "up"
+
+    def test_styles_are_shared(self):
+        table = FileStyleTable()
+        assert table.for_entry("png") is table.for_entry("jpg")
+        assert table.for_entry("txt").brush is None
+        assert table.style("dir").brush is not None
+
+    def test_plugin_registration(self):
+        table = FileStyleTable()
+        gen = table.generation
+        table.register({"video": {"icon": "fa5s.file-video", "color": "pink",
+                                  "extensions": [".MP4", "mkv"]}})
+        assert table.category_for("mp4") == "video"
+        assert table.generation > gen
+
+    def test_theme_override(self):
+        table = FileStyleTable()
+        table.set_theme("Latte")
+        assert table.for_entry("txt").category == "file"
+
+
+class TestFileModelStyles:
+    def test_models_share_icons(self):
+        st = ListingStore("/d", "/")
+        st.append("a.zip", False)
+        st.append("sub", True)
+        m1, m2 = FileModel(st), FileModel(st)
+        i1 = m1.data(m1.index(1, 0), Qt.DecorationRole)
+        i2 = m2.data(m2.index(1, 0), Qt.DecorationRole)
+        assert i1 is i2 is styles.style("archive").icon
+        assert m1.data(m1.index(0, 0), Qt.ForegroundRole) is styles.style("dir").brush
@@ -0,0 +1,134 @@
+"""Tests for FilterEngine and FilterProxyModel – modes, narrowing and row mapping."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QItemSelectionModel
+app = QApplication.instance() or QApplication(sys.argv)
+
+from filter_engine import FilterEngine, parse_query, MODE_GLOB, MODE_REGEX, MODE_FUZZY, MODE_SUBSTRING
+from filter_proxy import FilterProxyModel
+from file_model import FileModel
+from listing_store import ListingStore
+
+NAMES = ["..", "Readme.md", "report.pdf", "main.py", "setup.py", "notes.txt"]
+
+
+class TestParseQuery:
+    def test_modes(self):
+        assert parse_query("Rep") == (MODE_SUBSTRING, "rep")
+        assert parse_query("*.PY")[0] == MODE_GLOB
+        assert parse_query("re:^m")[0] == MODE_REGEX
+        assert parse_query("~rpt") == (MODE_FUZZY, "rpt")
+
+
+class TestFilterEngine:
+    def test_substring_case_insensitive(self):
+        assert list(FilterEngine(NAMES).match("RE")) == [1, 2]
+
+    def test_glob(self):
+        assert list(FilterEngine(NAMES).match("*.py")) == [3, 4]
+
+    def test_regex(self):
+        assert list(FilterEngine(NAMES).match("re:^(main|setup)")) == [3, 4]
+
+    def test_invalid_regex_matches_nothing(self):
+        assert list(FilterEngine(NAMES).match("re:(")) == []
+
+    def test_fuzzy(self):
+        assert list(FilterEngine(NAMES).match("~rpf")) == [2]
+
+    def test_empty_query_matches_all(self):
+        assert len(FilterEngine(NAMES).match("")) == len(NAMES)
+
+    def test_narrowing_reuses_previous_matches(self):
+        eng = FilterEngine(NAMES)
+        eng.match("re")
+        eng.names[3] = "re-main.py"        # outside the previous match set
+        assert list(eng.match("rep")) == [2]
+
+    def test_widening_rescans(self):
+        eng = FilterEngine(NAMES)
+        eng.match("rep")
+        assert list(eng.match("re")) == [1, 2]
+
+    def test_stop(self):
+        assert FilterEngine(NAMES).match("~x", should_stop=lambda: True) is None
+
+
+class TestFilterProxyModel:
+    def _model(self):
+        st = ListingStore("/d", "/")
+        for name in NAMES:
+            st.append(name, name == "..")
+        return FileModel(st)
+
+    def test_maps_rows(self):
+        model = self._model()
+        proxy = FilterProxyModel()
+        proxy.setSourceModel(model)
+        assert proxy.rowCount() == model.rowCount()
+        proxy.setFilterText("*.py")
+        names = [model.get_file(proxy.mapToSource(proxy.index(r, 0)).row()).name
+                 for r in range(proxy.rowCount())]
+        assert names == ["main.py", "setup.py"]
+
+    def test_refilters_on_source_change(self):
+        model = self._model()
+        proxy = FilterProxyModel()
+        proxy.setSourceModel(model)
+        proxy.setFilterText(".py")
+        sel = QItemSelectionModel(proxy)
+        sel.setCurrentIndex(proxy.index(0, 0), QItemSelectionModel.ClearAndSelect)
+        model.sort(0, Qt.SortOrder.DescendingOrder)
+        names = [proxy.data(proxy.index(r, 0)) for r in range(proxy.rowCount())]
+        assert names == ["setup.py", "main.py"]
+        assert proxy.data(sel.currentIndex()) == "main.py"
+
+    def test_insert_while_filtered_keeps_cursor_and_selection(self):
+        model = self._model()
+        proxy = FilterProxyModel()
+        proxy.setSourceModel(model)
+        proxy.setFilterText(".py")
+        sel = QItemSelectionModel(proxy)
+        sel.setCurrentIndex(proxy.index(1, 0), QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+        assert proxy.data(sel.currentIndex()) == "setup.py"
+        resets = []
+        proxy.modelReset.connect(lambda: resets.append(1))
+
+        new = ListingStore("/d", "/")
+        for name in NAMES + ["a.py", "zz.txt", "b.txt"]:
+            new.append(name, name == "..")
+        model.apply_delta(new)
+
+        names = [proxy.data(proxy.index(r, 0)) for r in range(proxy.rowCount())]
+        assert names == ["a.py", "main.py", "setup.py"]
+        assert not resets
+        assert proxy.data(sel.currentIndex()) == "setup.py"
+        assert [proxy.data(i) for i in sel.selectedRows()] == ["setup.py"]
+        # Every proxy row still maps to the source row showing that name
+        for r in range(proxy.rowCount()):
+            assert model.data(proxy.mapToSource(proxy.index(r, 0))) == names[r]
+
+        gone = ListingStore("/d", "/")
+        for name in ["..", "Readme.md", "a.py", "setup.py", "zz.txt"]:
+            gone.append(name, name == "..")
+        model.apply_delta(gone)
+        assert [proxy.data(proxy.index(r, 0)) for r in range(proxy.rowCount())] == ["a.py", "setup.py"]
+        assert not resets and proxy.data(sel.currentIndex()) == "setup.py"
+
+    def test_unfiltered_changes_are_forwarded(self):
+        model = self._model()
+        proxy = FilterProxyModel()
+        proxy.setSourceModel(model)
+        inserted, resets = [], []
+        proxy.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        proxy.modelReset.connect(lambda: resets.append(1))
+        new = ListingStore("/d", "/")
+        for name in NAMES + ["b.txt"]:
+            new.append(name, name == "..")
+        model.apply_delta(new)
+        assert inserted and not resets
+        assert proxy.rowCount() == model.rowCount() == len(NAMES) + 1
@@ -0,0 +1,151 @@
+"""Tests for folder_sizes – recursive folder sizes cached by directory identity."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+import folder_sizes
+from folder_sizes import folder_size, folder_size_cache, FolderSizeWorker
+from listing_store import ListingStore
+from file_model import FileModel
+from sort_engine import COL_SIZE
+from PySide6.QtCore import Qt
+
+
+def make_tree(root):
+    (root / "a" / "deep").mkdir(parents=True)
+    (root / "a" / "one").write_bytes(b"x" * 100)
+    (root / "a" / "deep" / "two").write_bytes(b"x" * 1000)
+    (root / "b").mkdir()
+    (root / "b" / "three").write_bytes(b"x" * 10)
+    (root / "file").write_bytes(b"x" * 5)
+
+
+def listing(root):
+    st = ListingStore(str(root), os.sep)
+    st.append("..", True)
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        s = entry.stat()
+        st.append(entry.name, entry.is_dir(), 0 if entry.is_dir() else s.st_size, s.st_mtime)
+    return st
+
+
+class TestFolderSize:
+    def test_sums_recursively(self, tmp_path):
+        make_tree(tmp_path)
+        folder_size_cache.clear()
+        assert folder_size(str(tmp_path / "a")) == 1100
+        assert folder_size(str(tmp_path)) == 1115
+
+    def test_cached_until_directory_changes(self, tmp_path, monkeypatch):
+        make_tree(tmp_path)
+        folder_size_cache.clear()
+        assert folder_size(str(tmp_path / "a")) == 1100
+        calls = []
+        real = os.scandir
+        monkeypatch.setattr(folder_sizes.os, "scandir", lambda p: calls.append(p) or real(p))
+        assert folder_size(str(tmp_path / "a")) == 1100
+        assert calls == []                              # identity + mtime hit
+        (tmp_path / "a" / "new").write_bytes(b"x" * 7)  # changes a's mtime
+        assert folder_size(str(tmp_path / "a")) == 1107
+        assert calls == [str(tmp_path / "a")]           # 'deep' still cached
+
+    def test_forget_above_a_deep_change(self, tmp_path):
+        make_tree(tmp_path)
+        folder_size_cache.clear()
+        assert folder_size(str(tmp_path)) == 1115
+        (tmp_path / "a" / "deep" / "more").write_bytes(b"x" * 5)   # only deep's mtime changes
+        assert folder_size(str(tmp_path)) == 1115                  # stale above 'deep'
+        folder_size_cache.forget_above([str(tmp_path / "a" / "deep" / "more")])
+        assert folder_size(str(tmp_path)) == 1120
+
+    def test_deeper_than_the_recursion_limit(self, tmp_path):
+        # os.makedirs and the tmp_path cleanup recurse too: build and remove by hand
+        deep = str(tmp_path)
+        for _ in range(1200):
+            deep = os.path.join(deep, "d")
+            os.mkdir(deep)
+        with open(os.path.join(deep, "f"), "wb") as f:
+            f.write(b"x" * 3)
+        try:
+            folder_size_cache.clear()
+            assert folder_size(str(tmp_path)) == 3
+            assert folder_size(str(tmp_path / "d" / "d")) == 3      # cached on the way up
+        finally:
+            os.remove(os.path.join(deep, "f"))
+            while deep != str(tmp_path):
+                os.rmdir(deep)
+                deep = os.path.dirname(deep)
+
+    def test_stop(self, tmp_path):
+        make_tree(tmp_path)
+        folder_size_cache.clear()
+        assert folder_size(str(tmp_path), should_stop=lambda: True) is None
+
+
+class TestFolderSizeWorker:
+    def test_publishes_sizes_of_rows(self, tmp_path):
+        make_tree(tmp_path)
+        folder_size_cache.clear()
+        st = listing(tmp_path)
+        rows = [i for i in range(len(st)) if st.is_dir[i] and st.name(i) != ".."]
+        worker = FolderSizeWorker(st, rows)
+        got, done = [], []
+        worker.sizes_ready.connect(lambda store, sizes: got.extend(sizes))
+        worker.finished.connect(done.append)
+        worker.run()
+        assert done == [st]
+        assert {st.name(r): size for r, size in got} == {"a": 1100, "b": 10}
+        assert worker.add([1]) is False      # finished workers take no more rows
+
+    def test_finishes_when_a_folder_fails(self, tmp_path, monkeypatch):
+        make_tree(tmp_path)
+        st = listing(tmp_path)
+        rows = [i for i in range(len(st)) if st.is_dir[i] and st.name(i) != ".."]
+
+        def broken(path, should_stop=None):
+            if path.endswith("a"):
+                raise RecursionError("too deep")
+            return 10
+        monkeypatch.setattr(folder_sizes, "folder_size", broken)
+        worker = FolderSizeWorker(st, rows)
+        got, done = [], []
+        worker.sizes_ready.connect(lambda store, sizes: got.extend(sizes))
+        worker.finished.connect(done.append)
+        worker.run()
+        assert done == [st]
+        assert {st.name(r): size for r, size in got} == {"b": 10}
+
+
+class TestFileModelFolderSizes:
+    def test_sizes_show_and_sort(self, tmp_path):
+        make_tree(tmp_path)
+        st = listing(tmp_path)
+        model = FileModel(st)
+        model.sort(COL_SIZE, Qt.SortOrder.DescendingOrder)
+        row_of = {st.name(i): i for i in range(len(st))}
+        changed = []
+        model.dataChanged.connect(lambda a, b, roles=(): changed.append((a.column(), b.column())))
+        model.set_dir_sizes(st, [(row_of["a"], 1100), (row_of["b"], 10)])
+        assert changed and all(c == (COL_SIZE, COL_SIZE) for c in changed)
+        model.resort()
+        names = [model.index(r, 0).data() for r in range(model.rowCount())]
+        assert names == ["..", "a", "b", "file"]
+        assert model.index(1, COL_SIZE).data() != "<DIR>"
+        model.sort(COL_SIZE, Qt.SortOrder.AscendingOrder)
+        assert [model.index(r, 0).data() for r in range(model.rowCount())] == ["..", "b", "a", "file"]
+
+    def test_sizes_survive_unchanged_delta(self, tmp_path):
+        make_tree(tmp_path)
+        st = listing(tmp_path)
+        model = FileModel(st)
+        row_of = {st.name(i): i for i in range(len(st))}
+        model.set_dir_sizes(st, [(row_of["a"], 1100)])
+        (tmp_path / "c").write_bytes(b"y")
+        new = listing(tmp_path)
+        model.apply_delta(new)
+        new_row = {new.name(i): i for i in range(len(new))}
+        assert model.dir_size(new_row["a"]) == 1100
@@ -0,0 +1,61 @@
+"""Tests for formatting – memoized size/date formatters and the identity cache."""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import formatting
+from formatting import IdentityCache, format_size, format_date, cache_stats, clear_caches
+
+
+class TestFormatters:
+    def setup_method(self):
+        clear_caches()
+
+    def test_size_values(self):
+        assert format_size(0) == "0 B"
+        assert format_size(1536) == "1.5 KB"
+        assert format_size(1024 ** 5 * 3) == "3072.0 TB"
+
+    def test_size_memoized(self):
+        format_size(4096)
+        format_size(4096)
+        stats = cache_stats()["size"]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_date_bucketed_per_minute(self):
+        base = 1_700_000_040  # start of a minute
+        assert format_date(base) == format_date(base + 59)
+        assert cache_stats()["date"]["misses"] == 1
+        assert format_date(base) == time.strftime(formatting.DATE_FORMAT, time.localtime(base))
+        assert format_date(0) == ""
+
+
+class TestIdentityCache:
+    def test_positive_lookup_cached(self):
+        calls = []
+        cache = IdentityCache(lambda i: calls.append(i) or f"user{i}")
+        assert cache.get(5) == "user5"
+        assert cache.get(5) == "user5"
+        assert calls == [5]
+        assert cache.stats()["hits"] == 1
+
+    def test_negative_lookup_cached(self):
+        calls = []
+        cache = IdentityCache(lambda i: calls.append(i) and None)
+        assert cache.get(4242) == "4242"
+        assert cache.get(4242) == "4242"
+        assert calls == [4242]
+        assert cache.stats()["negative"] == 1
+
+    def test_ttl_expiry(self):
+        calls = []
+        cache = IdentityCache(lambda i: calls.append(i) or "x", ttl=0)
+        cache.get(1)
+        cache.get(1)
+        assert calls == [1, 1]
+
+    def test_unknown_id(self):
+        assert IdentityCache(lambda i: "x").get(-1) == ""
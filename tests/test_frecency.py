@@ -0,0 +1,160 @@
+"""Tests for frecency – the visited-folder index behind the jump prompt."""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import frecency
+from frecency import FrecencyIndex, DAY, WEEK
+
+NOW = 1_700_000_000.0
+
+
+def make_index(tmp_path, name="frecency"):
+    return FrecencyIndex(str(tmp_path / name))
+
+
+def keys(results):
+    return [k for k, _ in results]
+
+
+class TestRanking:
+    def test_frequency_and_recency(self, tmp_path):
+        idx = make_index(tmp_path)
+        for _ in range(3):
+            idx.visit("/home/u/often", NOW - 2 * WEEK)
+        idx.visit("/home/u/recent", NOW - 60)
+        idx.visit("/home/u/old", NOW - 2 * WEEK)
+        # 1 visit in the last hour (x4) beats 3 visits two weeks ago (x0.25)
+        assert keys(idx.query("", now=NOW)) == ["/home/u/recent", "/home/u/often", "/home/u/old"]
+
+    def test_words_in_order_last_in_name(self, tmp_path):
+        idx = make_index(tmp_path)
+        for key in ("/home/u/Documents/projects", "/home/u/projects/doc", "/srv/proto",
+                    "/home/u/Documents/projects/src"):
+            idx.visit(key, NOW)
+        assert keys(idx.query("doc pro", now=NOW)) == ["/home/u/Documents/projects"]
+        # The last word must match within the last component
+        assert sorted(keys(idx.query("pro", now=NOW))) == ["/home/u/Documents/projects", "/srv/proto"]
+        assert keys(idx.query("dcmnts/src", now=NOW)) == ["/home/u/Documents/projects/src"]
+        assert idx.query("zzz", now=NOW) == []
+
+    def test_name_match_is_preferred(self, tmp_path):
+        idx = make_index(tmp_path)
+        idx.visit("/a/myconfig", NOW)
+        idx.visit("/a/myconfig", NOW)
+        idx.visit("/b/config", NOW)
+        assert keys(idx.query("config", now=NOW)) == ["/b/config", "/a/myconfig"]
+
+    def test_vfs_tags(self, tmp_path):
+        idx = make_index(tmp_path)
+        idx.visit("[SFTP] /var/www/site", NOW)
+        idx.visit("/var/www", NOW)
+        assert keys(idx.query("www site", now=NOW)) == ["[SFTP] /var/www/site"]
+
+    def test_visits_after_the_buffer_was_built(self, tmp_path):
+        idx = make_index(tmp_path)
+        for n in range(100):
+            idx.visit(f"/data/set{n:03}", NOW - 2 * DAY)
+        assert keys(idx.query("set", limit=1, now=NOW)) != ["/data/set050"]
+        for _ in range(5):
+            idx.visit("/data/set050", NOW)
+        idx.visit("/data/set_new", NOW)
+        assert keys(idx.query("set", limit=2, now=NOW)) == ["/data/set050", "/data/set_new"]
+        idx.remove("/data/set050")
+        assert keys(idx.query("set050", now=NOW)) == []
+
+    def test_queries_never_rebuild_a_built_buffer(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(frecency, "LOOSE_KEYS", 4)
+        idx = make_index(tmp_path)
+        idx.visit("/old/one", NOW - WEEK * 2)
+        idx.prepare(now=NOW)
+        builds = []
+        monkeypatch.setattr(idx, "_update_buffer", builds.append)
+        for n in range(10):                         # more than LOOSE_KEYS: stale
+            idx.visit(f"/new/dir{n}", NOW)
+        assert len(keys(idx.query("dir", now=NOW))) == 10
+        assert keys(idx.query("one", now=NOW)) == ["/old/one"]
+        assert builds == []
+        idx.prepare(now=NOW)                        # the jump prompt opening
+        assert builds == [NOW]
+
+
+class TestPersistence:
+    def test_replay_and_compact(self, tmp_path):
+        idx = make_index(tmp_path)
+        idx.visit("/a", NOW - DAY * 2)
+        idx.visit("/a", NOW)
+        idx.visit("/b", NOW)
+        idx.remove("/b")
+        with open(idx.path, "a") as f:
+            f.write('["/c", 12\n')                  # torn write from another window
+        again = make_index(tmp_path)
+        assert len(again) == 1 and again.query("", now=NOW) == [("/a", 8.0)]
+
+        assert again.compact()
+        with open(again.path) as f:
+            assert f.read().splitlines() == [f'["/a", 2.0, {NOW}]']
+        again.visit("/d", NOW)
+        assert sorted(keys(make_index(tmp_path).query("", now=NOW))) == ["/a", "/d"]
+
+    def test_compact_keeps_what_other_windows_appended(self, tmp_path):
+        first, second = make_index(tmp_path), make_index(tmp_path)
+        first.visit("/first", NOW)
+        second.visit("/second", NOW)                # loaded after /first was written
+        first.visit("/both", NOW)
+        second.visit("/both", NOW)
+        first.prepare(now=NOW)
+        assert first.compact()
+        merged = {"/first": 4.0, "/second": 4.0, "/both": 8.0}
+        assert dict(make_index(tmp_path).query("", now=NOW)) == merged
+        # The compacting window sees them too, although its buffer predates them
+        assert dict(first.query("", now=NOW)) == merged
+        assert keys(first.query("sec", now=NOW)) == ["/second"]
+
+    def test_compacts_after_many_visits(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(frecency, "COMPACT_LINES", 10)
+        idx = make_index(tmp_path)
+        for n in range(25):
+            idx.visit("/same", NOW + n)
+        with open(idx.path) as f:
+            assert len(f.read().splitlines()) <= 11
+        assert make_index(tmp_path).query("", now=NOW + 30) == idx.query("", now=NOW + 30)
+
+    def test_default_file(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+        assert FrecencyIndex().path == str(tmp_path / "kicommander" / "frecency")
+
+
+class TestAging:
+    def test_ranks_are_aged(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(frecency, "MAX_TOTAL_RANK", 20.0)
+        idx = make_index(tmp_path)
+        for _ in range(15):
+            idx.visit("/often", NOW)
+        for n in range(6):
+            idx.visit(f"/once{n}", NOW)
+        # The total passed 20: everything was scaled by 0.9, single visits dropped
+        assert keys(idx.query("", now=NOW)) == ["/often"]
+        assert idx.query("", now=NOW)[0][1] == 15 * 0.9 * 4
+
+
+class TestSpeed:
+    def test_tens_of_thousands_of_entries(self, tmp_path):
+        rnd = random.Random(7)
+        words = ["home", "user", "projects", "src", "docs", "music", "build", "cache", "lib",
+                 "test", "data", "backup", "work", "linux", "share", "local", "tmp", "var"]
+        idx = make_index(tmp_path)
+        idx._loaded = True                          # fill in memory, not through the file
+        while len(idx._entries) < 30000:
+            path = "/" + "/".join(rnd.choice(words) + str(rnd.randint(0, 999))
+                                  for _ in range(rnd.randint(2, 7)))
+            idx._visit(path, NOW - rnd.randint(0, 30 * DAY))
+        idx.query("", now=NOW)                      # builds the search buffer
+        for text in ("", "pro", "doc pro", "lib 9", "zzz", "usr/src", "e"):
+            start = time.perf_counter()
+            idx.query(text, now=NOW)
+            # A few ms normally; the bound leaves room for slow CI machines
+            assert time.perf_counter() - start < 0.1, text
@@ -0,0 +1,118 @@
+"""Tests for ScanWorker / StatWorker – sequential and pooled stat."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+from fs_worker import ScanWorker, StatWorker, BranchWorker, FileInfo
+import mount_info
+
+
+def make_dir(tmp_path, count=120):
+    for i in range(count):
+        if i % 10 == 0:
+            (tmp_path / f"d{i:03}").mkdir()
+        else:
+            (tmp_path / f"f{i:03}.txt").write_bytes(b"x" * i)
+    return str(tmp_path)
+
+
+def rows(store):
+    return sorted((store.name(i), bool(store.is_dir[i]), store.sizes[i], store.mtimes[i])
+                  for i in range(len(store)))
+
+
+class TestScanWorker:
+    def test_parallel_scan_matches_sequential(self, tmp_path):
+        path = make_dir(tmp_path)
+        seq = ScanWorker(path, names_first=False, stat_workers=1)
+        par = ScanWorker(path, names_first=False, stat_workers=8)
+        chunks = []
+        par.chunk_filled.connect(lambda st, a, b: chunks.append((a, b)))
+        seq.run()
+        par.run()
+        assert rows(par.store) == rows(seq.store)
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(par.store)
+
+    def test_cancelled_scan_publishes_nothing(self, tmp_path):
+        worker = ScanWorker(make_dir(tmp_path), names_first=False)
+        chunks, finished = [], []
+        worker.chunk_filled.connect(lambda *a: chunks.append(a))
+        worker.finished.connect(finished.append)
+        worker.stop()
+        worker.run()
+        assert not chunks and finished == [worker.store]
+
+    def test_pooled_fill_of_names_first_listing(self, tmp_path, monkeypatch):
+        path = make_dir(tmp_path)
+        monkeypatch.setattr("fs_worker.stat_workers", lambda p: 4)
+        scan = ScanWorker(path, names_first=True)
+        scan.run()
+        assert len(scan.store.pending) == 120
+        StatWorker(scan.store).run()
+        full = ScanWorker(path, names_first=False)
+        full.run()
+        assert not scan.store.pending
+        assert rows(scan.store) == rows(full.store)
+
+
+class FakeVfs:
+    """Directory tree of a VFS provider: inner path -> FileInfo list."""
+    def __init__(self, tree):
+        self.tree = tree
+
+    def list_dir(self, inner_path):
+        return self.tree[inner_path]
+
+
+class TestBranchWorker:
+    def test_local_tree_is_flat_and_relative(self, tmp_path):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / "b" / "z.md").write_text("z")
+        (tmp_path / "a" / "y.py").write_text("y")
+        (tmp_path / "x.txt").write_text("x")
+        os.symlink(tmp_path, tmp_path / "a" / "loop")     # never followed
+        worker = BranchWorker(str(tmp_path))
+        progress = []
+        worker.progress.connect(lambda files, dirs: progress.append((files, dirs)))
+        worker.run()
+        st = worker.store
+        names = sorted(st.name(i) for i in range(1, len(st)))
+        assert names == sorted(["x.txt", os.path.join("a", "y.py"), os.path.join("a", "b", "z.md")])
+        assert st.full_path(st.name_index()["x.txt"]) == os.path.join(str(tmp_path), "x.txt")
+        assert st.full_path(st.name_index()[os.path.join("a", "b", "z.md")]) == \
+            os.path.join(str(tmp_path), "a", "b", "z.md")
+        assert progress[-1] == (3, 3)
+
+    def test_vfs_tree(self):
+        vfs = FakeVfs({
+            "/": [FileInfo("d", "", is_dir=True, full_path="d/"),
+                  FileInfo("g.txt", "txt", full_path="g.txt", size_bytes=1)],
+            "d/": [FileInfo("f.txt", "txt", full_path="d/f.txt", size_bytes=2)],
+        })
+        worker = BranchWorker("/", vfs)
+        worker.run()
+        st = worker.store
+        assert sorted((st.name(i), st.full_path(i)) for i in range(len(st))) == [
+            ("d/f.txt", "d/f.txt"), ("g.txt", "g.txt")]
+
+
+class TestStatWorkers:
+    def test_tuned_per_mount(self, monkeypatch):
+        mounts = mount_info.parse_mountinfo(
+            "1 0 8:1 / / rw - ext4 /dev/sda1 rw\n"
+            "2 1 0:40 / /mnt/share rw - cifs //srv/share rw\n"
+            "3 1 0:41 / /mnt/nfs rw - nfs4 nas:/x rw\n")
+        monkeypatch.setattr(mount_info, "read_mounts", lambda: mounts)
+        monkeypatch.setattr(mount_info, "_slow_mounts", {})
+        monkeypatch.setattr(mount_info, "_slow_probes", {})
+        monkeypatch.setattr(mount_info.sys, "platform", "linux")
+        assert mount_info.stat_workers("/home") == 1
+        assert mount_info.stat_workers("/mnt/share/a") == mount_info.STAT_WORKERS["network"]
+        assert mount_info.stat_workers("/mnt/nfs") == 32
+        for _ in range(mount_info.SLOW_PROBES):
+            mount_info.mark_slow("/home")
+        assert mount_info.stat_workers("/home") == mount_info.SLOW_LOCAL_WORKERS
@@ -0,0 +1,147 @@
+"""Tests for git_status – status column from .git/index without running git status."""
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import git_status
+from git_status import IgnoreRules, status, MODIFIED, UNTRACKED, IGNORED
+
+needs_git = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def entry_status(path):
+    st = os.lstat(path)
+    return status(str(path), os.path.isdir(path), st.st_size, st.st_mtime)
+
+
+def file_stamp(path):
+    return git_status.dir_state(os.path.dirname(path)).stamp(str(path), False)
+
+
+class TestIgnoreRules:
+    def test_patterns(self):
+        rules = IgnoreRules()
+        for line in ("# comment", "*.log", "!keep.log", "build/", "/top.txt", "docs/**/*.tmp"):
+            rules.add(line)
+        assert rules.ignored("a/b/x.log", False)
+        assert not rules.ignored("keep.log", False)
+        assert rules.ignored("build", True) and not rules.match("build", False)
+        assert rules.ignored("build/out/x.c", False)            # inside an ignored dir
+        assert rules.ignored("top.txt", False) and not rules.ignored("sub/top.txt", False)
+        assert rules.ignored("docs/a/b/c.tmp", False) and rules.ignored("docs/c.tmp", False)
+
+    def test_nested_gitignore_is_relative_to_its_dir(self):
+        rules = IgnoreRules()
+        rules.add("/gen", "pkg")
+        assert rules.ignored("pkg/gen", True)
+        assert not rules.ignored("gen", True)
+
+
+@needs_git
+class TestStatus:
+    @pytest.fixture
+    def repo(self, tmp_path):
+        git(tmp_path, "init", "-q")
+        (tmp_path / ".gitignore").write_text("*.o\n")
+        (tmp_path / "clean.txt").write_text("clean\n")
+        (tmp_path / "changed.txt").write_text("before\n")
+        (tmp_path / "touched.txt").write_text("same\n")
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "lib" / "a.c").write_text("int a;\n")
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "-q", "-m", "init")
+        return tmp_path
+
+    def test_statuses(self, repo):
+        (repo / "changed.txt").write_text("after!\n")
+        st = os.stat(repo / "touched.txt")
+        os.utime(repo / "touched.txt", (st.st_atime, st.st_mtime + 100))   # same content
+        (repo / "new.txt").write_text("new\n")
+        (repo / "x.o").write_text("obj\n")
+        (repo / "fresh").mkdir()
+        assert entry_status(repo / "clean.txt") == ""
+        assert entry_status(repo / "changed.txt") == MODIFIED
+        assert entry_status(repo / "touched.txt") == ""
+        assert entry_status(repo / "new.txt") == UNTRACKED
+        assert entry_status(repo / "x.o") == IGNORED
+        assert entry_status(repo / "lib") == ""
+        assert entry_status(repo / "fresh") == UNTRACKED
+        assert entry_status(repo / "lib" / "a.c") == ""
+
+    def test_index_v4_and_reparse_on_change(self, repo):
+        git(repo, "update-index", "--index-version", "4")
+        index = git_status.repo_cache.index(str(repo / ".git"))
+        assert {"clean.txt", "changed.txt", "lib/a.c", ".gitignore"} <= set(index.entries)
+        (repo / "new.txt").write_text("new\n")
+        assert entry_status(repo / "new.txt") == UNTRACKED
+        stamp = file_stamp(repo / "new.txt")
+        git(repo, "add", "new.txt")
+        assert file_stamp(repo / "new.txt") != stamp
+        assert entry_status(repo / "new.txt") == ""
+
+    def test_ignore_files_are_part_of_the_stamp(self, repo):
+        (repo / "lib" / "out.bin").write_text("x")
+        stamp = file_stamp(repo / "lib" / "out.bin")
+        assert entry_status(repo / "lib" / "out.bin") == UNTRACKED
+        (repo / "lib" / ".gitignore").write_text("*.bin\n")
+        assert file_stamp(repo / "lib" / "out.bin") != stamp
+        assert entry_status(repo / "lib" / "out.bin") == IGNORED
+        stamp = file_stamp(repo / "lib" / "out.bin")
+        (repo / ".git" / "info").mkdir(exist_ok=True)
+        (repo / ".git" / "info" / "exclude").write_text("tmp/\n")
+        assert file_stamp(repo / "lib" / "out.bin") != stamp
+
+    def test_directories_roll_up_changes(self, repo):
+        (repo / "lib" / "deep").mkdir()
+        (repo / "lib" / "deep" / "b.c").write_text("int b;\n")
+        (repo / "docs").mkdir()
+        (repo / "docs" / "x.md").write_text("x\n")
+        git(repo, "add", ".")
+        git(repo, "commit", "-q", "-m", "more")
+        state = git_status.dir_state(str(repo))
+        assert entry_status(repo / "lib") == "" and not state.changed_dirs()
+        clean = state.stamp(str(repo / "lib"), True)
+        (repo / "lib" / "deep" / "b.c").write_text("int b = 1;\n")
+        (repo / "docs" / "x.md").unlink()                   # deleted counts too
+        state = git_status.dir_state(str(repo))
+        assert state.changed_dirs() == {"lib", "docs"}
+        assert entry_status(repo / "lib") == MODIFIED
+        assert entry_status(repo / "lib" / "deep") == MODIFIED
+        assert entry_status(repo / "docs") == MODIFIED
+        # A cached value for the directory is keyed on the roll-up
+        assert state.stamp(str(repo / "lib"), True) != clean
+
+    def test_outside_repository(self, tmp_path):
+        (tmp_path / "f").write_text("x")
+        if git_status.find_repo(str(tmp_path)) is None:
+            assert entry_status(tmp_path / "f") == ""
+            assert file_stamp(tmp_path / "f") is None
+
+
+class TestFindRepo:
+    def test_follows_git_init_and_removal(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        outside = git_status.find_repo(str(tmp_path / "sub"))
+        if outside is not None:
+            pytest.skip("temporary directory is inside a repository")
+        (tmp_path / ".git").mkdir()                 # as git init does
+        assert git_status.find_repo(str(tmp_path / "sub")) == (str(tmp_path), str(tmp_path / ".git"))
+        (tmp_path / ".git").rmdir()
+        assert git_status.find_repo(str(tmp_path / "sub")) is None
+
+    def test_nested_repository_takes_over(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "sub" / "deeper").mkdir(parents=True)
+        assert git_status.find_repo(str(tmp_path / "sub" / "deeper"))[0] == str(tmp_path)
+        (tmp_path / "sub" / ".git").mkdir()
+        assert git_status.find_repo(str(tmp_path / "sub" / "deeper"))[0] == str(tmp_path / "sub")
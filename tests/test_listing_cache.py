@@ -0,0 +1,61 @@
+"""Tests for ListingCache – stamp/TTL validation, LRU budget and VFS identity."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from listing_cache import ListingCache, vfs_identity
+from listing_store import ListingStore
+
+
+def make_store(n=10):
+    st = ListingStore("/d", "/")
+    for i in range(n):
+        st.append(f"file_{i}", False, i)
+    st.compact()
+    return st
+
+
+class TestListingCache:
+    def test_stamp_must_match(self):
+        cache = ListingCache()
+        st = make_store()
+        cache.put((None, "/d"), st, stamp=100)
+        assert cache.get((None, "/d"), 100) is st
+        assert cache.get((None, "/d"), 101) is None
+        assert (None, "/d") not in cache
+
+    def test_remote_ttl(self):
+        cache = ListingCache(remote_ttl=0)
+        cache.put(("FTPVFS", "/"), make_store())
+        assert cache.get(("FTPVFS", "/")) is None
+
+    def test_lru_eviction_under_budget(self):
+        size = make_store().nbytes
+        cache = ListingCache(budget_bytes=size * 2)
+        for name in ("a", "b"):
+            cache.put((None, name), make_store(), 1)
+        cache.get((None, "a"), 1)          # "b" becomes least recently used
+        cache.put((None, "c"), make_store(), 1)
+        assert (None, "a") in cache
+        assert (None, "b") not in cache
+        assert cache.nbytes <= cache.budget_bytes
+
+    def test_oversized_store_not_cached(self):
+        cache = ListingCache(budget_bytes=10)
+        cache.put((None, "/d"), make_store(), 1)
+        assert len(cache) == 0
+
+
+class TestVfsIdentity:
+    class FakeVFS:
+        def __init__(self, host, user):
+            self.host = host
+            self.user = user
+
+    def test_same_connection_same_identity(self):
+        assert vfs_identity(self.FakeVFS("h", "u")) == vfs_identity(self.FakeVFS("h", "u"))
+        assert vfs_identity(self.FakeVFS("h", "u")) != vfs_identity(self.FakeVFS("h", "x"))
+
+    def test_local(self):
+        assert vfs_identity(None) is None
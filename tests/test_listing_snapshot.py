@@ -0,0 +1,75 @@
+"""Tests for listing_snapshot – listings saved at exit and shown at the next start."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from listing_cache import ListingCache
+from listing_snapshot import ListingSnapshots
+from listing_store import ListingStore
+
+
+def make_store(base="/data", n=5):
+    st = ListingStore(base, "/")
+    st.stamp = 1234567890123
+    st.append("..", True, full_path="/")
+    for i in range(n):
+        st.append(f"file_{i}.txt", False, 100 * i, 1000.0 + i, 0o100644, uid=1000, gid=100)
+    st.append("Šípková Růženka", True, 0, 5.0, 0o40755)
+    st.append("bad\udcff.bin", False, 7, 6.0)          # undecodable name from scandir
+    return st
+
+
+def columns(st):
+    return [(st.name(i), st.ext(i), st.is_dir[i], st.sizes[i], st.mtimes[i], st.modes[i],
+             st.uids[i], st.full_path(i)) for i in range(len(st))]
+
+
+class TestListingStoreBytes:
+    def test_roundtrip(self):
+        st = make_store()
+        copy = ListingStore.from_bytes(st.to_bytes())
+        assert columns(copy) == columns(st)
+        assert (copy.base_path, copy.sep, copy.stamp) == ("/data", "/", st.stamp)
+        copy.append("new.py", False, 1)               # still appendable
+        assert copy.name(len(copy) - 1) == "new.py" and copy.ext(len(copy) - 1) == "py"
+
+    def test_damaged(self):
+        data = make_store().to_bytes()
+        with pytest.raises(ValueError):
+            ListingStore.from_bytes(data[:-3])
+
+
+class TestListingSnapshots:
+    def test_save_load_take(self, tmp_path):
+        path = str(tmp_path / "snap")
+        snaps = ListingSnapshots()
+        assert snaps.save([make_store("/a"), make_store("/b", 3), make_store("/a")], path) == 2
+        loaded = ListingSnapshots()
+        assert loaded.load(path) == 2
+        st = loaded.take("/a")
+        assert columns(st) == columns(make_store("/a"))
+        assert loaded.take("/a") is None
+
+        cache = ListingCache()
+        loaded.seed(cache)
+        assert cache.get((None, "/b"), 1234567890123) is not None
+        assert len(loaded) == 0
+
+    def test_skips_incomplete_and_oversized(self, tmp_path):
+        path = str(tmp_path / "snap")
+        pending = make_store("/p")
+        pending.append("later", False, pending=True)
+        big = make_store("/big", 5000)
+        snaps = ListingSnapshots()
+        assert snaps.save([pending, big, make_store("/ok")], path, max_bytes=big.nbytes - 1) == 1
+        assert snaps.load(path) == 1 and snaps.take("/ok") is not None
+
+    def test_unreadable_file_is_ignored(self, tmp_path):
+        path = tmp_path / "snap"
+        snaps = ListingSnapshots()
+        assert snaps.load(str(path)) == 0
+        path.write_bytes(b"KCSNAP\x01\x00\x01\x00\x00\x00garbage")
+        assert snaps.load(str(path)) == 0
@@ -0,0 +1,101 @@
+"""Tests for ListingStore – columnar storage, interning and FileInfo materialisation."""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from listing_store import ListingStore
+from fs_worker import FileInfo
+
+
+@pytest.fixture
+def store():
+    st = ListingStore("/data", "/")
+    st.append("..", True, full_path="/")
+    st.append("build", True, mtime=1000, owner="alice", group="dev")
+    st.append("report.PDF", False, 2048, 2000, 0o100644, "alice", "dev")
+    st.append("notes.txt", False, 10, 3000, 0o100600, "bob", "dev")
+    return st
+
+
+class TestListingStoreColumns:
+    def test_len(self, store):
+        assert len(store) == 4
+
+    def test_names(self, store):
+        assert [store.name(i) for i in range(len(store))] == ["..", "build", "report.PDF", "notes.txt"]
+
+    def test_ext_derived_from_name(self, store):
+        assert store.ext(1) == ""
+        assert store.ext(2) == "PDF"
+        assert store.ext(3) == "txt"
+
+    def test_full_path_derived(self, store):
+        assert store.full_path(2) == "/data/report.PDF"
+
+    def test_full_path_override(self, store):
+        assert store.full_path(0) == "/"
+
+    def test_owner_interned(self, store):
+        assert store.owner(2) == "alice"
+        assert store.owner_ids[1] == store.owner_ids[2]
+        assert store.group_ids[1] == store.group_ids[3]
+
+    def test_display_text(self, store):
+        assert store.size_text(1) == "<DIR>"
+        assert store.size_text(2) == "2.0 KB"
+        assert store.permissions(3) == "-rw-------"
+        assert store.date_text(0) == ""
+
+    def test_many_names_survive_buffer_flushes(self):
+        st = ListingStore("/x", "/")
+        for i in range(5000):
+            st.append(f"file_{i}.bin", False, i)
+        assert st.name(0) == "file_0.bin"
+        assert st.name(4999) == "file_4999.bin"
+        st.compact()
+        assert st.name(2500) == "file_2500.bin"
+        assert st.sizes[2500] == 2500
+
+
+class TestListingStoreFileInfo:
+    def test_file_info_roundtrip(self, store):
+        fi = store.file_info(2)
+        assert fi.name == "report.PDF"
+        assert fi.ext == "PDF"
+        assert fi.size_bytes == 2048
+        assert fi.mtime == 2000
+        assert fi.full_path == "/data/report.PDF"
+        assert fi.owner == "alice"
+        assert not fi.is_dir
+
+    def test_from_infos_keeps_vfs_labels(self):
+        infos = [
+            FileInfo("sheet", "", "<DOC>", "", False, "folder/sheet", 0, 0),
+            FileInfo("a.bin", "bin", "1 KB", "", False, "folder/a.bin", 1024, 0,
+                     permissions="-rwxr-xr-x"),
+        ]
+        st = ListingStore.from_infos(infos, "folder", "/")
+        assert st.size_text(0) == "<DOC>"
+        assert st.permissions(1) == "-rwxr-xr-x"
+        assert st.full_path(1) == "folder/a.bin"
+
+    def test_file_info_formats_lazily(self):
+        fi = FileInfo("a.bin", "bin", full_path="/x/a.bin", size_bytes=2048,
+                      mtime=0, mode=0o100644)
+        assert fi.size == "2.0 KB"
+        assert fi.permissions == "-rw-r--r--"
+        assert fi.date == ""
+        assert FileInfo("d", "", is_dir=True).size == "<DIR>"
+
+
+class TestListingStorePending:
+    def test_set_stat_fills_pending_row(self):
+        st = ListingStore("/d", "/")
+        row = st.append("slow.txt", False, pending=True)
+        assert row in st.pending
+        st.set_stat(row, 4096, 1000.0, 0o100644, 0, 0)
+        assert not st.pending
+        assert st.sizes[row] == 4096
+        assert st.permissions(row) == "-rw-r--r--"
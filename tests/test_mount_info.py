@@ -0,0 +1,131 @@
+"""Tests for mount_info – mountinfo parsing, classification and the mount monitor."""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+import mount_info
+from mount_info import (parse_mountinfo, classify, mount_for, user_mounts, mount_kind,
+                        MountMonitor, MountThread, KIND_LOCAL, KIND_NETWORK, KIND_FUSE)
+
+MOUNTINFO = """\
+22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw
+40 22 0:35 / /mnt/nas rw,relatime shared:20 - nfs4 nas:/export rw,vers=4.2
+41 22 0:36 / /mnt/my\\040share rw - cifs //srv/share rw
+42 40 0:37 / /mnt/nas/box rw,nosuid - fuse.sshfs user@box: rw
+43 22 0:38 / /media/usb rw master:3 - fuseblk /dev/sdb1 rw
+"""
+
+
+class TestMountInfo:
+    def test_parse_unescapes_and_skips_optional_fields(self):
+        mounts = parse_mountinfo(MOUNTINFO + "garbage line\n")
+        assert [m.mount_point for m in mounts] == [
+            "/", "/mnt/nas", "/mnt/my share", "/mnt/nas/box", "/media/usb"]
+        assert mounts[1].fstype == "nfs4" and mounts[1].source == "nas:/export"
+
+    def test_classify(self):
+        assert classify("ext4") == KIND_LOCAL
+        assert classify("cifs") == KIND_NETWORK
+        assert classify("fuse.sshfs") == KIND_NETWORK
+        assert classify("fuseblk") == KIND_FUSE
+
+    def test_mount_for_picks_longest_prefix(self):
+        mounts = parse_mountinfo(MOUNTINFO)
+        assert mount_for("/mnt/nas/box/x", mounts).fstype == "fuse.sshfs"
+        assert mount_for("/mnt/nas/boxes", mounts).fstype == "nfs4"
+        assert mount_for("/mnt/my share/a", mounts).fstype == "cifs"
+        assert mount_for("/home", mounts).mount_point == "/"
+
+    def test_mount_for_uses_the_monitored_table(self, monkeypatch):
+        def no_read():
+            raise AssertionError("mountinfo read while the monitor keeps a table")
+        monkeypatch.setattr(mount_info, "read_mounts", no_read)
+        monkeypatch.setattr(mount_info, "_table", parse_mountinfo(MOUNTINFO))
+        assert mount_for("/mnt/nas/x").fstype == "nfs4"
+
+    def test_slow_marks_need_repeated_probes_and_expire(self, monkeypatch):
+        mounts = parse_mountinfo(MOUNTINFO)
+        now = [1000.0]
+        monkeypatch.setattr(mount_info, "read_mounts", lambda: mounts)
+        monkeypatch.setattr(mount_info, "_table", None)
+        monkeypatch.setattr(mount_info, "_slow_mounts", {})
+        monkeypatch.setattr(mount_info, "_slow_probes", {})
+        monkeypatch.setattr(mount_info.sys, "platform", "linux")
+        monkeypatch.setattr(mount_info.time, "monotonic", lambda: now[0])
+        mount_info.mark_slow("/home/a")
+        assert not mount_info.is_slow("/home")           # one cold listing is not enough
+        now[0] += mount_info.SLOW_MARK_SECONDS + 1
+        mount_info.mark_slow("/home/b")
+        assert not mount_info.is_slow("/home")           # the first probe is too old
+        now[0] += 1
+        mount_info.mark_slow("/home/c")
+        assert mount_info.is_slow("/home")
+        now[0] += mount_info.SLOW_MARK_SECONDS
+        assert not mount_info.is_slow("/home")           # the mark expired
+
+
+SYSTEM_MOUNTS = """\
+23 1 0:5 / /proc rw - proc proc rw
+24 1 0:6 / /sys rw - sysfs sysfs rw
+25 1 0:7 / /run rw - tmpfs tmpfs rw
+26 1 7:0 / /snap/core/1 ro - squashfs /dev/loop0 ro
+27 1 8:2 / /boot/efi rw - vfat /dev/sda2 rw
+28 1 8:3 / /home rw - ext4 /dev/sda3 rw
+29 25 8:17 / /run/media/me/STICK rw - vfat /dev/sdc1 rw
+"""
+
+
+def wait_for(cond, timeout=5.0):
+    end = time.time() + timeout
+    while not cond() and time.time() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    return cond()
+
+
+class TestUserMounts:
+    def test_hides_system_mounts(self):
+        mounts = parse_mountinfo(MOUNTINFO + SYSTEM_MOUNTS)
+        shown = [m.mount_point for m in user_mounts(mounts)]
+        assert shown == ["/", "/home", "/media/usb", "/mnt/my share", "/mnt/nas",
+                         "/mnt/nas/box", "/run/media/me/STICK"]
+        assert [m.removable for m in user_mounts(mounts)][-1]
+
+    def test_root_always_present(self):
+        assert [m.mount_point for m in user_mounts([])] == ["/"]
+
+
+class TestMountMonitor:
+    def test_usage_is_queried_in_background_and_cached(self, tmp_path):
+        monitor = MountMonitor()
+        got = []
+        monitor.usage_ready.connect(lambda mp, usage: got.append((mp, usage)))
+        assert monitor.usage(str(tmp_path)) is None
+        assert wait_for(lambda: got)
+        total, free = got[0][1]
+        assert got[0][0] == str(tmp_path) and total >= free > 0
+        assert monitor.usage(str(tmp_path)) == (total, free)
+        app.processEvents()
+        assert len(got) == 1          # fresh value reused, no new query
+        monitor.stop()
+
+    @pytest.mark.skipif(not os.path.exists(mount_info.MOUNTINFO), reason="no mountinfo")
+    def test_worker_keeps_table(self):
+        thread = MountThread()
+        thread.start()
+        try:
+            assert wait_for(lambda: mount_info._table is not None)
+            assert mount_kind("/") == KIND_LOCAL
+            assert mount_info.mount_table() is mount_info._table
+        finally:
+            thread.worker.stop()
+            thread.quit()
+            thread.wait(3000)
+        assert mount_info._table is None
@@ -0,0 +1,38 @@
+"""Tests for PrefixIndex – incremental sorted name index for type-ahead."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from listing_store import ListingStore
+from prefix_index import PrefixIndex
+
+
+def names_of(index, lo, hi):
+    return [index.store.name(index.row(k)) for k in range(lo, hi)]
+
+
+class TestPrefixIndex:
+    def test_matches_are_case_insensitive_ranges(self):
+        st = ListingStore("/d", "/")
+        for name in ("..", "Readme.md", "report.txt", "src", "rep", "main.py"):
+            st.append(name, name in ("..", "src"))
+        index = PrefixIndex(st)
+        index.update()
+        assert len(index) == 5                 # '..' is never a match
+        assert names_of(index, *index.matches("RE")) == ["Readme.md", "rep", "report.txt"]
+        assert names_of(index, *index.matches("rep")) == ["rep", "report.txt"]
+        lo, hi = index.matches("x")
+        assert lo == hi
+
+    def test_update_merges_appended_rows(self):
+        st = ListingStore("/d", "/")
+        index = PrefixIndex(st)
+        expected = []
+        for chunk in (range(0, 100, 3), range(1, 100, 3), [2, 5]):  # merged and insorted
+            for i in chunk:
+                st.append(f"f{i:03}", False)
+                expected.append(f"f{i:03}")
+            index.update()
+            assert names_of(index, 0, len(index)) == sorted(expected)
+        assert names_of(index, *index.matches("f00")) == [f"f00{i}" for i in range(10) if i % 3 != 2 or i in (2, 5)]
@@ -93,6 +93,18 @@ def test_on_finished(queue_manager, mocker):
     assert queue_manager.current_worker is None
     queue_manager._check_next.assert_called_once()
 
+def test_on_finished_forgets_folder_sizes(queue_manager, mocker):
+    cache = mocker.patch('queue_manager.folder_size_cache')
+    local = queue_manager.add_to_queue("copy", ["/src/a", "/src/b"], "/dest")
+    remote = queue_manager.add_to_queue("copy", ["/x"], "/y", source_vfs=object())
+    mocker.patch.object(queue_manager, 'current_thread')
+    mocker.patch.object(queue_manager, '_check_next')
+
+    queue_manager._on_finished(local, True, "Success")
+    queue_manager._on_finished(remote, True, "Success")
+
+    cache.forget_above.assert_called_once_with(["/src/a", "/src/b", "/dest"])
+
 def test_on_finished_error(queue_manager, mocker):
     item_id = queue_manager.add_to_queue("copy", ["/src"], "/dest")
     
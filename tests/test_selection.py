@@ -0,0 +1,66 @@
+"""Tests for range-based selection, select-by-pattern and lazy drag data."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QItemSelectionModel
+app = QApplication.instance() or QApplication(sys.argv)
+
+from file_model import FileModel
+from listing_store import ListingStore
+from selection import (selection_ranges, rows_to_ranges, select_ranges,
+                       to_item_selection, pattern_matcher)
+
+
+def make_model(tmp_path=None, count=20):
+    base = str(tmp_path) if tmp_path else "/fake"
+    st = ListingStore(base)
+    st.append("..", True)
+    for i in range(count):
+        st.append(f"dir{i:02}" if i % 5 == 0 else f"f{i:02}.{'py' if i % 2 else 'txt'}", i % 5 == 0)
+    return FileModel(st)
+
+
+class TestRanges:
+    def test_selection_ranges_merge(self):
+        m = make_model()
+        sel = to_item_selection(m, [(5, 7), (1, 2), (3, 3)])
+        assert selection_ranges(sel) == [(1, 3), (5, 7)]
+
+    def test_rows_to_ranges(self):
+        assert rows_to_ranges([1, 2, 3, 7, 9, 10]) == [(1, 3), (7, 7), (9, 10)]
+
+    def test_select_ranges_then_deselect(self):
+        m = make_model()
+        sm = QItemSelectionModel(m)
+        select_ranges(sm, [(2, 10)])
+        select_ranges(sm, [(4, 5)], select=False)
+        assert selection_ranges(sm.selection()) == [(2, 3), (6, 10)]
+
+
+class TestPattern:
+    def test_globs_and_regex(self):
+        assert pattern_matcher("*.PY;*.md")("a.py")
+        assert not pattern_matcher("*.py")("a.txt")
+        assert pattern_matcher("*.*")("Makefile")
+        assert pattern_matcher("re:^f1")("F12.txt")
+
+    def test_match_rows_skips_dirs(self):
+        m = make_model()
+        names = [m.get_file(r).name for r in m.match_rows(pattern_matcher("*.py"))]
+        assert names and all(n.endswith(".py") for n in names)
+        assert not m.match_rows(pattern_matcher("dir*"))
+
+
+class TestLazyMime:
+    def test_urls_built_on_request(self, tmp_path):
+        (tmp_path / "a.txt").write_text("x")
+        st = ListingStore(str(tmp_path))
+        st.append("..", True, full_path=os.path.dirname(str(tmp_path)))
+        st.append("a.txt", False)
+        m = FileModel(st)
+        mime = m.mime_for(m.store_rows_in([(0, 1)]))
+        assert mime.hasUrls() and mime._urls is None
+        assert [u.toLocalFile() for u in mime.urls()] == [str(tmp_path / "a.txt")]
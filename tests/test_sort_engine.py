@@ -0,0 +1,67 @@
+"""Tests for SortEngine – natural ordering, secondary keys and cached permutations."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from listing_store import ListingStore
+from sort_engine import SortEngine, natural_key, COL_NAME, COL_SIZE, COL_EXT
+
+
+def make_engine(entries):
+    st = ListingStore("/d", "/")
+    for name, is_dir, size in entries:
+        st.append(name, is_dir, size)
+    return SortEngine(st), st
+
+
+def names(st, order):
+    return [st.name(i) for i in order]
+
+
+class TestNaturalKey:
+    def test_numbers_by_value(self):
+        assert sorted(["file10", "file2", "File1"], key=natural_key) == ["File1", "file2", "file10"]
+
+    def test_mixed_with_plain_names(self):
+        assert sorted(["a10", "a", "a2b"], key=natural_key) == ["a", "a2b", "a10"]
+
+
+class TestSortEngine:
+    ENTRIES = [
+        ("..", True, 0), ("src10", True, 0), ("src2", True, 0),
+        ("b.txt", False, 5), ("a.txt", False, 5), ("c.py", False, 1),
+    ]
+
+    def test_groups_and_natural_names(self):
+        eng, st = make_engine(self.ENTRIES)
+        assert names(st, eng.order(COL_NAME, True, len(st))) == \
+            ["..", "src2", "src10", "a.txt", "b.txt", "c.py"]
+
+    def test_descending_reverses_groups_only(self):
+        eng, st = make_engine(self.ENTRIES)
+        assert names(st, eng.order(COL_NAME, False, len(st))) == \
+            ["..", "src10", "src2", "c.py", "b.txt", "a.txt"]
+
+    def test_name_is_secondary_key(self):
+        eng, st = make_engine(self.ENTRIES)
+        assert names(st, eng.order(COL_SIZE, True, len(st)))[3:] == ["c.py", "a.txt", "b.txt"]
+        assert names(st, eng.order(COL_EXT, True, len(st)))[3:] == ["c.py", "a.txt", "b.txt"]
+
+    def test_permutation_cached_and_copied(self):
+        eng, st = make_engine(self.ENTRIES)
+        first = eng.order(COL_SIZE, True, len(st))
+        first[0] = 99                       # callers may mutate their copy
+        assert eng.order(COL_SIZE, True, len(st))[0] == 0
+
+    def test_grows_with_store(self):
+        eng, st = make_engine(self.ENTRIES)
+        eng.order(COL_NAME, True, len(st))
+        st.append("a1.txt", False, 0)
+        assert names(st, eng.order(COL_NAME, True, len(st)))[3] == "a1.txt"
+
+    def test_key_fn_matches_order(self):
+        eng, st = make_engine(self.ENTRIES)
+        key = eng.key_fn(COL_SIZE)
+        order = eng.order(COL_SIZE, True, len(st))[3:]
+        assert [key(i) for i in order] == sorted(key(i) for i in order)
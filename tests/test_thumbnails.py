@@ -0,0 +1,121 @@
+"""Tests for thumbnails – freedesktop thumbnail cache and the background loader."""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtWidgets import QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+from PySide6.QtGui import QImage, QColor
+import thumbnails
+from thumbnails import thumbnail, cache_path, load_cached, file_uri, evict, ThumbnailLoader, NORMAL
+from listing_store import ListingStore
+from file_model import FileModel
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def make_image(path, w=600, h=300):
+    image = QImage(w, h, QImage.Format_RGB32)
+    image.fill(QColor("#89b4fa"))
+    assert image.save(str(path))
+    return path
+
+
+class TestCache:
+    def test_generates_and_stores(self, tmp_path, cache_home):
+        src = make_image(tmp_path / "photo.png")
+        mtime = os.stat(src).st_mtime
+        image = thumbnail(str(src), mtime)
+        assert image is not None and max(image.width(), image.height()) == NORMAL
+        target = cache_path(str(src))
+        assert target.startswith(str(cache_home / "thumbnails" / "normal"))
+        stored = QImage(target)
+        assert stored.text("Thumb::URI") == file_uri(str(src))
+        assert stored.text("Thumb::MTime") == str(int(mtime))
+        if os.name == "posix":
+            assert os.stat(target).st_mode & 0o777 == 0o600
+
+    def test_invalid_after_mtime_change(self, tmp_path):
+        src = make_image(tmp_path / "photo.png")
+        mtime = os.stat(src).st_mtime
+        assert thumbnail(str(src), mtime) is not None
+        assert load_cached(str(src), mtime) is not None
+        assert load_cached(str(src), mtime + 10) is None
+        assert thumbnail(str(src), mtime + 10) is not None
+        assert load_cached(str(src), mtime + 10) is not None
+
+    def test_unreadable_file(self, tmp_path):
+        bad = tmp_path / "broken.jpg"
+        bad.write_bytes(b"not an image")
+        assert thumbnail(str(bad), 0) is None
+
+    def test_evict_oldest_first(self, tmp_path):
+        paths = []
+        for n in range(3):
+            src = make_image(tmp_path / f"p{n}.png", 300 + n, 200)
+            thumbnail(str(src), os.stat(src).st_mtime)
+            target = cache_path(str(src))
+            os.utime(target, (1000 + n, 1000 + n))
+            paths.append(target)
+        keep = os.path.getsize(paths[2])
+        assert evict(keep) == 2
+        assert [os.path.exists(p) for p in paths] == [False, False, True]
+
+    def test_evict_leaves_other_applications_alone(self, tmp_path):
+        src = make_image(tmp_path / "ours.png")
+        thumbnail(str(src), os.stat(src).st_mtime)
+        ours = cache_path(str(src))
+        os.utime(ours, (2000, 2000))
+        foreign = make_image(tmp_path / "foreign.png", 128, 64)
+        image = QImage(str(foreign))
+        image.setText("Software", "GNOME::ThumbnailFactory")
+        theirs = os.path.join(os.path.dirname(ours), "0" * 32 + ".png")
+        assert image.save(theirs)
+        os.utime(theirs, (1000, 1000))
+        assert evict(os.path.getsize(ours)) == 0
+        assert evict(0) == 1
+        assert not os.path.exists(ours) and os.path.exists(theirs)
+
+    def test_both_renderers_mark_their_output(self, tmp_path):
+        src = make_image(tmp_path / "photo.png")
+        out = tmp_path / "thumb.png"
+        out.write_bytes(thumbnails._render_qt(str(src), 0, NORMAL))
+        assert thumbnails._written_by_us(str(out))
+        if thumbnails.HAS_PIL:
+            out.write_bytes(thumbnails._render_pil(str(src), 0, NORMAL))
+            assert thumbnails._written_by_us(str(out))
+        assert not thumbnails._written_by_us(str(src))
+
+
+class TestLoader:
+    def test_loads_wanted_rows(self, tmp_path):
+        st = ListingStore(str(tmp_path), os.sep)
+        for name in ("a.png", "b.png"):
+            src = make_image(tmp_path / name)
+            st.append(name, False, os.path.getsize(src), os.stat(src).st_mtime)
+        (tmp_path / "notes.txt").write_text("x")
+        st.append("notes.txt", False, 1, os.stat(tmp_path / "notes.txt").st_mtime)
+        model = FileModel(st)
+        rows = model.thumb_rows(range(len(st)))
+        assert sorted(st.name(r) for r in rows) == ["a.png", "b.png"]
+
+        loader = ThumbnailLoader()
+        loader.ready.connect(model.set_thumbnails)
+        model.thumbnails_on = True
+        loader.want(st, rows)
+        end = time.time() + 10
+        while model.thumb_rows(rows) and time.time() < end:
+            app.processEvents()
+            time.sleep(0.01)
+        assert model.thumb_rows(rows) == []
+        icon = model.data(model.index(model.view_row(rows[0]), 0), thumbnails.Qt.DecorationRole)
+        assert icon.availableSizes()[0].width() == NORMAL